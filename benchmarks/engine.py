@@ -0,0 +1,212 @@
+"""할 일 엔진 벤치마크.
+
+크기별(기본 1천/1만/10만 개) 합성 할 일 목록(한글 설명, 태그, 마감 기한)을
+임시 데이터 디렉터리에 만들고 주요 작업의 실행 시간을 측정한다.
+결과는 JSON 파일로 저장하며, --compare로 기준 결과와 비교해 기준보다
+--threshold배 이상 느려진 항목이 있으면 종료 코드 1을 반환한다.
+--against로 다른 저장 방식을 같은 데이터로 함께 측정하면, 조회 작업(목록/검색/필터/마감 기한) 중
+그 저장 방식보다 --threshold배 이상 느린 항목이 있을 때도 종료 코드 1을 반환한다.
+
+    python benchmarks/engine.py --sizes 1000,10000 --output bench.json
+    python benchmarks/engine.py --sizes 1000,10000 --compare bench.json
+    python benchmarks/engine.py --sizes 1000000 --storage sqlite --repeat 1
+    python benchmarks/engine.py --sizes 100000 --storage columnar
+    python benchmarks/engine.py --sizes 20000 --storage sqlite --against json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+WORDS = ['회의', '보고서', '작성', '장보기', '운동', '공부', '정리', '예약', '전화', '메일',
+         '검토', '준비', '발표', '청소', '결제', '병원', '여행', '계획', '독서', '코드']
+TAGS = ['업무', '개인', '긴급', '보류', '가족', '공부']
+PRIORITIES = ['높음', '중간', '낮음']
+SORTS = ['priority', 'due-date', 'description', 'status']
+# --against로 저장 방식끼리 비교하는 조회 작업 (쓰기 작업은 저장 방식마다 방법이 달라 비교하지 않음)
+QUERY_OPS = [f'list_{sort_by}' for sort_by in SORTS] + [
+    'search', 'tag_filter', 'query', 'query_top20', 'list_top20', 'pending_top20', 'due_within', 'due_count']
+
+
+def generate_todos(size, seed=0):
+    """재현 가능한 합성 할 일 목록을 만든다."""
+    rng = random.Random(seed)
+    today = datetime.now().date()
+    todos = []
+    for i in range(size):
+        todo = {
+            'id': i + 1,
+            'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))) + f' {i}',
+            'completed': rng.random() < 0.2,
+            'priority': rng.choice(PRIORITIES),
+            'tags': rng.sample(TAGS, rng.randint(0, 2)),
+        }
+        if rng.random() < 0.7:
+            todo['due_date'] = (today + timedelta(days=rng.randint(-30, 60))).strftime('%Y-%m-%d')
+        todos.append(todo)
+    return todos
+
+def _time(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def _run_size(size, repeat, seed):
+    # 데이터 디렉터리(TODO_DIR)는 부모 프로세스가 정하며, 모듈은 이 프로세스에서 처음 불러옴
+    sys.path.insert(0, SRC_DIR)
+    from cli_todo_kor.core import add_todo, complete_todo, delete_todo
+    from cli_todo_kor.display import list_todos, list_due
+    from cli_todo_kor.undo import push_undo, pop_undo
+    from cli_todo_kor.storage import get_storage
+    from cli_todo_kor.utils import TODO_FILE, TODO_STORAGE, load_todos, log_command
+
+    with open(TODO_FILE, 'w', encoding='utf-8') as f:
+        json.dump(generate_todos(size, seed), f, ensure_ascii=False)
+    results = {}
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        # 저장소 변환과 색인 생성은 측정에서 제외
+        load_todos()
+        list_todos(search_term='회의')
+        list_todos(tag_filter=['업무'])
+        list_due(count_only=True)
+
+        results['load'] = _time(load_todos, repeat)
+        # 시작 캐시 없이 저장 파일을 해석하는 경우 (json/log 저장소)
+        cache = getattr(get_storage(), 'cache', None)
+        if cache is not None and TODO_STORAGE in ('json', 'log'):
+            results['load_cold'] = _time(lambda: (cache.invalidate(), load_todos()), repeat)
+        results['add'] = _time(lambda: add_todo('벤치마크 할 일 추가', '7', 'h', ['업무']), repeat)
+        # 화면 번호는 마지막 목록 기준이므로 기본 목록을 출력해 두고, 반복마다 다른 항목을 대상으로 함
+        list_todos()
+        pending = iter(range(size))
+        results['complete'] = _time(lambda: complete_todo(next(pending)), repeat)
+        # 여러 번호를 한 번에 삭제 (반복마다 겹치지 않는 범위)
+        delete_count = max(1, min(100, size // (repeat * 2)))
+        batches = iter(range(size // 2, size, delete_count))
+
+        def delete_batch():
+            start = next(batches)
+            delete_todo(list(range(start, start + delete_count)))
+        results['delete_many'] = _time(delete_batch, repeat)
+        for sort_by in SORTS:
+            results[f'list_{sort_by}'] = _time(lambda: list_todos(sort_by=sort_by), repeat)
+        results['search'] = _time(lambda: list_todos(search_term='회의 준비'), repeat)
+        results['tag_filter'] = _time(lambda: list_todos(tag_filter=['업무', 'and', 'not', '보류']), repeat)
+        results['query'] = _time(lambda: list_todos(query='status:pending tag:업무 due<7d text:회의'), repeat)
+        results['query_top20'] = _time(lambda: list_todos(query='status:pending tag:업무 due<7d', limit=20), repeat)
+        results['list_top20'] = _time(lambda: list_todos(limit=20), repeat)
+        results['pending_top20'] = _time(lambda: list_todos(status_filter='pending', limit=20), repeat)
+        results['due_within'] = _time(lambda: list_due(within=3), repeat)
+        results['due_count'] = _time(lambda: list_due(overdue=True, count_only=True), repeat)
+
+        todo = load_todos()[0]
+        op = [{'op': 'update', 'index': 0, 'before': todo, 'after': dict(todo, completed=not todo['completed'])}]
+        results['push_undo'] = _time(lambda: push_undo(op), repeat)
+        results['pop_undo'] = _time(pop_undo, repeat)
+        args = argparse.Namespace(description='벤치마크', due_date=None, priority='m', tags=None)
+        results['log_command'] = _time(lambda: log_command('add', args), repeat)
+    return results
+
+def run(sizes, storage, repeat, seed):
+    results = {}
+    ctx = multiprocessing.get_context('spawn')
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            os.environ['TODO_DIR'] = data_dir
+            os.environ['TODO_STORAGE'] = storage
+            os.environ['TODO_NO_DAEMON'] = '1'
+            with ctx.Pool(1) as pool:
+                results[str(size)] = pool.apply(_run_size, (size, repeat, seed))
+        print(f"크기 {size}:")
+        for name, seconds in results[str(size)].items():
+            print(f"  {name:<18} {seconds * 1000:10.2f} ms")
+    return results
+
+def compare(results, baseline, threshold, min_delta=0.001):
+    """기준보다 threshold배 이상 느려진 (크기, 작업, 기준, 현재) 목록.
+
+    차이가 min_delta초보다 작은 경우는 측정 오차로 보고 제외한다.
+    """
+    slower = []
+    for size, ops in results.items():
+        for name, seconds in ops.items():
+            base = baseline.get(size, {}).get(name)
+            if base and seconds > base * threshold and seconds - base >= min_delta:
+                slower.append((size, name, base, seconds))
+    return slower
+
+def main():
+    parser = argparse.ArgumentParser(description="할 일 엔진 벤치마크")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="할 일 개수 목록 (쉼표로 구분, 기본값: 1000,10000,100000)")
+    parser.add_argument("--storage", choices=['json', 'log', 'sqlite', 'columnar'], default='json', help="저장 방식 (기본값: json)")
+    parser.add_argument("--repeat", type=int, default=5, help="작업별 반복 횟수, 중앙값 사용 (기본값: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 데이터 난수 시드")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--compare", metavar="BASELINE", help="비교할 기준 결과 JSON 파일")
+    parser.add_argument("--against", choices=['json', 'log', 'sqlite', 'columnar'],
+                        help="같은 데이터로 함께 측정해 조회 작업을 비교할 저장 방식")
+    parser.add_argument("--threshold", type=float, default=1.25, help="느려짐으로 판단할 배율 (기본값: 1.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="이보다 작은 차이는 무시 (기본값: 1.0)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = run(sizes, args.storage, args.repeat, args.seed)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'storage': args.storage,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과를 {args.output}에 저장했습니다.")
+
+    status = 0
+    if args.against:
+        print(f"비교 저장 방식 {args.against}:")
+        reference = run(sizes, args.against, args.repeat, args.seed)
+        queries = {size: {name: ops[name] for name in QUERY_OPS if name in ops} for size, ops in results.items()}
+        slower = compare(queries, reference, args.threshold, args.min_delta_ms / 1000)
+        for size, name, base, seconds in slower:
+            print(f"{args.against}보다 느림: 크기 {size} {name} {base * 1000:.2f} ms -> {seconds * 1000:.2f} ms "
+                  f"({seconds / base:.2f}배)")
+        if slower:
+            status = 1
+        else:
+            print(f"{args.against} 대비 {args.threshold}배 이상 느린 조회 작업이 없습니다.")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('storage') != args.storage:
+            print("경고: 기준 결과와 저장 방식이 다릅니다.")
+        slower = compare(results, baseline['results'], args.threshold, args.min_delta_ms / 1000)
+        for size, name, base, seconds in slower:
+            print(f"느려짐: 크기 {size} {name} {base * 1000:.2f} ms -> {seconds * 1000:.2f} ms ({seconds / base:.2f}배)")
+        if slower:
+            return 1
+        print(f"기준 대비 {args.threshold}배 이상 느려진 작업이 없습니다.")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
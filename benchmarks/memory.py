@@ -0,0 +1,107 @@
+"""메모리 사용량 벤치마크.
+
+합성 할 일 목록(기본 10만 개)을 todos.json으로 만들고, 불러와서 우선순위 정렬 보기를
+만들 때의 최대 RSS, tracemalloc 최대/유지 할당량, 남아 있는 메모리 블록 수를 측정한다.
+
+    dict: 이전 방식. json.loads로 읽은 dict 목록을 정렬하면서 항목마다 dict를 복사
+    todo: 저장소가 읽은 Todo(__slots__) 목록과 위치 배열(array('i'))로 된 정렬 보기
+
+측정마다 새 프로세스를 사용하므로 결과가 서로 영향을 주지 않는다.
+
+    python benchmarks/memory.py
+    python benchmarks/memory.py --size 1000000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from functools import lru_cache
+
+from engine import SRC_DIR, generate_todos
+
+MODES = ['dict', 'todo']
+
+
+def _dict_model(path):
+    # 이전 방식: dict 목록을 읽고 정렬 결과로 original_index가 붙은 복사본을 만듦
+    with open(path, 'rb') as f:
+        todos = json.loads(f.read())
+    priority_map = {'높음': 0, '중간': 1, '낮음': 2}
+    today = datetime.now().date().toordinal()
+    due_ordinal = lru_cache(maxsize=4096)(lambda text: datetime.strptime(text, '%Y-%m-%d').toordinal())
+    view = [dict(todo, original_index=i) for i, todo in enumerate(todos)]
+
+    def sort_key(x):
+        due = None
+        if 'due_date' in x and not x['completed']:
+            due = due_ordinal(x['due_date'])
+        return (x['completed'], not (due is not None and due < today), priority_map.get(x['priority'], 1),
+                due is None, due or 0, x['original_index'])
+    view.sort(key=sort_key)
+    return todos, view
+
+def _todo_model(path):
+    from cli_todo_kor.storage import JsonStorage
+    from cli_todo_kor.utils import select_todos
+    todos = JsonStorage(path).load()
+    return todos, select_todos(todos)[0]
+
+def _measure(mode, path, trace):
+    sys.path.insert(0, SRC_DIR)
+    import cli_todo_kor.utils  # noqa: F401  (모듈을 불러오는 데 쓰는 메모리는 제외)
+    if trace:
+        tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    todos, view = (_dict_model if mode == 'dict' else _todo_model)(path)
+    elapsed = time.perf_counter() - start
+    result = {'blocks': sys.getallocatedblocks() - blocks, 'seconds': elapsed}
+    if trace:
+        result['traced_current'], result['traced_peak'] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    # Linux는 KB, macOS는 바이트 단위
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result['max_rss'] = maxrss if sys.platform == 'darwin' else maxrss * 1024
+    assert len(view) == len(todos)
+    return result
+
+def run(size, seed):
+    results = {}
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ['TODO_DIR'] = data_dir
+        path = os.path.join(data_dir, 'todos.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(generate_todos(size, seed), f, indent=4, ensure_ascii=False)
+        for mode in MODES:
+            with ctx.Pool(1) as pool:
+                result = pool.apply(_measure, (mode, path, False))
+            with ctx.Pool(1) as pool:
+                traced = pool.apply(_measure, (mode, path, True))
+            result['traced_current'], result['traced_peak'] = traced['traced_current'], traced['traced_peak']
+            results[mode] = result
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="메모리 사용량 벤치마크")
+    parser.add_argument("--size", type=int, default=100000, help="할 일 개수 (기본값: 100000)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 데이터 난수 시드")
+    args = parser.parse_args()
+
+    results = run(args.size, args.seed)
+    print(f"크기 {args.size}:")
+    print(f"  {'방식':<6} {'최대 RSS':>10} {'할당 최대':>10} {'유지':>10} {'남은 블록':>10} {'시간':>8}")
+    for mode, r in results.items():
+        print(f"  {mode:<6} {r['max_rss'] / 2**20:7.1f} MB {r['traced_peak'] / 2**20:7.1f} MB "
+              f"{r['traced_current'] / 2**20:7.1f} MB {r['blocks']:10d} {r['seconds'] * 1000:5.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
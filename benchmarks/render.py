@@ -0,0 +1,59 @@
+"""목록 표 출력 시간 측정.
+
+합성 할 일 목록(한글 설명, 태그, 마감 기한)을 `todo list`와 같은 표로
+만드는 시간(열 너비 계산과 행 서식)을 잰다. 저장소는 거치지 않는다.
+처음 출력의 중앙값이 기준값(--max-ms, 기본 150 ms)을 넘으면 종료 코드 1을 반환한다.
+
+    python benchmarks/render.py --rows 10000
+    python benchmarks/render.py --rows 100000 --max-ms 0   # 기준값 검사 안 함
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from engine import generate_todos  # noqa: E402
+from cli_todo_kor import display  # noqa: E402
+from cli_todo_kor.model import as_todos  # noqa: E402
+
+
+def render_ms(todos, summary, today, width, cold):
+    os.environ['COLUMNS'] = str(width)
+    if cold:
+        # 문자열 너비와 태그 열 캐시를 비우고 처음 출력하는 경우를 측정
+        for cached in (display.display_width, display._tags_text, display._fit_repeated):
+            cached.cache_clear()
+    start = time.perf_counter()
+    display._render_todos(todos, summary, today, 0, len(todos))
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="목록 표 출력 시간 측정")
+    parser.add_argument("--rows", type=int, default=10000, help="출력할 할 일 수 (기본값: 10000)")
+    parser.add_argument("--runs", type=int, default=5, help="반복 횟수 (기본값: 5)")
+    parser.add_argument("--width", type=int, default=100, help="터미널 너비 (기본값: 100)")
+    parser.add_argument("--max-ms", type=float, default=150.0,
+                        help="처음 출력(너비 캐시 없음) 시간의 기준값 (기본값: 150, 0이면 검사 안 함)")
+    args = parser.parse_args()
+
+    todos = as_todos(generate_todos(args.rows))
+    today = datetime.now().date()
+    summary = (len(todos), sum(1 for todo in todos if not todo.completed), 0)
+    cold = statistics.median(render_ms(todos, summary, today, args.width, True) for _ in range(args.runs))
+    warm = statistics.median(render_ms(todos, summary, today, args.width, False) for _ in range(args.runs))
+
+    print(f"{args.rows}개 표 출력 (너비 {args.width}): 처음 {cold:.1f} ms, 반복 {warm:.1f} ms")
+    if args.max_ms and cold > args.max_ms:
+        print(f"출력 시간이 기준값({args.max_ms} ms)을 넘었습니다.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
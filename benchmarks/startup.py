@@ -0,0 +1,84 @@
+"""CLI 시작 시간 측정.
+
+`python -X importtime`으로 모듈 불러오기 시간을 확인하고, 임시 데이터
+디렉터리에서 `todo list`를 여러 번 새로 실행해 중앙값을 구한다.
+기준값(--max-ms, 기본 45 ms / --max-import-ms, 기본 20 ms)을 넘으면
+종료 코드 1을 반환하므로 시작 속도가 느려졌는지 확인하는 데 사용할 수
+있다. 기준값을 0으로 주면 해당 검사를 하지 않는다.
+
+    python benchmarks/startup.py --runs 20 --max-ms 80
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+
+def _env(data_dir):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = SRC_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    env['TODO_DIR'] = data_dir
+    env['TODO_NO_DAEMON'] = '1'
+    return env
+
+def _median_ms(args, env, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def import_times(env, top=10):
+    """(누적 시간 ms, 모듈 이름) 목록을 누적 시간이 큰 순서로 반환한다."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import cli_todo_kor.todo'],
+        env=env, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative) / 1000, name.strip()))
+    total = next((ms for ms, name in rows if name == 'cli_todo_kor.todo'), 0.0)
+    return total, sorted(rows, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description="todo CLI 시작 시간 측정")
+    parser.add_argument("--runs", type=int, default=10, help="반복 실행 횟수 (기본값: 10)")
+    parser.add_argument("--max-ms", type=float, default=45.0,
+                        help="'todo list' 실행 시간(인터프리터 시작 제외) 기준값 (기본값: 45, 0이면 검사 안 함)")
+    parser.add_argument("--max-import-ms", type=float, default=20.0,
+                        help="cli_todo_kor.todo 불러오기 시간 기준값 (기본값: 20, 0이면 검사 안 함)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = _env(data_dir)
+        import_total, slowest = import_times(env)
+        baseline = _median_ms([sys.executable, '-c', 'pass'], env, args.runs)
+        list_ms = _median_ms([sys.executable, '-m', 'cli_todo_kor.todo', 'list'], env, args.runs)
+
+    print(f"cli_todo_kor.todo 불러오기: {import_total:.1f} ms")
+    for ms, name in slowest:
+        print(f"  {ms:8.1f} ms  {name}")
+    print(f"python -c pass       : {baseline:.1f} ms")
+    print(f"todo list            : {list_ms:.1f} ms (인터프리터 제외 {list_ms - baseline:.1f} ms)")
+
+    failed = False
+    if args.max_import_ms and import_total > args.max_import_ms:
+        print(f"불러오기 시간이 기준값({args.max_import_ms} ms)을 넘었습니다.")
+        failed = True
+    if args.max_ms and list_ms - baseline > args.max_ms:
+        print(f"실행 시간이 기준값({args.max_ms} ms)을 넘었습니다.")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
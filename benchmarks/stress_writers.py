@@ -0,0 +1,117 @@
+"""여러 프로세스가 동시에 할 일을 저장할 때 변경이 사라지지 않는지 확인한다.
+
+임시 데이터 디렉터리에서 --writers개의 프로세스가 각각 --ops개의 할 일을
+추가하고 그중 일부에 태그를 더한다. 모두 끝난 뒤 할 일 개수, id 중복,
+수정된 할 일 수, 실행 취소 저널 항목 수와 명령어 기록 파일을 검사한다.
+
+    python benchmarks/stress_writers.py --writers 8 --ops 25 --storage log
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+
+def _writer(writer_id, ops, start_event):
+    # 환경 변수는 부모 프로세스에서 설정되며, 모듈은 자식 프로세스에서 처음 불러옴
+    sys.path.insert(0, SRC_DIR)
+    from cli_todo_kor.core import add_todo, _transact
+    from cli_todo_kor.utils import log_command
+
+    def tag_todo(description):
+        # 불러온 목록에서 대상을 찾아 수정 (다른 작업자의 저장과 겹치면 다시 시도됨)
+        def apply(todos):
+            for position, todo in enumerate(todos):
+                if todo['description'] == description:
+                    before = dict(todo)
+                    todo['tags'] = todo['tags'] + ['수정']
+                    return [{'op': 'update', 'index': position, 'before': before, 'after': dict(todo)}],
+            return [],
+        _transact(apply)
+
+    start_event.wait()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for i in range(ops):
+            description = f"작업자{writer_id} 할 일 {i}"
+            add_todo(description, tags=[f"w{writer_id}"])
+            log_command('add', argparse.Namespace(description=description))
+            if i % 5 == 4:
+                tag_todo(description)
+
+def _load_results():
+    sys.path.insert(0, SRC_DIR)
+    from cli_todo_kor.utils import load_todos, get_command_history
+    # 부모 프로세스는 cli_todo_kor를 불러오지 않으므로 dict로 돌려줌
+    return [todo.to_dict() for todo in load_todos()], get_command_history()
+
+def run(writers, ops, storage):
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ['TODO_DIR'] = data_dir
+        os.environ['TODO_STORAGE'] = storage
+        os.environ['TODO_UNDO_DEPTH'] = str(writers * ops * 2)
+        os.environ['TODO_UNDO_COMPACT_BYTES'] = str(1 << 30)
+        os.environ['TODO_HISTORY_LIMIT'] = str(writers * ops)
+        os.environ['TODO_HISTORY_SEGMENT_BYTES'] = '4096'
+        os.environ['TODO_NO_DAEMON'] = '1'
+
+        ctx = multiprocessing.get_context('spawn')
+        start_event = ctx.Event()
+        procs = [ctx.Process(target=_writer, args=(n, ops, start_event)) for n in range(writers)]
+        for proc in procs:
+            proc.start()
+        time.sleep(0.5)  # 모든 프로세스가 준비된 뒤 동시에 시작
+        started = time.perf_counter()
+        start_event.set()
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - started
+
+        # 데이터 디렉터리는 모듈을 불러올 때 정해지므로 새 프로세스에서 읽음
+        with ctx.Pool(1) as pool:
+            todos, history = pool.apply(_load_results)
+        with open(os.path.join(data_dir, '.todos_undo.jsonl'), encoding='utf-8') as f:
+            journal = [line for line in f if line.strip()]
+
+    expected = writers * ops
+    edited = writers * (ops // 5)
+    problems = []
+    if any(proc.exitcode != 0 for proc in procs):
+        problems.append("일부 작업자가 오류로 종료됨")
+    if len(todos) != expected:
+        problems.append(f"할 일 개수 {len(todos)} (기대값 {expected})")
+    ids = [todo['id'] for todo in todos]
+    if len(set(ids)) != len(ids):
+        problems.append("중복된 id가 있음")
+    edited_count = sum(1 for todo in todos if '수정' in todo.get('tags', []))
+    if edited_count != edited:
+        problems.append(f"수정된 할 일 {edited_count}개 (기대값 {edited})")
+    if len(journal) != expected + edited:
+        problems.append(f"실행 취소 저널 항목 {len(journal)}개 (기대값 {expected + edited})")
+    if len(history) != expected:
+        problems.append(f"명령어 기록 {len(history)}개 (기대값 {expected})")
+
+    print(f"저장 방식: {storage}, 작업자 {writers}개 x {ops}개, {elapsed:.2f}초")
+    for problem in problems:
+        print(f"  실패: {problem}")
+    if not problems:
+        print("  통과")
+    return not problems
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 저장 스트레스 테스트")
+    parser.add_argument("--writers", type=int, default=8, help="동시에 실행할 프로세스 수 (기본값: 8)")
+    parser.add_argument("--ops", type=int, default=25, help="프로세스마다 추가할 할 일 수 (기본값: 25)")
+    parser.add_argument("--storage", choices=['json', 'log', 'sqlite', 'columnar', 'all'], default='all', help="저장 방식 (기본값: all)")
+    args = parser.parse_args()
+    storages = ['json', 'log', 'sqlite', 'columnar'] if args.storage == 'all' else [args.storage]
+    ok = all([run(args.writers, args.ops, storage) for storage in storages])
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
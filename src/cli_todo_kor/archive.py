@@ -0,0 +1,78 @@
+import gzip
+import json
+import os
+
+from .utils import TODO_DIR
+from .locking import atomic_open
+from .model import json_default
+from . import profiling
+
+# 오래전에 완료된 할 일을 옮겨 두는 보관소. 보관할 때마다 gzip으로 압축한 JSON Lines 구간 파일을
+# 하나씩 추가하고 기존 파일은 수정하지 않는다. 보관된 항목은 'todo list --archived'에서만 읽는다.
+ARCHIVE_DIR = os.path.join(TODO_DIR, 'archive')
+ARCHIVE_META_FILE = os.path.join(ARCHIVE_DIR, 'meta.json')
+# 완료한 지 이 일수가 지난 할 일을 보관 (TODO_ARCHIVE_DAYS 환경 변수로 조정 가능)
+ARCHIVE_DAYS = int(os.environ.get('TODO_ARCHIVE_DAYS', 30))
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.jsonl.gz'
+
+
+def _read_meta():
+    try:
+        with open(ARCHIVE_META_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'max_id': 0}
+
+def max_archived_id():
+    """보관된 항목의 가장 큰 id. 새 할 일이 보관된 항목의 id를 다시 쓰지 않도록 사용한다."""
+    return _read_meta().get('max_id', 0)
+
+def _segments():
+    # 구간 파일 경로를 보관한 순서대로 반환
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    names = sorted(name for name in os.listdir(ARCHIVE_DIR)
+                   if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX))
+    return [os.path.join(ARCHIVE_DIR, name) for name in names]
+
+def write_segment(items):
+    """items를 새 구간 파일로 기록한다. 호출하는 쪽에서 write_lock을 잡고 있어야 한다."""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    segments = _segments()
+    sequence = int(os.path.basename(segments[-1])[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1 if segments else 1
+    path = os.path.join(ARCHIVE_DIR, f"{SEGMENT_PREFIX}{sequence:06d}{SEGMENT_SUFFIX}")
+    # 구간 파일보다 메타 정보를 먼저 기록 (중간에 중단되어도 max_id가 작게 남지 않음)
+    meta = _read_meta()
+    meta['max_id'] = max([meta.get('max_id', 0)] + [item.get('id', 0) for item in items])
+    with atomic_open(ARCHIVE_META_FILE) as f:
+        json.dump(meta, f)
+    with atomic_open(path, 'wb') as f:
+        with gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as gz:
+            for item in items:
+                gz.write((json.dumps(item, ensure_ascii=False, default=json_default) + '\n').encode('utf-8'))
+    profiling.add_file_bytes('written', path)
+    return path
+
+def iter_archived():
+    """보관된 항목을 구간 파일 순서대로 하나씩 읽는다."""
+    for path in _segments():
+        profiling.add_file_bytes('read', path)
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+@profiling.timed('archive.load')
+def load_archived(hot_ids=()):
+    """보관된 항목 목록 (최근에 보관한 것부터).
+
+    같은 id가 여러 번 보관되었으면 마지막 것만 남기고, 실행 취소로 다시 목록에 돌아온
+    항목(hot_ids에 있는 id)은 제외한다.
+    """
+    latest = {}
+    for item in iter_archived():
+        latest.pop(item.get('id'), None)
+        latest[item.get('id')] = item
+    hot_ids = set(hot_ids)
+    return [item for todo_id, item in reversed(latest.items()) if todo_id not in hot_ids]
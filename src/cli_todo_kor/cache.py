@@ -0,0 +1,109 @@
+import gc
+import marshal
+import os
+import sys
+from array import array
+
+from .model import Todo, todos_from_records
+from . import profiling
+
+# 시작 캐시. 파싱한 할 일 목록과 정렬 기준별 전체 순서(위치 배열)를 marshal로 저장해 두고,
+# 저장 파일의 서명(수정 시각, 크기, inode)이 같으면 JSON을 다시 해석하거나 정렬하지 않고 그대로 사용한다.
+# 언제든 다시 만들 수 있으므로 서명이 다르거나 읽을 수 없으면 무시한다.
+# 파일 이름은 저장 방식마다 따로 둠 (json/log는 '.todos_cache', SQLite는 '.sqlite_cache')
+CACHE_NAME = '.{}_cache'
+ORDER_CACHE_NAME = '.{}_order_cache'
+# marshal 형식은 파이썬 버전마다 다를 수 있으므로 버전도 함께 확인
+_FORMAT = (1, sys.hexversion)
+
+
+class WarmCache:
+    """directory에 있는 시작 캐시 파일 두 개 (할 일 목록, 정렬 순서).
+
+    각 파일은 (형식, 서명) 헤더 뒤에 내용을 기록하므로 서명이 다르면 내용은 읽지 않는다.
+    name은 저장 방식 이름으로, 다른 저장 방식이 같은 디렉터리에 남긴 캐시를 읽지 않도록 파일 이름에 넣는다.
+    """
+
+    def __init__(self, directory, name='todos'):
+        self.path = os.path.join(directory, CACHE_NAME.format(name))
+        self.order_path = os.path.join(directory, ORDER_CACHE_NAME.format(name))
+
+    def _read(self, path, signature):
+        if signature is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                # 헤더만 먼저 읽고, 내용은 한 번에 읽어 해석 (파일에서 바로 marshal.load하면 조금씩 읽어 느림)
+                if marshal.load(f) != (_FORMAT, signature):
+                    return None
+                content = f.read()
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        try:
+            return marshal.loads(content)
+        except (EOFError, ValueError, TypeError):
+            return None
+
+    def _write(self, path, signature, content):
+        from .locking import atomic_open
+        if signature is None:
+            return
+        try:
+            # 언제든 다시 만들 수 있으므로 디스크 동기화는 생략
+            with atomic_open(path, 'wb', fsync=False) as f:
+                marshal.dump((_FORMAT, signature), f)
+                marshal.dump(content, f)
+        except ValueError:
+            pass  # marshal로 저장할 수 없는 값(다른 필드)이 있으면 캐시하지 않음
+        else:
+            profiling.add_file_bytes('written', path)
+
+    @profiling.timed('cache.read')
+    def load(self, signature):
+        """서명이 같으면 캐시된 할 일 목록(Todo), 아니면 None."""
+        # 튜플이 많이 생기는 동안 순환 참조 수집(gc)이 반복해서 돌지 않도록 잠시 멈춤
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            records = self._read(self.path, signature)
+        finally:
+            if enabled:
+                gc.enable()
+        if records is None:
+            return None
+        profiling.add_file_bytes('read', self.path)
+        return todos_from_records(records)
+
+    @profiling.timed('cache.write')
+    def store(self, signature, todos):
+        """signature인 저장 파일의 내용으로 목록을 저장한다. 이전 정렬 순서는 버린다."""
+        self._remove(self.order_path)
+        self._write(self.path, signature,
+                    [(todo if isinstance(todo, Todo) else Todo.from_dict(todo)).record() for todo in todos])
+
+    def order(self, signature, sort_by, day=None):
+        """sort_by의 전체 정렬 순서(array('i')). day는 날짜에 따라 달라지는 정렬(우선순위)의 기준일."""
+        orders = self._read(self.order_path, signature)
+        entry = orders.get(sort_by) if orders else None
+        if entry is None or entry[0] != day:
+            return None
+        positions = array('i')
+        positions.frombytes(entry[1])
+        return positions
+
+    def store_order(self, signature, sort_by, positions, day=None):
+        orders = self._read(self.order_path, signature) or {}
+        orders[sort_by] = (day, array('i', positions).tobytes())
+        self._write(self.order_path, signature, orders)
+
+    def invalidate(self):
+        """저장 파일을 바꾸기 전에 호출해 캐시를 모두 지운다."""
+        self._remove(self.path)
+        self._remove(self.order_path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,283 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import compress
+
+from .model import Todo, _intern_tags
+
+# 열 단위 이진 파일(todos.col) 형식. 목록 필터와 요약은 필요한 열만 읽고, 설명은 출력할 행만 디코딩한다.
+#
+#   헤더     매직, 바이트 순서, 항목 수, 미완료 수
+#   목차     구역마다 (시작 위치, 길이) — 구역은 8바이트 경계에 맞춤
+#   구역     ids(q) completed(B) priority(B) due(i, 없으면 0) tag_offsets(I) tag_ids(I) tag_names(JSON)
+#            text_offsets(q) text(UTF-8 문자열 힙) due_counts(i, 미완료 항목의 [서수, 개수]...) extra(JSON)
+#
+# 태그는 태그 이름 표의 번호로 저장하며 i번째 항목의 태그 번호는 tag_ids[tag_offsets[i]:tag_offsets[i + 1]]이다.
+# 날짜 형식이 아닌 마감 기한과 completed_at 같은 나머지 필드는 {위치: 필드} JSON으로 extra 구역에 둔다.
+MAGIC = b'TODOCOL1'
+_HEADER = struct.Struct('<8sB3xII')
+_ENTRY = struct.Struct('<QQ')
+_SECTIONS = ('ids', 'completed', 'priority', 'due', 'tag_offsets', 'tag_ids', 'tag_names',
+             'text_offsets', 'text', 'due_counts', 'extra')
+# 숫자 열의 배열 형식 (나머지 구역은 바이트 그대로)
+_TYPECODES = {'ids': 'q', 'due': 'i', 'tag_offsets': 'I', 'tag_ids': 'I', 'text_offsets': 'q', 'due_counts': 'i'}
+_BYTE_ORDERS = ('little', 'big')
+# 완료 열(0/1)을 뒤집어 미완료 위치를 고를 때 사용
+_NOT = bytes([1, 0]) + bytes(254)
+
+
+class ColumnFormatError(ValueError):
+    """컬럼 파일이 손상되었거나 형식이 다른 경우."""
+
+
+def write_columns(f, todos):
+    """할 일 목록(Todo 또는 dict)을 컬럼 파일 형식으로 f(바이너리 모드)에 쓴다."""
+    ids = array('q')
+    completed = bytearray()
+    priority = bytearray()
+    due = array('i')
+    tag_offsets = array('I', [0])
+    tag_ids = array('I')
+    tag_numbers = {}
+    text_offsets = array('q', [0])
+    texts = []
+    text_size = 0
+    due_counts = {}
+    extra = {}
+    pending = 0
+    for position, todo in enumerate(todos):
+        if not isinstance(todo, Todo):
+            todo = Todo.from_dict(todo)
+        ids.append(todo.id if todo.id is not None else 0)
+        completed.append(todo.completed)
+        priority.append(todo.priority_code)
+        # 날짜 서수는 1부터 시작하므로 0을 '마감 기한 없음'으로 사용
+        due.append(todo.due_ordinal or 0)
+        for tag in todo.tags:
+            tag_ids.append(tag_numbers.setdefault(tag, len(tag_numbers)))
+        tag_offsets.append(len(tag_ids))
+        encoded = todo.description.encode('utf-8')
+        texts.append(encoded)
+        text_size += len(encoded)
+        text_offsets.append(text_size)
+        if not todo.completed:
+            pending += 1
+            if todo.due_ordinal is not None:
+                due_counts[todo.due_ordinal] = due_counts.get(todo.due_ordinal, 0) + 1
+        if todo._extra or todo._due_text is not None:
+            fields = dict(todo._extra or {})
+            if todo._due_text is not None:
+                fields['due_date'] = todo._due_text
+            extra[position] = fields
+    sections = {
+        'ids': ids,
+        'completed': completed,
+        'priority': priority,
+        'due': due,
+        'tag_offsets': tag_offsets,
+        'tag_ids': tag_ids,
+        'tag_names': json.dumps(list(tag_numbers), ensure_ascii=False).encode('utf-8'),
+        'text_offsets': text_offsets,
+        'text': b''.join(texts),
+        'due_counts': array('i', [value for item in sorted(due_counts.items()) for value in item]),
+        'extra': json.dumps(extra, ensure_ascii=False).encode('utf-8') if extra else b'',
+    }
+    # 헤더와 목차 다음부터 구역을 차례로 배치
+    offset = _align(_HEADER.size + _ENTRY.size * len(_SECTIONS))
+    table = []
+    for name in _SECTIONS:
+        size = len(memoryview(sections[name]).cast('B'))
+        table.append((offset, size))
+        offset = _align(offset + size)
+    f.write(_HEADER.pack(MAGIC, _BYTE_ORDERS.index(sys.byteorder), len(ids), pending))
+    for entry in table:
+        f.write(_ENTRY.pack(*entry))
+    written = _HEADER.size + _ENTRY.size * len(_SECTIONS)
+    for name, (start, size) in zip(_SECTIONS, table):
+        f.write(bytes(start - written))
+        f.write(sections[name])
+        written = start + size
+    return len(ids)
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+class ColumnFile:
+    """mmap으로 연 컬럼 파일.
+
+    열은 복사하지 않고 매핑의 memoryview로 읽으며, 행 번호(위치)로 접근하면 필요한 열만 읽는 _Row를 돌려준다.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            # 파일 내용이 바뀌었는지 판단하기 위한 (수정 시각, 크기, inode) — storage._file_signature와 같음
+            self.signature = [st.st_mtime_ns, st.st_size, st.st_ino]
+            if st.st_size < _HEADER.size:
+                raise ColumnFormatError("컬럼 파일 헤더가 없습니다.")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._map)
+        magic, byte_order, self.count, self.pending = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or byte_order >= len(_BYTE_ORDERS):
+            self.close()
+            raise ColumnFormatError("컬럼 파일 형식이 아닙니다.")
+        swap = _BYTE_ORDERS[byte_order] != sys.byteorder
+        self._columns = {}
+        for i, name in enumerate(_SECTIONS):
+            start, size = _ENTRY.unpack_from(self._buffer, _HEADER.size + _ENTRY.size * i)
+            if start + size > st.st_size:
+                self.close()
+                raise ColumnFormatError("컬럼 파일이 잘렸습니다.")
+            column = self._buffer[start:start + size]
+            typecode = _TYPECODES.get(name)
+            if typecode and swap:
+                # 다른 바이트 순서로 기록된 파일은 해당 열만 복사해서 변환
+                column = array(typecode, column.tobytes())
+                column.byteswap()
+            elif typecode:
+                column = column.cast(typecode)
+            self._columns[name] = column
+        self.ids = self._columns['ids']
+        self.completed = self._columns['completed']
+        self.priority = self._columns['priority']
+        self.due = self._columns['due']
+        self._tag_offsets = self._columns['tag_offsets']
+        self._tag_ids = self._columns['tag_ids']
+        self._text_offsets = self._columns['text_offsets']
+        self._text = self._columns['text']
+        self._tag_names = None
+        self._extra = None
+        self._due_counts = None
+
+    def close(self):
+        # 열린 memoryview가 있으면 매핑을 닫을 수 없으므로 먼저 모두 해제
+        for column in getattr(self, '_columns', {}).values():
+            if isinstance(column, memoryview):
+                column.release()
+        self._columns = {}
+        self.ids = self.completed = self.priority = self.due = None
+        self._tag_offsets = self._tag_ids = self._text_offsets = self._text = None
+        self._buffer.release()
+        self._map.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        return _Row(self, position)
+
+    def __iter__(self):
+        for position in range(self.count):
+            yield _Row(self, position)
+
+    # --- 열 읽기
+
+    def positions(self, completed):
+        """완료 열만 읽어 완료(True) 또는 미완료(False) 항목의 위치 배열을 반환한다."""
+        flags = self.completed if completed else self.completed.tobytes().translate(_NOT)
+        return array('i', compress(range(self.count), flags))
+
+    def due_today(self, ordinal):
+        # 미완료 항목의 마감 기한별 개수 (헤더 다음의 작은 구역만 읽음)
+        if self._due_counts is None:
+            counts = self._columns['due_counts']
+            self._due_counts = dict(zip(counts[::2], counts[1::2]))
+        return self._due_counts.get(ordinal, 0)
+
+    def description(self, position):
+        offsets = self._text_offsets
+        return str(self._text[offsets[position]:offsets[position + 1]], 'utf-8')
+
+    def tags(self, position):
+        if self._tag_names is None:
+            self._tag_names = json.loads(str(self._columns['tag_names'], 'utf-8'))
+        names = self._tag_names
+        offsets = self._tag_offsets
+        return _intern_tags([names[number] for number in self._tag_ids[offsets[position]:offsets[position + 1]]])
+
+    def extra(self, position):
+        if self._extra is None:
+            content = self._columns['extra']
+            self._extra = {int(key): fields for key, fields in json.loads(str(content, 'utf-8')).items()} \
+                if len(content) else {}
+        return self._extra.get(position)
+
+    def todo(self, position):
+        """position의 행 전체를 Todo로 만든다. (설명은 이때 디코딩)"""
+        due = self.due[position]
+        todo = Todo(self.ids[position], self.description(position), self.completed[position] == 1,
+                    self.priority[position], self.tags(position), due or None)
+        fields = self.extra(position)
+        if fields:
+            for key, value in fields.items():
+                todo[key] = value
+        return todo
+
+    def todos(self):
+        return [self.todo(position) for position in range(self.count)]
+
+
+class _Row:
+    """조건 함수와 정렬 키에 넘기는 행. Todo와 같은 속성 이름으로 해당 열만 읽는다."""
+
+    __slots__ = ('_file', 'position')
+
+    def __init__(self, file, position):
+        self._file = file
+        self.position = position
+
+    @property
+    def id(self):
+        return self._file.ids[self.position]
+
+    @property
+    def completed(self):
+        return self._file.completed[self.position] == 1
+
+    @property
+    def priority_code(self):
+        return self._file.priority[self.position]
+
+    @property
+    def due_ordinal(self):
+        return self._file.due[self.position] or None
+
+    @property
+    def tags(self):
+        return self._file.tags(self.position)
+
+    @property
+    def description(self):
+        return self._file.description(self.position)
+
+
+def json_to_columnar(json_path, columns_path):
+    """todos.json(과 남은 변경 로그)의 내용을 컬럼 파일로 변환하고 항목 수를 반환한다."""
+    from .storage import LogStorage
+    from .locking import atomic_open
+    todos = LogStorage(json_path, json_path + '.log', append=False).load()
+    with atomic_open(columns_path, 'wb') as f:
+        return write_columns(f, todos)
+
+def columnar_to_json(columns_path, json_path):
+    """컬럼 파일의 내용을 todos.json 형식으로 변환하고 항목 수를 반환한다."""
+    from .locking import atomic_open
+    columns = ColumnFile(columns_path)
+    try:
+        todos = [todo.to_dict() for todo in columns.todos()]
+    finally:
+        columns.close()
+    from .cache import WarmCache
+    WarmCache(os.path.dirname(json_path)).invalidate()
+    with atomic_open(json_path) as f:
+        json.dump(todos, f, indent=4, ensure_ascii=False)
+    # 변환한 파일이 남은 로그로 다시 덮이지 않도록 제거
+    if os.path.exists(json_path + '.log'):
+        os.remove(json_path + '.log')
+    return len(todos)
@@ -1,109 +1,238 @@
-import os
-import json
+import random
+import time
 from datetime import datetime
-from platformdirs import user_data_dir
-from .utils import _parse_due_date, _parse_priority, load_todos, save_todos, _get_sorted_todos
+from .utils import (
+    _parse_due_date, _parse_priority, load_todos, save_todos, _resolve_display_indexes, _next_id, current_view,
+    write_lock, WriteConflict, TODO_WRITE_RETRIES, view_hint
+)
+from .model import Todo, _due_ordinal
+from . import profiling
 
 
+# 아래 _apply_* 함수들은 메모리의 todos 리스트만 변경하고
+# (변경 내역 ops, 출력할 메시지 목록, 성공 여부)를 반환한다.
+# 저장과 실행 취소 기록은 호출하는 쪽에서 한 번에 처리한다.
 
-
-
-def add_todo(description, due_date=None, priority='중간', tags=None):
-    from .undo import push_undo
-    push_undo()
-    todos = load_todos()
-    todo_item = {
+def _apply_add(todos, description, due_date=None, priority='중간', tags=None, todo_id=None):
+    # todo_id: 여러 개를 추가할 때 호출한 쪽이 한 번 구해 이어서 매기는 id (없으면 목록 전체에서 구함)
+    todo_item = Todo.from_dict({
+        "id": _next_id(todos) if todo_id is None else todo_id,
         "description": description,
         "completed": False,
         "priority": _parse_priority(priority),
         "tags": tags if tags is not None else []
-    }
+    })
     parsed_due_date = _parse_due_date(due_date)
     if parsed_due_date:
         todo_item["due_date"] = parsed_due_date
     todos.append(todo_item)
-    save_todos(todos)
-    print(f"할 일 추가: '{todo_item['description']}' (우선순위: {todo_item['priority']})")
+    ops = [{"op": "insert", "index": len(todos) - 1, "item": todo_item}]
+    return ops, [f"할 일 추가: '{todo_item['description']}' (우선순위: {todo_item['priority']})"], True
 
-def edit_todo(display_index, new_description=None, new_due_date=None, new_priority=None, new_tags=None):
-    from .undo import push_undo
-    push_undo()
-    todos = load_todos()
-    sorted_todos = _get_sorted_todos(todos)
-    if 0 <= display_index < len(sorted_todos):
-        target_todo = sorted_todos[display_index]
-        original_index = target_todo['original_index']
-        if new_description:
-            todos[original_index]['description'] = new_description
-            print(f"할 일 {display_index + 1}의 내용이 수정되었습니다.")
-        if new_due_date:
-            parsed_new_due_date = _parse_due_date(new_due_date)
-            if parsed_new_due_date:
-                todos[original_index]['due_date'] = parsed_new_due_date
-                print(f"할 일 {display_index + 1}의 마감 기한이 수정되었습니다.")
-        if new_priority:
-            parsed_new_priority = _parse_priority(new_priority)
-            if parsed_new_priority:
-                todos[original_index]['priority'] = parsed_new_priority
-                print(f"할 일 {display_index + 1}의 우선순위가 수정되었습니다.")
-        if new_tags is not None:
-            todos[original_index]['tags'] = new_tags
-            print(f"할 일 {display_index + 1}의 태그가 수정되었습니다.")
-        save_todos(todos)
-    else:
-        print("유효하지 않은 할 일 번호입니다.")
+def _apply_edit(todos, display_index, new_description=None, new_due_date=None, new_priority=None, new_tags=None, view=None):
+    original_index = _resolve_display_indexes(todos, [display_index], view)[0]
+    if original_index is None:
+        return [], ["유효하지 않은 할 일 번호입니다." + view_hint()], False
+    messages = []
+    before = dict(todos[original_index])
+    if new_description:
+        todos[original_index]['description'] = new_description
+        messages.append(f"할 일 {display_index + 1}의 내용이 수정되었습니다.")
+    if new_due_date:
+        parsed_new_due_date = _parse_due_date(new_due_date)
+        if parsed_new_due_date:
+            todos[original_index]['due_date'] = parsed_new_due_date
+            messages.append(f"할 일 {display_index + 1}의 마감 기한이 수정되었습니다.")
+    if new_priority:
+        parsed_new_priority = _parse_priority(new_priority)
+        if parsed_new_priority:
+            todos[original_index]['priority'] = parsed_new_priority
+            messages.append(f"할 일 {display_index + 1}의 우선순위가 수정되었습니다.")
+    if new_tags is not None:
+        todos[original_index]['tags'] = new_tags
+        messages.append(f"할 일 {display_index + 1}의 태그가 수정되었습니다.")
+    ops = []
+    if todos[original_index] != before:
+        ops.append({"op": "update", "index": original_index, "before": before, "after": dict(todos[original_index])})
+    return ops, messages, True
 
-def complete_todo(display_index):
-    from .undo import push_undo
-    push_undo()
-    todos = load_todos()
-    sorted_todos = _get_sorted_todos(todos)
-    if 0 <= display_index < len(sorted_todos):
-        target_todo = sorted_todos[display_index]
-        original_index = target_todo['original_index']
-        if not todos[original_index]["completed"]:
-            todos[original_index]["completed"] = True
-            save_todos(todos)
-            print(f"할 일 '{todos[original_index]['description']}'을(를) 완료했습니다.")
-        else:
-            print(f"할 일 '{todos[original_index]['description']}'은(는) 이미 완료되었습니다.")
-    else:
-        print("유효하지 않은 할 일 번호입니다.")
+def _apply_complete(todos, display_index, view=None):
+    original_index = _resolve_display_indexes(todos, [display_index], view)[0]
+    if original_index is None:
+        return [], ["유효하지 않은 할 일 번호입니다." + view_hint()], False
+    if todos[original_index]["completed"]:
+        return [], [f"할 일 '{todos[original_index]['description']}'은(는) 이미 완료되었습니다."], True
+    before = dict(todos[original_index])
+    todos[original_index]["completed"] = True
+    # 보관 기준일 계산에 사용
+    todos[original_index]["completed_at"] = datetime.now().strftime('%Y-%m-%d')
+    ops = [{"op": "update", "index": original_index, "before": before, "after": dict(todos[original_index])}]
+    return ops, [f"할 일 '{todos[original_index]['description']}'을(를) 완료했습니다."], True
 
-def delete_todo(display_indexes):
-    from .undo import push_undo
-    push_undo()
-    todos = load_todos()
-    sorted_todos = _get_sorted_todos(todos)
+def _apply_delete(todos, display_indexes, view=None):
     unique_indexes = sorted(set(display_indexes), reverse=True)
     deleted = []
     invalid = []
-    for display_index in unique_indexes:
-        if 0 <= display_index < len(sorted_todos):
-            target_todo = sorted_todos[display_index]
-            original_index = target_todo['original_index']
-            deleted.append(todos[original_index]['description'])
-            todos.pop(original_index)
-            for t in sorted_todos:
-                if t['original_index'] > original_index:
-                    t['original_index'] -= 1
-        else:
+    removed_positions = set()
+    for display_index, position in zip(unique_indexes, _resolve_display_indexes(todos, unique_indexes, view)):
+        if position is None or position in removed_positions:
             invalid.append(display_index+1)
-    save_todos(todos)
+        else:
+            removed_positions.add(position)
+            deleted.append(todos[position]['description'])
+    # 뒤에서부터 제거하는 순서로 기록해야 위치가 순서대로 적용됨
+    ops = [{"op": "remove", "index": position, "item": todos[position]}
+           for position in sorted(removed_positions, reverse=True)]
+    # 한 번의 순회로 남길 항목만 모음 (호출한 쪽의 리스트를 그대로 갱신)
+    todos[:] = [todo for i, todo in enumerate(todos) if i not in removed_positions]
+    messages = []
     if deleted:
-        print(f"할 일 삭제: {', '.join([f'\'{d}\'' for d in deleted])}")
+        messages.append("할 일 삭제: " + ', '.join(f"'{d}'" for d in deleted))
     if invalid:
-        print(f"유효하지 않은 할 일 번호: {', '.join(map(str, invalid))}")
+        messages.append(f"유효하지 않은 할 일 번호: {', '.join(map(str, invalid))}" + view_hint())
+    return ops, messages, not invalid
 
-def clear_completed_todos():
+def _apply_clear_completed(todos):
+    # 뒤에서부터 제거해야 기록된 위치가 순서대로 적용됨
+    ops = [{"op": "remove", "index": i, "item": todos[i]}
+           for i in range(len(todos) - 1, -1, -1) if todos[i]['completed']]
+    if not ops:
+        return [], ["삭제할 완료된 할 일이 없습니다."], True
+    todos[:] = [todo for todo in todos if not todo['completed']]
+    return ops, [f"완료된 할 일 {len(ops)}개를 삭제했습니다."], True
+
+@profiling.timed('core.commit')
+def _commit(todos, ops):
     from .undo import push_undo
-    push_undo()
-    todos = load_todos()
-    initial_count = len(todos)
-    todos = [todo for todo in todos if not todo['completed']]
-    cleared_count = initial_count - len(todos)
-    if cleared_count > 0:
-        save_todos(todos)
-        print(f"완료된 할 일 {cleared_count}개를 삭제했습니다.")
-    else:
-        print("삭제할 완료된 할 일이 없습니다.") 
\ No newline at end of file
+    if ops:
+        # 저장과 실행 취소 기록 사이에 다른 프로세스의 작업이 끼어들지 않도록 함께 잠금
+        with write_lock():
+            save_todos(todos, ops)
+            push_undo(ops)
+
+def _transact(apply):
+    """불러오기 -> apply(todos) -> 저장을 수행하고 apply의 결과를 반환한다.
+
+    저장하기 전에 다른 프로세스가 먼저 저장했다면 다시 불러와 처음부터 적용한다.
+    TODO_WRITE_RETRIES번 모두 충돌하면 마지막에는 잠금을 잡은 채로 실행한다.
+    apply의 결과는 (ops, ...) 형태여야 한다.
+    """
+    for attempt in range(TODO_WRITE_RETRIES):
+        todos = load_todos()
+        with profiling.phase('core.apply'):
+            result = apply(todos)
+        try:
+            _commit(todos, result[0])
+            return result
+        except WriteConflict:
+            profiling.count('write_conflicts')
+            time.sleep(random.uniform(0, 0.005 * (attempt + 1)))
+    with write_lock():
+        todos = load_todos()
+        with profiling.phase('core.apply'):
+            result = apply(todos)
+        _commit(todos, result[0])
+        return result
+
+def _run(apply, *args, **kwargs):
+    ops, messages, ok = _transact(lambda todos: apply(todos, *args, **kwargs))
+    for message in messages:
+        print(message)
+    return ok
+
+def add_todo(description, due_date=None, priority='중간', tags=None):
+    return _run(_apply_add, description, due_date, priority, tags)
+
+def edit_todo(display_index, new_description=None, new_due_date=None, new_priority=None, new_tags=None):
+    return _run(_apply_edit, display_index, new_description, new_due_date, new_priority, new_tags)
+
+def complete_todo(display_index):
+    return _run(_apply_complete, display_index)
+
+def delete_todo(display_indexes):
+    return _run(_apply_delete, display_indexes)
+
+def clear_completed_todos(archive=False):
+    if archive:
+        return archive_completed_todos(days=0)
+    return _run(_apply_clear_completed)
+
+def _apply_archive(todos, cutoff_ordinal):
+    # 완료일이 cutoff_ordinal보다 이전인 완료 항목을 제거 (완료일이 기록되기 전에 완료된 항목은 오래된 것으로 봄)
+    def is_old(todo):
+        if not todo['completed']:
+            return False
+        ordinal = _due_ordinal(todo['completed_at']) if 'completed_at' in todo else None
+        return ordinal is None or ordinal < cutoff_ordinal
+    ops = [{"op": "remove", "index": i, "item": todos[i]}
+           for i in range(len(todos) - 1, -1, -1) if is_old(todos[i])]
+    if not ops:
+        return [], ["보관할 완료된 할 일이 없습니다."], True
+    todos[:] = [todo for todo in todos if not is_old(todo)]
+    return ops, [f"완료된 할 일 {len(ops)}개를 보관했습니다."], True
+
+def archive_completed_todos(days=None):
+    """완료한 지 days일 이상 지난 할 일을 보관소로 옮긴다. days=0이면 완료된 할 일 전체.
+
+    보관소 기록과 목록 저장 사이에 다른 프로세스가 끼어들지 않도록 잠근 채로 처리하며,
+    실행 취소하면 목록으로 다시 돌아온다.
+    """
+    from .archive import ARCHIVE_DAYS, write_segment
+    days = ARCHIVE_DAYS if days is None else days
+    # 완료일이 오늘로부터 days일 이상 지난 항목
+    cutoff_ordinal = datetime.now().toordinal() - days + 1
+    with write_lock():
+        todos = load_todos()
+        ops, messages, ok = _apply_archive(todos, cutoff_ordinal)
+        if ops:
+            # 보관소에 먼저 기록 (중간에 중단되면 양쪽에 남고, 보관 목록에서는 제외됨)
+            write_segment([op['item'] for op in reversed(ops)])
+            _commit(todos, ops)
+    for message in messages:
+        print(message)
+    return ok
+
+def _apply_batch(todos, commands):
+    view = current_view(todos)
+    all_ops = []
+    results = []
+    # 새 id는 처음 추가할 때 한 번만 구하고 이어서 매김 (추가할 때마다 목록과 보관소를 훑지 않음)
+    next_id = None
+    for line_no, command, params in commands:
+        if command is None:
+            # 해석하지 못한 줄
+            ops, messages, ok = [], [params['error']], False
+        elif command == 'add':
+            if next_id is None:
+                next_id = _next_id(todos)
+            ops, messages, ok = _apply_add(todos, params['description'], params.get('due_date'),
+                                           params.get('priority', 'm'), params.get('tags'), todo_id=next_id)
+            next_id += 1
+        elif command == 'edit':
+            ops, messages, ok = _apply_edit(todos, params['index'] - 1, params.get('new_description'),
+                                            params.get('new_due_date'), params.get('new_priority'),
+                                            params.get('new_tags'), view=view)
+        elif command == 'complete':
+            ops, messages, ok = _apply_complete(todos, params['index'] - 1, view=view)
+        elif command == 'delete':
+            ops, messages, ok = _apply_delete(todos, [i - 1 for i in params['indexes']], view=view)
+        else:
+            ops, messages, ok = [], [f"지원하지 않는 명령어입니다: {command}"], False
+        all_ops.extend(ops)
+        results.append({'line': line_no, 'command': command, 'ok': ok, 'messages': messages})
+    return all_ops, results
+
+def run_batch(commands):
+    """여러 작업을 한 번의 불러오기/저장/실행 취소 기록으로 처리한다.
+
+    commands는 (줄 번호, 명령어, 인자 dict) 목록이다. 화면 번호는 모두
+    일괄 처리 시작 전에 마지막으로 출력한 목록을 기준으로 해석된다.
+    """
+    all_ops, results = _transact(lambda todos: _apply_batch(todos, commands))
+    return {
+        'total': len(results),
+        'succeeded': sum(1 for r in results if r['ok']),
+        'failed': sum(1 for r in results if not r['ok']),
+        'changes': len(all_ops),
+        'results': results,
+    }
@@ -0,0 +1,367 @@
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from datetime import datetime
+
+from .paths import SOCKET_FILE
+# 변경 후 파일에 기록하기까지 기다리는 시간(초). 그 사이의 변경은 한 번에 기록됨
+DAEMON_FLUSH_DELAY = float(os.environ.get('TODO_DAEMON_FLUSH_DELAY', 0.5))
+# 데몬으로 전달하지 않고 직접 실행하는 명령어 (확인 입력이 필요하거나 데몬 자체를 다루는 명령,
+# 파일이나 표준 입출력을 스트리밍하는 가져오기/내보내기, 파일 형식 변환)
+LOCAL_COMMANDS = {'daemon', 'delete', 'd', 'del', 'clear', 'clr', 'import', 'export', 'convert'}
+
+
+def _request(payload, timeout=1.0):
+    """데몬에 요청을 보내고 응답을 반환한다. 데몬이 없으면 None."""
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(SOCKET_FILE):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(timeout)
+        client.connect(SOCKET_FILE)
+        # 연결된 뒤에는 명령이 끝날 때까지 기다림
+        client.settimeout(None)
+        client.sendall(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n')
+        chunks = []
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    except OSError:
+        return None
+    finally:
+        client.close()
+    if not chunks:
+        return None
+    return json.loads(b''.join(chunks).decode('utf-8'))
+
+def _terminal_columns():
+    # 명령을 보낸 터미널의 너비 (데몬은 다른 터미널에서 실행 중일 수 있음). 알 수 없으면 0
+    try:
+        return int(os.environ['COLUMNS'])
+    except (KeyError, ValueError):
+        pass
+    try:
+        return os.get_terminal_size(sys.stdout.fileno()).columns
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+def forward_to_daemon(argv):
+    """데몬이 실행 중이면 명령을 전달하고 종료 코드를 반환한다. 직접 실행해야 하면 None."""
+    if os.environ.get('TODO_NO_DAEMON') or not os.path.exists(SOCKET_FILE):
+        return None
+    command = argv[0] if argv else 'list'
+    stdin = None
+    if command == 'batch':
+        # 작업 목록 파일을 생략했거나 '-'일 때만 표준 입력을 읽음
+        # (파일을 준 경우 물려받은 표준 입력은 닫히지 않을 수 있음)
+        operands = [arg for arg in argv[1:] if arg == '-' or not arg.startswith('-')]
+        if not operands or operands[0] == '-':
+            if sys.stdin.isatty():
+                command = 'batch-interactive'
+            else:
+                stdin = sys.stdin.read()
+    # 'list --watch'는 끝나지 않으므로 직접 실행해 저장 파일의 변경을 기다림
+    if command in LOCAL_COMMANDS or command == 'batch-interactive' or '--watch' in argv:
+        # 직접 실행하기 전에 데몬이 메모리에만 가진 변경분을 파일에 기록하도록 요청
+        _request({'action': 'flush'})
+        return None
+    response = _request({'action': 'run', 'argv': argv, 'cwd': os.getcwd(), 'stdin': stdin,
+                         'columns': _terminal_columns()})
+    if response is None:
+        return None
+    sys.stdout.write(response['output'])
+    sys.stdout.flush()
+    return response['exit']
+
+
+def _renamed_op(op, renamed):
+    # renamed(이전 id -> 새 id)에 따라 op의 항목 id를 바꾼 복사본
+    op = dict(op)
+    for key in ('item', 'before', 'after'):
+        if key in op and op[key].get('id') in renamed:
+            op[key] = dict(op[key], id=renamed[op[key]['id']])
+    return op
+
+
+class CachedStorage:
+    """파싱된 할 일 목록과 정렬 결과를 메모리에 유지하는 데몬용 저장소.
+
+    저장 요청은 메모리에 바로 반영하고, DAEMON_FLUSH_DELAY 동안 모인 변경을
+    한 번에 실제 저장소에 기록한다. 실행 취소 저널도 변경과 함께 기록해야
+    하므로 defer_journal로 받아 두었다가 변경을 기록한 뒤 같은 잠금 안에서 기록한다.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.lock = threading.RLock()
+        self.todos = None
+        self.disk_signature = None
+        self.disk_version = None
+        self.revision = 0
+        self.dirty = False
+        # 아직 기록하지 않은 변경 내역 (None이면 전체를 다시 기록)
+        self.pending_ops = []
+        # 아직 기록하지 않은 실행 취소 저널 작업 ((저널 경로, 항목) 목록)
+        self.pending_journal = []
+        self._timer = None
+        self._views = {}
+
+    def _ensure_loaded(self):
+        if self.dirty:
+            return
+        # 다른 프로세스가 파일을 바꿨다면 다시 읽음
+        signature = self.inner.signature()
+        if self.todos is None or signature != self.disk_signature:
+            self.disk_version = self.inner.version()
+            self.todos = self.inner.load()
+            self.disk_signature = signature
+            self._views = {}
+
+    def load(self):
+        with self.lock:
+            self._ensure_loaded()
+            # 호출한 쪽이 수정할 수 있으므로 항목을 복사해서 반환
+            return [todo.copy() for todo in self.todos]
+
+    def _read_todos(self):
+        with self.lock:
+            self._ensure_loaded()
+            return self.todos
+
+    def signature(self):
+        with self.lock:
+            self._ensure_loaded()
+            if self.dirty:
+                return [self.disk_signature, self.revision]
+            return self.disk_signature
+
+    def version(self):
+        # 데몬 안의 명령은 잠금으로 직렬화되므로 메모리의 변경 횟수를 버전으로 사용
+        return self.revision
+
+    def save(self, todos, ops=None):
+        with self.lock:
+            self.todos = todos
+            if ops is None:
+                self.pending_ops = None
+            elif self.pending_ops is not None:
+                self.pending_ops.extend(ops)
+            self.revision += 1
+            self.dirty = True
+            self._views = {}
+            if self._timer is None:
+                self._timer = threading.Timer(DAEMON_FLUSH_DELAY, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def defer_journal(self, actions):
+        """실행 취소 저널 작업을 변경분과 함께 기록하도록 보관한다. (undo.write_journal 참고)"""
+        with self.lock:
+            self.pending_journal.extend(actions)
+
+    def flush(self):
+        from .index import resign_indexes
+        from .stats import resign_stats
+        from .undo import write_journal
+        from .utils import write_lock
+        # 명령 처리(데몬 잠금 -> 파일 잠금)와 같은 순서로 잠금
+        with self.lock, write_lock():
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.dirty:
+                return
+            old_signature = self.signature()
+            # 데몬을 거치지 않은 명령(delete, import 등)이 그 사이에 저장했으면 덮어쓰지 않고 그 위에 다시 적용
+            changed = (self.inner.signature() != self.disk_signature
+                       or self.inner.version() != self.disk_version)
+            if changed:
+                self._rebase()
+            elif self.pending_ops is None:
+                self.inner.save(self.todos)
+            else:
+                self.inner.save(self.todos, self.pending_ops)
+            # 변경을 기록한 뒤에 저널을 기록해야 기록되지 않은 변경의 실행 취소 항목이 남지 않음
+            write_journal(self.pending_journal)
+            self.disk_signature = self.inner.signature()
+            self.disk_version = self.inner.version()
+            self.dirty = False
+            self.pending_ops = []
+            self.pending_journal = []
+            self._views = {}
+            if not changed:
+                # 색인은 이미 메모리 변경분을 반영했으므로 서명만 파일 기준으로 바꿈
+                # (다시 적용한 경우에는 서명이 달라 다음에 읽을 때 새로 만들어짐)
+                resign_indexes(old_signature, self.disk_signature)
+                resign_stats(old_signature, self.disk_signature)
+
+    def _rebase(self):
+        # 파일의 최신 목록에 기록하지 않은 변경을 다시 적용한다. 위치가 달라졌을 수 있으므로 id로 찾는다.
+        from .utils import apply_delta, _next_id
+        todos = self.inner.load()
+        if self.pending_ops is None:
+            # 전체 저장은 어떤 변경인지 알 수 없으므로 파일의 내용을 유지
+            print("데몬: 다른 프로세스가 먼저 저장해 메모리의 변경을 기록하지 않았습니다.", file=sys.stderr)
+            self.todos = todos
+            # 기록하지 않은 변경의 실행 취소 항목도 버림
+            self.pending_journal = []
+            return
+        ids = {todo.get('id') for todo in todos}
+        renamed = {}
+        for op in self.pending_ops:
+            op = _renamed_op(op, renamed)
+            if op['op'] == 'insert' and op['item'].get('id') in ids:
+                # 다른 프로세스가 같은 id로 다른 할 일을 추가함
+                new_id = _next_id(todos)
+                renamed[op['item']['id']] = new_id
+                op['item'] = dict(op['item'], id=new_id)
+            apply_delta(todos, [op])
+            if op['op'] == 'insert':
+                ids.add(op['item'].get('id'))
+        self.inner.save(todos)
+        self.todos = todos
+        if renamed:
+            # 실행 취소 항목도 바뀐 id를 가리키도록 맞춤
+            self.pending_journal = [
+                (path, entry if entry is None else dict(entry, ops=[_renamed_op(op, renamed) for op in entry['ops']]))
+                for path, entry in self.pending_journal
+            ]
+
+    def _filter(self, todos, status=None, tags=None, search=None, predicate=None):
+        from .storage import JsonStorage
+        return JsonStorage._filter(self, todos, status, tags, search, predicate)
+
+    def _order(self, todos, sort_by, limit):
+        # 정렬 결과는 메모리(_views)에 보관하므로 시작 캐시의 정렬 순서는 사용하지 않음
+        return None
+
+    def _select(self, status=None, tags=None, search=None, sort_by='priority', predicate=None, limit=None):
+        from .storage import JsonStorage
+        if status or tags or search or predicate:
+            return JsonStorage._select(self, status, tags, search, sort_by, predicate, limit)
+        with self.lock:
+            self._ensure_loaded()
+            # 필터 없는 정렬 결과는 다음 변경 전까지 재사용 (우선순위 정렬은 날짜에 따라 달라짐)
+            key = (sort_by, datetime.now().date())
+            if key not in self._views:
+                self._views[key] = JsonStorage._select(self, sort_by=sort_by)[0]
+            view = self._views[key]
+        return (view if limit is None else view[:limit]), len(view)
+
+    def query(self, status=None, tags=None, search=None, sort_by='priority', predicate=None, limit=None):
+        return self._select(status, tags, search, sort_by, predicate, limit)[0]
+
+    def find(self, ids):
+        from .storage import JsonStorage
+        return JsonStorage.find(self, ids)
+
+    def summary(self, today):
+        from .storage import JsonStorage
+        return JsonStorage.summary(self, today)
+
+    def listing(self, today, status=None, tags=None, search=None, sort_by='priority', predicate=None, limit=None):
+        todos, total = self._select(status, tags, search, sort_by, predicate, limit)
+        return todos, total, self.summary(today)
+
+
+def _handle(conn, storage):
+    from .todo import main
+    from .display import LINE_WIDTH
+    data = b''
+    while not data.endswith(b'\n'):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    if not data.strip():
+        return True
+    request = json.loads(data.decode('utf-8'))
+    action = request.get('action')
+    if action == 'stop':
+        storage.flush()
+        conn.sendall(json.dumps({'output': '', 'exit': 0}).encode('utf-8'))
+        return False
+    if action in ('flush', 'ping'):
+        if action == 'flush':
+            storage.flush()
+        conn.sendall(json.dumps({'output': '', 'exit': 0}).encode('utf-8'))
+        return True
+
+    output = io.StringIO()
+    exit_code = 0
+    old_stdin, old_cwd, old_columns = sys.stdin, os.getcwd(), os.environ.get('COLUMNS')
+    try:
+        sys.stdin = io.StringIO(request.get('stdin') or '')
+        os.chdir(request.get('cwd') or old_cwd)
+        # 목록 표는 명령을 보낸 터미널의 너비에 맞춤
+        os.environ['COLUMNS'] = str(request.get('columns') or LINE_WIDTH)
+        with storage.lock, redirect_stdout(output), redirect_stderr(output):
+            try:
+                main(request.get('argv', []))
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        sys.stdin = old_stdin
+        os.chdir(old_cwd)
+        if old_columns is None:
+            os.environ.pop('COLUMNS', None)
+        else:
+            os.environ['COLUMNS'] = old_columns
+    conn.sendall(json.dumps({'output': output.getvalue(), 'exit': exit_code}, ensure_ascii=False).encode('utf-8'))
+    return True
+
+def serve():
+    from .storage import get_storage, set_storage
+    if not hasattr(socket, 'AF_UNIX'):
+        print("이 운영체제에서는 데몬 모드를 지원하지 않습니다.")
+        return
+    if _request({'action': 'ping'}) is not None:
+        print("데몬이 이미 실행 중입니다.")
+        return
+    if os.path.exists(SOCKET_FILE):
+        os.remove(SOCKET_FILE)  # 비정상 종료로 남은 소켓 파일
+    storage = CachedStorage(get_storage())
+    set_storage(storage)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(SOCKET_FILE)
+    server.listen()
+    print(f"데몬을 시작했습니다. ({SOCKET_FILE})")
+    sys.stdout.flush()
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                if not _handle(conn, storage):
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        storage.flush()
+        server.close()
+        if os.path.exists(SOCKET_FILE):
+            os.remove(SOCKET_FILE)
+    print("데몬을 종료했습니다.")
+
+def run_daemon_command(args):
+    if args.status:
+        if _request({'action': 'ping'}) is not None:
+            print(f"데몬이 실행 중입니다. ({SOCKET_FILE})")
+        else:
+            print("데몬이 실행 중이 아닙니다.")
+    elif args.stop:
+        if _request({'action': 'stop'}) is not None:
+            print("데몬을 종료했습니다.")
+        else:
+            print("데몬이 실행 중이 아닙니다.")
+    else:
+        serve()
@@ -1,6 +1,13 @@
 import re
-from datetime import datetime
-from .utils import load_todos, _get_sorted_todos
+import shutil
+import sys
+from datetime import date, datetime
+from functools import lru_cache
+
+from .utils import query_todos_with_summary, tag_counts, save_view, todo_stats
+from .stats import PRIORITIES
+from .model import Todo, TodoView, _due_ordinal
+from . import profiling
 
 
 class Colors:
@@ -18,116 +25,404 @@ ansi_escape = re.compile(r'\x1b\[[0-9;]*m')
 def strip_ansi_codes(s):
     return ansi_escape.sub('', s)
 
-# 고정된 라인 너비 (조정 가능)
+# 터미널 너비를 알 수 없을 때(파이프로 출력 등) 사용할 라인 너비
 LINE_WIDTH = 75
+# --page만 지정했을 때 한 페이지에 표시할 할 일 수
+PAGE_SIZE = 20
+# 목록 표에서 설명 열의 최소 너비 (터미널이 좁으면 태그 열을 먼저 줄임)
+MIN_DESCRIPTION_WIDTH = 10
+MIN_TAGS_WIDTH = 6
+ELLIPSIS = '…'
+_HANGUL_SYLLABLES = re.compile('[\uac00-\ud7a3]+')
 
-def _print_section_header(header_text, color, line_width=40):
-    header_text_len = len(strip_ansi_codes(header_text))
+
+@lru_cache(maxsize=4096)
+def _char_width(char):
+    from wcwidth import wcwidth
+    # 제어 문자처럼 너비를 알 수 없는 문자는 0칸으로 계산
+    return max(wcwidth(char), 0)
+
+@lru_cache(maxsize=16384)
+def display_width(text):
+    """터미널에 표시되는 너비. 한글 등 전각 문자는 2칸이며, 같은 문자열은 한 번만 계산한다."""
+    if text.isascii():
+        return len(text)
+    # 대부분의 설명은 ASCII와 한글 음절(모두 2칸)만으로 이루어지므로 문자별 표를 찾지 않고 바로 계산
+    narrow = _HANGUL_SYLLABLES.sub('', text)
+    if narrow.isascii():
+        return 2 * len(text) - len(narrow)
+    # 그 밖의 문자가 있을 때만 wcwidth의 문자표를 불러옴
+    from wcwidth import wcswidth
+    width = wcswidth(text)
+    if width < 0:
+        width = sum(_char_width(char) for char in text)
+    return width
+
+# 표에 반복해서 나오는 고정 문구와 그 너비 (미리 계산)
+STATUS_LABELS = {False: '[미완료]', True: '[완료]'}
+DUE_LABELS = {'overdue': '마감 지남', 'today': '오늘 마감', 'due': '마감', 'invalid': '잘못된 날짜'}
+LABEL_WIDTHS = {label: display_width(label) for label in (*STATUS_LABELS.values(), *DUE_LABELS.values())}
+STATUS_WIDTH = max(LABEL_WIDTHS[label] for label in STATUS_LABELS.values())
+
+def terminal_width():
+    """출력할 터미널의 너비. 터미널이 아니면 COLUMNS 환경 변수나 LINE_WIDTH."""
+    return shutil.get_terminal_size((LINE_WIDTH, 24)).columns
+
+def _fit(text, width, pad=True):
+    """표시 너비가 width가 되도록 자르거나(끝에 '…') 공백을 채운다."""
+    text_width = display_width(text)
+    if text_width > width and text.isascii():
+        text, text_width = text[:width - 1] + ELLIPSIS, width
+    elif text_width > width:
+        used = 0
+        for i, char in enumerate(text):
+            char_width = _char_width(char)
+            if used + char_width > width - 1:
+                text, text_width = text[:i] + ELLIPSIS, used + 1
+                break
+            used += char_width
+    return text + ' ' * (width - text_width) if pad else text
+
+# 태그 열은 같은 조합이 반복되므로 맞춘 결과를 재사용
+_fit_repeated = lru_cache(maxsize=4096)(_fit)
+
+def _section_header(header_text, color, line_width=40):
+    header_text_len = display_width(strip_ansi_codes(header_text))
     total_dashes = line_width - header_text_len
     left_dashes = total_dashes // 2
     right_dashes = total_dashes - left_dashes
-    combined_header = (
-        f"{Colors.BOLD}{color}─{Colors.ENDC}" * left_dashes +
-        f"{Colors.BOLD}{color}{header_text}{Colors.ENDC}" +
-        f"{Colors.BOLD}{color}─{Colors.ENDC}" * right_dashes
-    )
-    print(combined_header)
-
-def _print_todo_item(idx, todo, today, format_tags):
-    status_text = f"{Colors.GREEN}완료{Colors.ENDC}" if todo["completed"] else f"{Colors.RED}미완료{Colors.ENDC}"
-    description_color = Colors.GRAY if todo["completed"] else Colors.BOLD
-    description = f"{description_color}{todo['description']}{Colors.ENDC}"
-    due_date_info = ""
-    if "due_date" in todo:
-        try:
-            due_date_obj = datetime.strptime(todo['due_date'], '%Y-%m-%d')
-            if due_date_obj.date() == today:
-                due_date_info = f" {Colors.YELLOW}(오늘 마감: {todo['due_date']}){Colors.ENDC}"
-            elif due_date_obj.date() < today: # datetime.now() 대신 today 사용
-                due_date_info = f" {Colors.RED}(마감 지남: {todo['due_date']}){Colors.ENDC}"
-            else:
-                due_date_info = f" {Colors.BLUE}(마감: {todo['due_date']}){Colors.ENDC}"
-        except ValueError:
-            due_date_info = f" {Colors.GRAY}(잘못된 날짜: {todo['due_date']}){Colors.ENDC}"
-    tags_display = format_tags(todo.get('tags', []))
-
-    print(f"{idx+1}. [{status_text}] {description} {tags_display}{due_date_info}")
-
-def list_todos(status_filter=None, search_term=None, sort_by='priority', tag_filter=None):
-    todos = load_todos()
-    if search_term:
-        todos = [t for t in todos if search_term.lower() in t['description'].lower()]
+    # 선 전체를 한 번의 색상 코드로 감쌈 (문자마다 코드를 붙이지 않음)
+    return f"{Colors.BOLD}{color}{'─' * left_dashes}{header_text}{'─' * right_dashes}{Colors.ENDC}"
+
+def _print_section_header(header_text, color, line_width=40):
+    print(_section_header(header_text, color, line_width))
+
+def _display_due_ordinal(todo):
+    """마감 기한의 날짜 서수. 없으면 None, 형식이 잘못되었으면 False."""
+    if "due_date" not in todo:
+        return None
+    ordinal = _due_ordinal(todo['due_date'])
+    return False if ordinal is None else ordinal
+
+def _format_tags(tags):
+    if not tags:
+        return ""
+    return " ".join([f"{Colors.MAGENTA}#{tag}{Colors.ENDC}" for tag in tags])
+
+def _due_cell(todo, today_ordinal, due_ordinal):
+    # (표시할 문구, 색상, 너비). 마감 기한이 없으면 None
+    if due_ordinal is None:
+        return None
+    if due_ordinal is False:
+        label, color = DUE_LABELS['invalid'], Colors.GRAY
+    elif due_ordinal == today_ordinal:
+        label, color = DUE_LABELS['today'], Colors.YELLOW
+    elif due_ordinal < today_ordinal:
+        label, color = DUE_LABELS['overdue'], Colors.RED
+    else:
+        label, color = DUE_LABELS['due'], Colors.BLUE
+    date_text = todo['due_date']
+    return f"{label} {date_text}", color, LABEL_WIDTHS[label] + 1 + display_width(date_text)
+
+@lru_cache(maxsize=4096)
+def _tags_text(tags):
+    # tags는 태그 튜플 (model.Todo의 태그는 같은 조합이면 같은 튜플)
+    return " ".join(f"#{tag}" for tag in tags)
+
+def _table_cells(rows, today_ordinal):
+    """rows((화면 번호, 할 일, 마감 서수) 목록)의 각 열 문구. 열 너비 계산과 출력에서 함께 쓴다."""
+    cells = []
+    append = cells.append
+    for idx, todo, due_ordinal in rows:
+        description = todo['description']
+        append((idx, bool(todo['completed']), description, display_width(description),
+                _tags_text(todo.tags if isinstance(todo, Todo) else tuple(todo.get('tags') or ())),
+                _due_cell(todo, today_ordinal, due_ordinal)))
+    return cells
+
+def _table_layout(cells, width=None):
+    """목록 표의 열 너비 (번호, 설명, 태그, 마감).
+
+    보이는 행만 훑어 열마다 가장 긴 값에 맞추고, 한 줄이 터미널 너비를 넘으면 설명 열과 태그 열을 줄인다.
+    """
+    width = terminal_width() if width is None else width
+    index_width = len(f"{max((cell[0] for cell in cells), default=0) + 1}.")
+    description_width = max((cell[3] for cell in cells), default=0)
+    tags_width = max((display_width(cell[4]) for cell in cells if cell[4]), default=0)
+    due_width = max((cell[5][2] for cell in cells if cell[5]), default=0)
+    # 열 사이는 한 칸씩 띄움 (비어 있는 열은 생략)
+    fixed = index_width + 1 + STATUS_WIDTH + 1 + (tags_width + 1 if tags_width else 0) + (due_width + 1 if due_width else 0)
+    available = width - fixed
+    if available < MIN_DESCRIPTION_WIDTH and tags_width > MIN_TAGS_WIDTH:
+        shrink = min(tags_width - MIN_TAGS_WIDTH, MIN_DESCRIPTION_WIDTH - available)
+        tags_width -= shrink
+        available += shrink
+    # 아주 좁은 터미널에서도 설명은 최소 너비만큼 보여줌 (줄이 넘치면 터미널이 줄바꿈)
+    return index_width, min(description_width, max(available, MIN_DESCRIPTION_WIDTH)), tags_width, due_width
+
+def _format_row(cell, layout):
+    index_width, description_width, tags_width, due_width = layout
+    idx, completed, description, text_width, tags, due = cell
+    status_label = STATUS_LABELS[completed]
+    status_color = Colors.GREEN if completed else Colors.RED
+    description_color = Colors.GRAY if completed else Colors.BOLD
+    # 오른쪽 열이 모두 비어 있으면 뒤쪽 공백은 채우지 않음
+    if text_width <= description_width:
+        description += ' ' * (description_width - text_width) if tags or due else ''
+    else:
+        description = _fit(description, description_width, pad=bool(tags or due))
+    line = (f"{f'{idx + 1}.':>{index_width}} {status_color}{status_label}{Colors.ENDC}"
+            f"{' ' * (STATUS_WIDTH - LABEL_WIDTHS[status_label])} "
+            f"{description_color}{description}{Colors.ENDC}")
+    if tags_width and (tags or due):
+        line += f" {Colors.MAGENTA}{_fit_repeated(tags, tags_width, bool(due))}{Colors.ENDC}"
+    if due:
+        line += f" {due[1]}{due[0]}{Colors.ENDC}"
+    return line
+
+def _window(total, limit=None, page=None, offset=None):
+    """표시할 범위 (시작, 끝)를 구한다. page는 1부터 시작하며 limit(기본 PAGE_SIZE)개씩 나눈다."""
+    start = offset or 0
+    if page is not None:
+        limit = limit or PAGE_SIZE
+        start += (page - 1) * limit
+    end = total if limit is None else min(total, start + limit)
+    return min(start, total), end
+
+def _list_source(status_filter=None, search_term=None, sort_by='priority', tag_filter=None, query=None):
+    # 화면 번호를 매긴 목록을 만든 명령 (번호 범위 옵션은 번호를 바꾸지 않으므로 생략)
+    parts = [f"todo search {search_term}" if search_term else "todo list"]
     if status_filter:
-        if status_filter == 'completed':
-            todos = [t for t in todos if t['completed']]
-        elif status_filter == 'pending':
-            todos = [t for t in todos if not t['completed']]
-    
-    # 태그 필터링 로직 추가
+        parts.append(f"--status {status_filter}")
     if tag_filter:
-        # tag_filter가 리스트가 아니면 리스트로 변환 (단일 태그 검색 지원)
-        if not isinstance(tag_filter, list):
-            tag_filter = [tag_filter]
-        # 모든 지정된 태그를 포함하는 할 일만 필터링
-        todos = [t for t in todos if all(tag in t.get('tags', []) for tag in tag_filter)]
+        parts.append(f"--tags {tag_filter if isinstance(tag_filter, str) else ' '.join(tag_filter)}")
+    if query:
+        parts.append(f'-q "{query}"')
+    if sort_by != 'priority':
+        parts.append(f"--sort-by {sort_by}")
+    return ' '.join(parts)
+
+def _render_todos(sorted_todos, summary, today, start, end, total=None):
+    """출력할 줄 목록을 만든다. 화면 번호는 전체 목록 기준이다.
+
+    sorted_todos가 앞의 일부만 고른 것이면 total에 조건에 맞는 전체 개수를 넘긴다.
+    """
+    if total is None:
+        total = len(sorted_todos)
+    total_todos, uncompleted_todos, today_due_todos = summary
+    today_ordinal = today.toordinal()
+    lines = [f"   {Colors.BLUE}  전체: {total_todos} | 미완료: {uncompleted_todos} | 오늘 마감: {today_due_todos}{Colors.ENDC}\n"]
 
-    sorted_todos = _get_sorted_todos(todos, sort_by)
-    if not sorted_todos:
-        print("표시할 할 일이 없습니다.")
-        return
-    all_todos = load_todos()
-    total_todos = len(all_todos)
-    uncompleted_todos = sum(1 for todo in all_todos if not todo.get("completed", False))
-    today_due_todos = 0
-    today = datetime.now().date()
-    for todo in all_todos:
-        if not todo.get("completed", False) and "due_date" in todo:
-            try:
-                due_date_obj = datetime.strptime(todo['due_date'], '%Y-%m-%d').date()
-                if due_date_obj == today:
-                    today_due_todos += 1
-            except ValueError:
-                pass
-    print(f"   {Colors.BLUE}  전체: {total_todos} | 미완료: {uncompleted_todos} | 오늘 마감: {today_due_todos}{Colors.ENDC}\n")
-    
     priority_order = ['높음', '중간', '낮음']
     priority_map = {'높음': [], '중간': [], '낮음': []}
     overdue_todos = []
-    for idx, todo in enumerate(sorted_todos):
-        is_overdue = False
-        if "due_date" in todo and not todo["completed"]:
-            try:
-                due_date_obj = datetime.strptime(todo['due_date'], '%Y-%m-%d').date()
-                if due_date_obj < today:
-                    is_overdue = True
-            except ValueError:
-                pass
-        if is_overdue and not todo["completed"]:
-            overdue_todos.append((idx, todo))
+    # 보이는 범위의 항목만 분류하고, 마감 기한은 정수 서수로 비교
+    for idx in range(start, end):
+        todo = sorted_todos[idx]
+        due_ordinal = _display_due_ordinal(todo)
+        if due_ordinal and not todo["completed"] and due_ordinal < today_ordinal:
+            overdue_todos.append((idx, todo, due_ordinal))
         else:
             prio = todo.get('priority', '중간')
             if prio not in priority_map:
                 priority_map[prio] = []
-            priority_map[prio].append((idx, todo))
-    
-    # 태그를 포맷하는 헬퍼 함수
-    def format_tags(tags):
-        if not tags:
-            return ""
-        return " ".join([f"{Colors.MAGENTA}#{tag}{Colors.ENDC}" for tag in tags])
-
-    if overdue_todos:
-        _print_section_header(" 마감 기한 지남 ", Colors.RED)
-        for idx, todo in overdue_todos:
-            _print_todo_item(idx, todo, today, format_tags)
-        print()
-
-    for i, prio in enumerate(priority_order):
-        _print_section_header(f" {prio} 우선순위 ", Colors.YELLOW)
-        prio_todos = priority_map[prio]
-        if not prio_todos:
-            print("-")
+            priority_map[prio].append((idx, todo, due_ordinal))
+
+    # 모든 구역의 열을 같은 너비로 맞춤
+    sections = [(prio, _table_cells(priority_map[prio], today_ordinal)) for prio in priority_order]
+    overdue_cells = _table_cells(overdue_todos, today_ordinal)
+    layout = _table_layout(overdue_cells + [cell for _, cells in sections for cell in cells])
+    if overdue_cells:
+        lines.append(_section_header(" 마감 기한 지남 ", Colors.RED))
+        lines.extend(_format_row(cell, layout) for cell in overdue_cells)
+        lines.append("")
+
+    for prio, cells in sections:
+        lines.append(_section_header(f" {prio} 우선순위 ", Colors.YELLOW))
+        if not cells:
+            lines.append("-")
         else:
-            for idx, todo in prio_todos:
-                _print_todo_item(idx, todo, today, format_tags)
-        print()
\ No newline at end of file
+            lines.extend(_format_row(cell, layout) for cell in cells)
+        lines.append("")
+
+    if (start, end) != (0, total):
+        lines.append(_range_footer(start, end, total))
+    return lines
+
+def _range_footer(start, end, total):
+    if start < end:
+        return f"{Colors.GRAY}{start + 1}-{end}번 표시 (전체 {total}개){Colors.ENDC}"
+    return f"{Colors.GRAY}이 범위에는 표시할 할 일이 없습니다. (전체 {total}개){Colors.ENDC}"
+
+def _list_lines(today, status_filter=None, search_term=None, sort_by='priority', tag_filter=None, limit=None, page=None,
+                offset=None, query=None, source='todo list'):
+    """list_todos가 출력할 줄 목록. 잘못된 태그 조건식이나 조회식이면 ValueError."""
+    # 범위를 지정했으면 보이는 끝까지만 골라 정렬 (번호는 그대로 전체 목록 기준)
+    needed = None
+    if limit is not None or page is not None:
+        needed = _window(sys.maxsize, limit, page, offset)[1]
+    predicate = None
+    if query:
+        from .query import compile_query
+        predicate = compile_query(query)
+    sorted_todos, total, summary = query_todos_with_summary(today, status_filter, search_term, sort_by, tag_filter,
+                                                            predicate, needed)
+    # 이후 complete/edit/delete가 화면 번호로 바로 대상을 찾을 수 있도록 저장
+    save_view(sorted_todos, source)
+    if not sorted_todos:
+        return ["표시할 할 일이 없습니다."]
+    start, end = _window(total, limit, page, offset)
+    profiling.count('todos_listed', total)
+    profiling.count('rows_rendered', end - start)
+    with profiling.phase('display.render'):
+        return _render_todos(sorted_todos, summary, today, start, end, total)
+
+def list_todos(status_filter=None, search_term=None, sort_by='priority', tag_filter=None, limit=None, page=None, offset=None, query=None,
+               watch=False):
+    options = dict(status_filter=status_filter, search_term=search_term, sort_by=sort_by, tag_filter=tag_filter,
+                   limit=limit, page=page, offset=offset, query=query,
+                   source=_list_source(status_filter, search_term, sort_by, tag_filter, query))
+    try:
+        if watch:
+            # 조건식은 먼저 한 번 확인하고, 화면은 저장 파일이 바뀔 때마다 다시 그림
+            from .index import parse_tag_query
+            from .query import compile_query
+            if tag_filter:
+                options['tag_filter'] = parse_tag_query(tag_filter)
+            if query:
+                compile_query(query)
+        else:
+            lines = _list_lines(datetime.now().date(), **options)
+    except ValueError as e:
+        # 잘못된 태그 조건식 또는 조회식
+        print(e)
+        return
+    if watch:
+        from .watch import watch_lines
+        watch_lines(lambda: _list_lines(datetime.now().date(), **options))
+        return
+    # 모든 줄을 모아 한 번에 출력
+    with profiling.phase('display.write'):
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+def list_archived(limit=None, page=None, offset=None):
+    # 보관소는 이 명령에서만 읽음 (보관된 항목은 번호로 수정할 수 없으므로 화면 번호도 저장하지 않음)
+    from .archive import load_archived
+    from .utils import load_todos
+    archived = load_archived(todo.get('id') for todo in load_todos())
+    if not archived:
+        print("보관된 할 일이 없습니다.")
+        return
+    start, end = _window(len(archived), limit, page, offset)
+    lines = [_section_header(f" 보관된 할 일 {len(archived)}개 ", Colors.GRAY)]
+    for todo in archived[start:end]:
+        completed_at = f" {Colors.GRAY}(완료: {todo['completed_at']}){Colors.ENDC}" if 'completed_at' in todo else ""
+        lines.append(f"- {Colors.GRAY}{todo['description']}{Colors.ENDC} {_format_tags(todo.get('tags', []))}{completed_at}")
+    if (start, end) != (0, len(archived)):
+        lines.append(_range_footer(start, end, len(archived)))
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def show_lists(overdue_only=False):
+    """모든 목록의 개수 요약. 각 목록의 통계 파일만 읽는다."""
+    from .paths import LIST_NAME, list_dir, list_names
+    from .stats import list_stats
+    today = datetime.now().date()
+    rows = []
+    for name in list_names():
+        stats = list_stats(list_dir(name))
+        overdue = stats.overdue(today)
+        if overdue_only and not overdue:
+            continue
+        rows.append((name, stats.total, stats.pending, stats.due_today(today), overdue))
+    if not rows:
+        print("마감 기한이 지난 할 일이 있는 목록이 없습니다." if overdue_only else "목록이 없습니다.")
+        return
+    width = max(display_width(row[0]) for row in rows)
+    lines = [_section_header(" 목록 ", Colors.CYAN)]
+    for name, total, pending, due_today, overdue in rows:
+        marker = "*" if name == LIST_NAME else " "
+        lines.append(
+            f"{marker} {Colors.BOLD}{_fit(name, width)}{Colors.ENDC}  전체 {total} | 미완료 {pending} | "
+            f"{Colors.YELLOW}오늘 마감 {due_today}{Colors.ENDC} | {Colors.RED}마감 지남 {overdue}{Colors.ENDC}"
+        )
+    if len(rows) > 1:
+        lines.append(f"  합계: 전체 {sum(r[1] for r in rows)} | 미완료 {sum(r[2] for r in rows)} | "
+                     f"오늘 마감 {sum(r[3] for r in rows)} | 마감 지남 {sum(r[4] for r in rows)}")
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def _due_bounds(today_ordinal, within=None, before=None, after=None, overdue=False):
+    # 모든 조건을 만족하는 서수 범위 [low, high). None이면 그쪽 끝은 제한 없음
+    if within is None and not (before or after or overdue):
+        within, overdue = 7, True  # 조건이 없으면 마감 지남 + 앞으로 7일
+    lows, highs = [], []
+    if within is not None:
+        highs.append(today_ordinal + within + 1)
+        if not overdue:
+            lows.append(today_ordinal)
+    elif overdue:
+        highs.append(today_ordinal)
+    if before is not None:
+        highs.append(before)
+    if after is not None:
+        lows.append(after + 1)
+    return max(lows, default=None), min(highs, default=None)
+
+def list_due(within=None, before=None, after=None, overdue=False, count_only=False):
+    """마감 기한 색인으로 범위에 해당하는 미완료 할 일을 보여준다. before/after는 날짜 서수."""
+    from .utils import query_due, find_todos
+    today = datetime.now().date()
+    today_ordinal = today.toordinal()
+    low, high = _due_bounds(today_ordinal, within, before, after, overdue)
+    if count_only:
+        # 셸 프롬프트 등에서 사용: 색인만 읽고 개수만 출력
+        print(query_due(low, high, count_only=True))
+        return
+    entries = query_due(low, high)
+    if not entries:
+        print("해당하는 할 일이 없습니다.")
+        return
+    wanted = {todo_id for _, todo_id in entries}
+    # 출력할 항목의 본문과 위치만 찾음 (날짜는 다시 해석하지 않음)
+    found = find_todos(wanted)
+    rows = [(found[todo_id], ordinal) for ordinal, todo_id in entries if todo_id in found]
+    source = ' '.join(["todo due"] + [option for option in (
+        f"--within {within}" if within is not None else "",
+        f"--before {date.fromordinal(before).isoformat()}" if before is not None else "",
+        f"--after {date.fromordinal(after).isoformat()}" if after is not None else "",
+        "--overdue" if overdue else "") if option])
+    save_view(TodoView(dict(found.values()), [position for (position, _), _ in rows]), source)
+    lines = [_section_header(f" 마감 기한 {len(rows)}개 ", Colors.YELLOW)]
+    cells = _table_cells([(idx, todo, ordinal) for idx, ((_, todo), ordinal) in enumerate(rows)], today_ordinal)
+    layout = _table_layout(cells)
+    lines.extend(_format_row(cell, layout) for cell in cells)
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def list_tags():
+    counts = tag_counts()
+    if not counts:
+        print("등록된 태그가 없습니다.")
+        return
+    _print_section_header(" 태그 ", Colors.MAGENTA)
+    for tag, count in counts:
+        print(f"{Colors.MAGENTA}#{tag}{Colors.ENDC} {count}")
+    print()
+
+def show_stats():
+    stats = todo_stats()
+    today = datetime.now().date()
+    lines = [_section_header(" 통계 ", Colors.CYAN)]
+    lines.append(f"전체: {stats.total} | 미완료: {stats.pending} | 완료: {stats.total - stats.pending}")
+    lines.append(
+        f"{Colors.YELLOW}오늘 마감: {stats.due_today(today)}{Colors.ENDC} | "
+        f"{Colors.RED}마감 지남: {stats.overdue(today)}{Colors.ENDC}"
+    )
+    lines.append("미완료 우선순위: " + " | ".join(f"{prio} {stats.priority.get(prio, 0)}" for prio in PRIORITIES))
+    if stats.tags:
+        tags = sorted(stats.tags.items(), key=lambda item: (-item[1], item[0]))
+        lines.append("태그: " + " ".join(f"{Colors.MAGENTA}#{tag}{Colors.ENDC} {count}" for tag, count in tags))
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
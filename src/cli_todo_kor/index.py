@@ -0,0 +1,541 @@
+import json
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from itertools import chain
+
+from .utils import TODO_DIR
+from .model import _due_ordinal
+from .locking import atomic_open
+from . import profiling
+# 검색/태그 역색인 (키 -> 할 일 id) 을 저장하는 파일
+INDEX_DB_FILE = os.path.join(TODO_DIR, '.todos_index.sqlite3')
+# 마감 기한 색인 (정렬된 (날짜 서수, id) 쌍) 파일
+DUE_INDEX_FILE = os.path.join(TODO_DIR, '.todos_due.idx')
+# 마감 기한 색인의 변경분 파일이 이 크기를 넘으면 색인 파일에 합쳐 다시 기록
+DUE_INDEX_DELTA_BYTES = int(os.environ.get('TODO_DUE_INDEX_DELTA_BYTES', 16 * 1024))
+# 초성 검색 (예: 'ㅎㅇ' -> '회의') 사용 여부
+SEARCH_CHOSEONG = os.environ.get('TODO_SEARCH_CHOSEONG', '1') != '0'
+
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_CHOSEONG_SET = set(CHOSEONG)
+# 초성 키는 일반 n-gram과 겹치지 않도록 접두어를 붙여 저장
+_CHOSEONG_PREFIX = '\x01'
+MAX_GRAM = 3
+
+def to_choseong(text):
+    # 한글 음절은 초성으로 바꾸고 나머지 문자는 그대로 둠
+    chars = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            chars.append(CHOSEONG[code // 588])
+        else:
+            chars.append(ch)
+    return ''.join(chars)
+
+def _is_choseong_query(term):
+    return SEARCH_CHOSEONG and all(ch in _CHOSEONG_SET or ch.isspace() for ch in term)
+
+def _grams(text, prefix=''):
+    keys = set()
+    for n in range(1, MAX_GRAM + 1):
+        for i in range(len(text) - n + 1):
+            keys.add(prefix + text[i:i + n])
+    return keys
+
+def description_keys(description):
+    text = description.lower()
+    keys = _grams(text)
+    if SEARCH_CHOSEONG:
+        keys |= _grams(to_choseong(text), _CHOSEONG_PREFIX)
+    return keys
+
+def _query_keys(term):
+    # 검색어 길이에 맞는 가장 긴 n-gram만 사용 (후보를 가장 적게 만듦)
+    if _is_choseong_query(term):
+        text, prefix = term, _CHOSEONG_PREFIX
+    else:
+        text, prefix = term.lower(), ''
+    n = min(MAX_GRAM, len(text))
+    return {prefix + text[i:i + n] for i in range(len(text) - n + 1)}
+
+def matches(description, term):
+    text = description.lower()
+    if term.lower() in text:
+        return True
+    return _is_choseong_query(term) and term in to_choseong(text)
+
+
+class PostingsIndex:
+    """키 -> 할 일 id 게시 목록(postings)을 저장하는 색인의 공통 부분.
+
+    저장소 파일의 서명(signature)을 함께 기록해 두고, 서명이 다르면
+    (다른 경로로 파일이 바뀐 경우) 다음 사용 때 전체를 다시 만든다.
+    """
+
+    name = None
+
+    def __init__(self, path=INDEX_DB_FILE):
+        self.path = path
+        self.table = f'postings_{self.name}'
+        self._conn = None
+
+    def keys(self, item):
+        raise NotImplementedError
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            # 데몬의 지연 기록 스레드에서도 사용 (접근은 데몬의 잠금으로 직렬화됨)
+            import sqlite3
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT NOT NULL,
+                    todo_id INTEGER NOT NULL,
+                    PRIMARY KEY (key, todo_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+        return self._conn
+
+    def exists(self):
+        return self._conn is not None or os.path.exists(self.path)
+
+    def signature(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (f'{self.name}_signature',)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_signature(self, signature):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f'{self.name}_signature', json.dumps(signature))
+        )
+
+    def _insert(self, todo_id, keys):
+        self.conn.executemany(
+            f"INSERT OR IGNORE INTO {self.table} (key, todo_id) VALUES (?, ?)", ((key, todo_id) for key in keys)
+        )
+
+    def _delete(self, todo_id, keys):
+        self.conn.executemany(
+            f"DELETE FROM {self.table} WHERE key = ? AND todo_id = ?", ((key, todo_id) for key in keys)
+        )
+
+    def rebuild(self, todos, signature):
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {self.table}")
+            for todo in todos:
+                self._insert(todo['id'], self.keys(todo))
+            self._set_signature(signature)
+
+    def apply(self, ops, signature):
+        """변경 내역(ops)에서 달라진 키만 추가/삭제한다."""
+        with self.conn:
+            for op in ops:
+                kind = op['op']
+                if kind == 'insert':
+                    self._insert(op['item']['id'], self.keys(op['item']))
+                elif kind == 'remove':
+                    self._delete(op['item']['id'], self.keys(op['item']))
+                else:
+                    old_keys, new_keys = self.keys(op['before']), self.keys(op['after'])
+                    if old_keys != new_keys:
+                        self._delete(op['before']['id'], old_keys - new_keys)
+                        self._insert(op['after']['id'], new_keys - old_keys)
+            self._set_signature(signature)
+
+    def resign(self, signature):
+        with self.conn:
+            self._set_signature(signature)
+
+    def ids(self, key):
+        return {row[0] for row in self.conn.execute(f"SELECT todo_id FROM {self.table} WHERE key = ?", (key,))}
+
+
+class SearchIndex(PostingsIndex):
+    """설명(description)의 문자 n-gram 역색인."""
+
+    name = 'search'
+
+    def keys(self, item):
+        return description_keys(item['description'])
+
+    def candidates(self, term):
+        """검색어를 포함할 수 있는 할 일 id 집합. 색인을 쓸 수 없으면 None."""
+        keys = _query_keys(term)
+        if not keys:
+            return None
+        params = list(keys)
+        placeholders = ','.join('?' * len(params))
+        rows = self.conn.execute(
+            f"SELECT todo_id FROM {self.table} WHERE key IN ({placeholders}) "
+            f"GROUP BY todo_id HAVING COUNT(*) = {len(params)}",
+            params
+        )
+        return {row[0] for row in rows}
+
+
+class TagIndex(PostingsIndex):
+    """태그 -> 할 일 id 색인."""
+
+    name = 'tags'
+
+    def keys(self, item):
+        return set(item.get('tags') or [])
+
+    def counts(self):
+        # 게시 목록만 읽어 태그별 개수를 구함 (할 일 본문은 읽지 않음)
+        return self.conn.execute(
+            f"SELECT key, COUNT(*) AS n FROM {self.table} GROUP BY key ORDER BY n DESC, key"
+        ).fetchall()
+
+
+class _Ordinals:
+    """매핑된 색인 파일의 (서수, id) 쌍 배열에서 서수만 보여주는 읽기 전용 시퀀스 (bisect용)."""
+
+    __slots__ = ('buffer', 'offset', 'length')
+
+    def __init__(self, buffer, offset, length):
+        self.buffer = buffer
+        self.offset = offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        return struct.unpack_from('i', self.buffer, self.offset + 8 * i)[0]
+
+
+class DueIndex:
+    """미완료 할 일의 (마감 기한 서수, id) 쌍을 서수 순으로 정렬해 둔 색인.
+
+    파일 앞부분에 저장소 서명(JSON)을, 그 뒤에 정렬된 정수 쌍 배열을 기록한다.
+    조회는 파일을 메모리에 매핑해 bisect로 범위의 양 끝만 찾으므로 O(log n + k)이다.
+    변경은 색인 파일을 다시 쓰지 않고 변경분 파일(path + '.delta')에 한 줄씩 추가하며,
+    조회할 때 함께 반영한다. 변경분 파일이 DUE_INDEX_DELTA_BYTES를 넘으면 색인 파일에 합친다.
+
+    변경분 파일의 첫 줄에는 기준이 되는 색인 파일의 서명을 기록해 두므로, 색인 파일을
+    다시 만든 뒤 남은 이전 변경분은 무시된다.
+    """
+
+    name = 'due'
+
+    def __init__(self, path=DUE_INDEX_FILE):
+        self.path = path
+        self.delta_path = path + '.delta'
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    @staticmethod
+    def _read_header(f):
+        # (서명, 쌍 배열의 시작 위치). 배열은 8바이트 경계에서 시작
+        size, = struct.unpack('<I', f.read(4))
+        signature = json.loads(f.read(size))
+        return signature, (4 + size + 7) // 8 * 8
+
+    def _base_signature(self):
+        try:
+            with open(self.path, 'rb') as f:
+                return self._read_header(f)[0]
+        except (FileNotFoundError, ValueError, struct.error):
+            return None
+
+    def _read_delta(self, base):
+        """변경분 파일을 읽어 (서명, 추가된 쌍 집합, 삭제된 쌍 집합)을 반환한다.
+
+        변경분이 없거나 다른 색인 파일을 기준으로 한 것이면 None.
+        """
+        try:
+            with open(self.delta_path, 'rb') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+        try:
+            if json.loads(lines[0]).get('base') != base:
+                return None
+        except (IndexError, ValueError, AttributeError):
+            return None
+        signature, added, removed = base, set(), set()
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 기록 도중 중단된 마지막 줄. 서명이 저장소와 달라지므로 다음 사용 때 다시 만듦
+                break
+            for sign, ordinal, todo_id in record['changes']:
+                entry = (ordinal, todo_id)
+                if sign > 0:
+                    if entry in removed:
+                        removed.discard(entry)
+                    else:
+                        added.add(entry)
+                elif entry in added:
+                    added.discard(entry)
+                else:
+                    removed.add(entry)
+            signature = record['signature']
+        return signature, added, removed
+
+    def signature(self):
+        base = self._base_signature()
+        delta = self._read_delta(base)
+        return base if delta is None else delta[0]
+
+    def _read_pairs(self):
+        with open(self.path, 'rb') as f:
+            _, offset = self._read_header(f)
+            f.seek(offset)
+            pairs = array('i')
+            pairs.frombytes(f.read())
+        return pairs
+
+    def _write(self, pairs, signature):
+        header = json.dumps(signature).encode('utf-8')
+        prefix = struct.pack('<I', len(header)) + header
+        prefix += b'\0' * (-len(prefix) % 8)
+        # 언제든 다시 만들 수 있으므로 디스크 동기화는 생략
+        with atomic_open(self.path, 'wb', fsync=False) as f:
+            f.write(prefix)
+            f.write(pairs.tobytes())
+        try:
+            os.remove(self.delta_path)
+        except FileNotFoundError:
+            pass
+
+    def _append_delta(self, changes, signature):
+        # changes: 순서대로 적용할 (1이면 추가, -1이면 삭제, 서수, id) 목록
+        record = json.dumps({'signature': signature, 'changes': changes}).encode('utf-8') + b'\n'
+        base = self._base_signature()
+        if self._read_delta(base) is None:
+            # 처음 기록하거나 남아 있던 변경분이 다른 색인 파일 기준이면 새로 만듦
+            with atomic_open(self.delta_path, 'wb', fsync=False) as f:
+                f.write(json.dumps({'base': base}).encode('utf-8') + b'\n')
+                f.write(record)
+            return
+        with open(self.delta_path, 'ab') as f:
+            f.write(record)
+            size = f.tell()
+        if size > DUE_INDEX_DELTA_BYTES:
+            with profiling.phase('index.merge_due'):
+                self._merge()
+
+    def _merge(self):
+        # 변경분을 색인 파일에 합쳐 다시 기록 (변경분 파일은 _write에서 삭제)
+        base = self._base_signature()
+        signature, added, removed = self._read_delta(base)
+        pairs = self._read_pairs()
+        entries = set(zip(pairs[::2], pairs[1::2]))
+        entries -= removed
+        entries |= added
+        self._write(array('i', chain.from_iterable(sorted(entries))), signature)
+
+    @staticmethod
+    def entry(todo):
+        """색인에 들어갈 (서수, id). 완료되었거나 마감 기한이 없으면(잘못된 날짜 포함) None."""
+        if todo.get('completed') or 'due_date' not in todo:
+            return None
+        ordinal = _due_ordinal(todo['due_date'])
+        return None if ordinal is None else (ordinal, todo['id'])
+
+    def rebuild(self, todos, signature):
+        entries = sorted(entry for entry in map(self.entry, todos) if entry)
+        self._write(array('i', chain.from_iterable(entries)), signature)
+
+    def apply(self, ops, signature):
+        """변경 내역(ops)에서 달라진 쌍을 변경분 파일에 추가한다."""
+        changes = []
+        for op in ops:
+            kind = op['op']
+            if kind == 'insert':
+                old, new = None, self.entry(op['item'])
+            elif kind == 'remove':
+                old, new = self.entry(op['item']), None
+            else:
+                old, new = self.entry(op['before']), self.entry(op['after'])
+            if old == new:
+                continue
+            if old:
+                changes.append((-1, *old))
+            if new:
+                changes.append((1, *new))
+        self._append_delta(changes, signature)
+
+    def resign(self, signature):
+        self._append_delta([], signature)
+
+    def range(self, low=None, high=None, count_only=False):
+        """low <= 서수 < high인 (서수, id) 목록 (서수 순). count_only면 개수만 반환한다.
+
+        low나 high가 None이면 그쪽 끝은 제한하지 않는다.
+        """
+        import mmap
+        with open(self.path, 'rb') as f:
+            base, offset = self._read_header(f)
+            length = (os.fstat(f.fileno()).st_size - offset) // 8
+            pairs = array('i')
+            start = end = 0
+            if length > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    ordinals = _Ordinals(buffer, offset, length)
+                    start = 0 if low is None else bisect_left(ordinals, low)
+                    end = length if high is None else bisect_left(ordinals, high)
+                    if not count_only:
+                        pairs.frombytes(buffer[offset + 8 * start:offset + 8 * max(start, end)])
+        delta = self._read_delta(base)
+        added, removed = (set(), set()) if delta is None else delta[1:]
+
+        def in_range(entry):
+            return (low is None or entry[0] >= low) and (high is None or entry[0] < high)
+
+        if count_only:
+            # 삭제된 쌍은 모두 색인 파일에 있는 쌍
+            return max(0, end - start) - sum(map(in_range, removed)) + sum(map(in_range, added))
+        entries = list(zip(pairs[::2], pairs[1::2]))
+        if removed:
+            entries = [entry for entry in entries if entry not in removed]
+        if added:
+            entries = sorted(entries + [entry for entry in added if in_range(entry)])
+        return entries
+
+
+_TAG_QUERY_TOKEN = re.compile(r'\s*(\(|\)|&|\||!|[^\s()&|!]+)')
+_OPERATORS = {'and': '&', 'or': '|', 'not': '!'}
+
+def parse_tag_query(tokens):
+    """태그 조건식을 파싱한다.
+
+    예) ['업무', 'or', '(개인', 'and', 'not', '보류)']
+    연산자: and/&, or/|, not/!, 괄호. 연산자 없이 나열한 태그는 and로 묶인다.
+    결과는 ('tag', 이름), ('not', x), ('and', a, b), ('or', a, b) 형태의 튜플이다.
+    """
+    if isinstance(tokens, str):
+        tokens = [tokens]
+    text = ' '.join(tokens)
+    items = []
+    pos = 0
+    while pos < len(text):
+        match = _TAG_QUERY_TOKEN.match(text, pos)
+        if not match:
+            break
+        token = match.group(1)
+        items.append(_OPERATORS.get(token.lower(), token))
+        pos = match.end()
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+    if not items:
+        return None
+    position = [0]
+
+    def peek():
+        return items[position[0]] if position[0] < len(items) else None
+
+    def take():
+        token = peek()
+        position[0] += 1
+        return token
+
+    def parse_or():
+        node = parse_and()
+        while peek() == '|':
+            take()
+            node = ('or', node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() not in (None, '|', ')'):
+            if peek() == '&':
+                take()
+            node = ('and', node, parse_not())
+        return node
+
+    def parse_not():
+        token = take()
+        if token == '!':
+            return ('not', parse_not())
+        if token == '(':
+            node = parse_or()
+            if take() != ')':
+                raise ValueError("태그 조건식의 괄호가 맞지 않습니다.")
+            return node
+        if token in (None, ')', '&', '|'):
+            raise ValueError("태그 조건식이 올바르지 않습니다.")
+        return ('tag', token)
+
+    node = parse_or()
+    if peek() is not None:
+        raise ValueError("태그 조건식이 올바르지 않습니다.")
+    return node
+
+def evaluate_tag_query(node, lookup, universe):
+    """파싱된 태그 조건식을 집합 연산(교집합/합집합/차집합)으로 계산한다."""
+    kind = node[0]
+    if kind == 'tag':
+        return lookup(node[1])
+    if kind == 'not':
+        return universe() - evaluate_tag_query(node[1], lookup, universe)
+    left = evaluate_tag_query(node[1], lookup, universe)
+    if kind == 'and':
+        if not left:
+            return left
+        return left & evaluate_tag_query(node[2], lookup, universe)
+    return left | evaluate_tag_query(node[2], lookup, universe)
+
+
+_indexes = {}
+_INDEX_CLASSES = {'search': SearchIndex, 'tags': TagIndex, 'due': DueIndex}
+
+def get_index(name):
+    if name not in _indexes:
+        _indexes[name] = _INDEX_CLASSES[name]()
+    return _indexes[name]
+
+def _current_index(name, storage, todos=None):
+    # 저장소와 서명이 다르면 전체를 다시 만들어 최신 상태로 맞춤
+    index = get_index(name)
+    signature = storage.signature()
+    # 저장 파일이 아직 없으면 서명이 둘 다 None이므로 색인 파일이 있는지도 확인
+    if not index.exists() or index.signature() != signature:
+        with profiling.phase(f'index.rebuild_{name}'):
+            index.rebuild(todos if todos is not None else storage.load(), signature)
+    return index
+
+@profiling.timed('index.search')
+def search_candidates(term, storage, todos=None):
+    """색인을 최신 상태로 맞춘 뒤 검색 후보 id 집합을 반환한다."""
+    return _current_index('search', storage, todos).candidates(term)
+
+@profiling.timed('index.tags')
+def tag_query_ids(query, storage, universe, todos=None):
+    """태그 조건식을 만족하는 할 일 id 집합을 반환한다. universe는 전체 id 집합을 주는 함수."""
+    index = _current_index('tags', storage, todos)
+    return evaluate_tag_query(query, index.ids, universe)
+
+def tag_counts(storage):
+    return _current_index('tags', storage).counts()
+
+@profiling.timed('index.due')
+def due_range(storage, low=None, high=None, count_only=False):
+    """마감 기한 서수가 low 이상 high 미만인 미완료 할 일의 (서수, id) 목록 (마감 기한 순)."""
+    return _current_index('due', storage).range(low, high, count_only)
+
+def resign_indexes(old_signature, new_signature):
+    """내용은 같고 서명만 바뀐 경우 (예: 데몬이 메모리의 변경분을 파일에 기록) 색인의 서명만 갱신한다."""
+    for name in _INDEX_CLASSES:
+        index = get_index(name)
+        if index.exists() and index.signature() == old_signature:
+            index.resign(new_signature)
+
+def update_indexes(ops, old_signature, new_signature):
+    """저장소에 변경분을 기록한 직후 호출되어 색인을 점진적으로 갱신한다."""
+    for name in _INDEX_CLASSES:
+        index = get_index(name)
+        # 아직 만들어지지 않았거나 이미 어긋난 색인은 다음 사용 때 다시 만듦
+        if not index.exists() or index.signature() != old_signature:
+            continue
+        index.apply(ops, new_signature)
@@ -0,0 +1,64 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+
+class _FileLock:
+    def __init__(self):
+        # 같은 프로세스의 다른 스레드(데몬의 기록 타이머)는 이 잠금으로 순서를 맞춤
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+@contextmanager
+def file_lock(path):
+    """path 파일에 배타적 잠금(fcntl.flock)을 건다.
+
+    같은 스레드에서는 중첩해서 사용할 수 있으며, 가장 바깥쪽에서만 실제로 잠근다.
+    """
+    with _locks_guard:
+        lock = _locks.setdefault(path, _FileLock())
+    with lock.thread_lock:
+        if lock.depth == 0 and fcntl is not None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            lock.fd = fd
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0 and lock.fd is not None:
+                fcntl.flock(lock.fd, fcntl.LOCK_UN)
+                os.close(lock.fd)
+                lock.fd = None
+
+@contextmanager
+def atomic_open(path, mode='w', fsync=True):
+    """임시 파일에 기록한 뒤 os.replace로 교체한다.
+
+    읽는 쪽은 항상 이전 내용이나 새 내용 전체만 보게 되며, 기록 도중 중단되어도
+    원래 파일은 그대로 남는다. 다시 만들 수 있는 파일은 fsync=False로 디스크 동기화를 생략한다.
+    """
+    tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    encoding = None if 'b' in mode else 'utf-8'
+    try:
+        with open(tmp_file, mode, encoding=encoding) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
@@ -0,0 +1,284 @@
+import gc
+import json
+import sys
+from array import array
+from collections.abc import MutableMapping, Sequence
+from datetime import date, datetime
+from functools import lru_cache
+
+# 메모리에 올린 할 일 한 개. 항목이 많을 때 dict보다 작게 유지하기 위해
+#   - 고정된 필드는 __slots__ 속성으로 (항목마다 dict를 두지 않음)
+#   - 우선순위는 작은 정수 코드 (0: 높음, 1: 중간, 2: 낮음)
+#   - 태그는 intern한 문자열의 튜플 (같은 태그 조합은 한 튜플을 공유, 없으면 빈 튜플 하나를 공유)
+#   - 마감 기한은 날짜 서수 (같은 날짜 문자열은 _due_ordinal 캐시의 같은 정수를 공유)
+# 로 저장한다. 기존 코드와 저장 파일 형식은 그대로 dict처럼 todo['priority'], todo.get('tags')로 사용한다.
+PRIORITY_NAMES = ('높음', '중간', '낮음')
+PRIORITY_CODES = {name: code for code, name in enumerate(PRIORITY_NAMES)}
+DEFAULT_PRIORITY = PRIORITY_CODES['중간']
+_NO_TAGS = ()
+# 속성으로 저장하는 필드 (나머지는 extra)
+_FIELDS = frozenset(('id', 'description', 'completed', 'priority', 'tags', 'due_date'))
+_new = object.__new__
+TAG_CACHE_SIZE = 4096
+_tag_tuples = {}
+
+
+@lru_cache(maxsize=4096)
+def _due_ordinal(date_str):
+    """'YYYY-MM-DD' 문자열을 날짜 서수(date.toordinal)로 변환한다. 형식이 잘못되었으면 None.
+
+    마감 기한은 같은 값이 많으므로 문자열마다 한 번만 해석하고, 이후 비교는 정수로 한다.
+    """
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').toordinal()
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def _ordinal_text(ordinal):
+    return date.fromordinal(ordinal).isoformat()
+
+def _intern_tags(tags):
+    # 태그 조합은 종류가 적으므로 같은 조합이면 같은 튜플을 공유 (캐시 크기는 제한)
+    if not tags:
+        return _NO_TAGS
+    key = tuple(tags)
+    shared = _tag_tuples.get(key)
+    if shared is None:
+        shared = tuple(sys.intern(str(tag)) for tag in key)
+        if len(_tag_tuples) < TAG_CACHE_SIZE:
+            _tag_tuples[key] = shared
+    return shared
+
+
+class Todo(MutableMapping):
+    """dict처럼 사용할 수 있는 할 일 항목.
+
+    알 수 없는 우선순위는 '중간'으로 읽고, 날짜 형식이 아닌 마감 기한은 원래 문자열을 그대로 보관한다.
+    그 밖의 필드(completed_at 등)는 필요한 항목에만 만드는 extra dict에 둔다.
+    """
+
+    __slots__ = ('id', 'description', 'completed', 'priority_code', 'tags', 'due_ordinal', '_due_text', '_extra')
+
+    def __init__(self, id=None, description='', completed=False, priority_code=DEFAULT_PRIORITY, tags=_NO_TAGS,
+                 due_ordinal=None):
+        self.id = id
+        self.description = description
+        self.completed = completed
+        self.priority_code = priority_code
+        self.tags = tags
+        self.due_ordinal = due_ordinal
+        self._due_text = None
+        self._extra = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """dict(또는 Todo)로 새 항목을 만든다. json.loads의 object_hook으로도 사용한다."""
+        if isinstance(data, Todo):
+            return data.copy()
+        # 불러올 때 항목마다 호출되므로 __init__/__setitem__을 거치지 않고 속성을 바로 채움
+        get = data.get
+        todo = _new(cls)
+        todo.id = get('id')
+        todo.description = get('description', '')
+        todo.completed = bool(get('completed', False))
+        todo.priority_code = PRIORITY_CODES.get(get('priority'), DEFAULT_PRIORITY)
+        todo.tags = _intern_tags(get('tags'))
+        due_date = get('due_date')
+        todo.due_ordinal = _due_ordinal(due_date) if due_date else None
+        todo._due_text = due_date if due_date and todo.due_ordinal is None else None
+        todo._extra = None
+        if not _FIELDS.issuperset(data):
+            todo._extra = {key: value for key, value in data.items() if key not in _FIELDS}
+        return todo
+
+    def record(self):
+        """모든 필드의 튜플. 시작 캐시(cache.py)에 저장하고 todos_from_records로 되돌린다."""
+        return (self.id, self.description, self.completed, self.priority_code, self.tags, self.due_ordinal,
+                self._due_text, self._extra)
+
+    def copy(self):
+        todo = Todo(self.id, self.description, self.completed, self.priority_code, self.tags, self.due_ordinal)
+        todo._due_text = self._due_text
+        todo._extra = dict(self._extra) if self._extra else None
+        return todo
+
+    def to_dict(self):
+        # 저장할 때 항목마다 호출되므로 필드를 직접 채움 (키 순서는 __iter__와 같음)
+        data = {} if self.id is None else {'id': self.id}
+        data['description'] = self.description
+        data['completed'] = self.completed
+        data['priority'] = PRIORITY_NAMES[self.priority_code]
+        if self.due_ordinal is not None:
+            data['due_date'] = _ordinal_text(self.due_ordinal)
+        elif self._due_text is not None:
+            data['due_date'] = self._due_text
+        data['tags'] = list(self.tags)
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    # --- dict 호환 접근
+
+    def __getitem__(self, key):
+        if key == 'id':
+            if self.id is None:
+                raise KeyError(key)
+            return self.id
+        if key == 'description':
+            return self.description
+        if key == 'completed':
+            return self.completed
+        if key == 'priority':
+            return PRIORITY_NAMES[self.priority_code]
+        if key == 'tags':
+            # dict와 같이 리스트로 돌려줌 (내부의 공유 튜플은 todo.tags로 직접 사용)
+            return list(self.tags)
+        if key == 'due_date':
+            if self.due_ordinal is not None:
+                return _ordinal_text(self.due_ordinal)
+            if self._due_text is None:
+                raise KeyError(key)
+            return self._due_text
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key == 'id':
+            self.id = value
+        elif key == 'description':
+            self.description = value
+        elif key == 'completed':
+            self.completed = bool(value)
+        elif key == 'priority':
+            self.priority_code = PRIORITY_CODES.get(value, DEFAULT_PRIORITY)
+        elif key == 'tags':
+            self.tags = _intern_tags(value)
+        elif key == 'due_date':
+            self.due_ordinal = _due_ordinal(value) if value else None
+            self._due_text = value if self.due_ordinal is None and value else None
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if key == 'id':
+            self.id = None
+        elif key == 'due_date':
+            self.due_ordinal = self._due_text = None
+        elif key in ('description', 'completed', 'priority', 'tags'):
+            raise KeyError(f"{key} 필드는 삭제할 수 없습니다.")
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        if key == 'id':
+            return self.id is not None
+        if key in ('description', 'completed', 'priority', 'tags'):
+            return True
+        if key == 'due_date':
+            return self.due_ordinal is not None or self._due_text is not None
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        if self.id is not None:
+            yield 'id'
+        yield 'description'
+        yield 'completed'
+        yield 'priority'
+        if self.due_ordinal is not None or self._due_text is not None:
+            yield 'due_date'
+        yield 'tags'
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if not isinstance(other, Todo):
+            if not isinstance(other, dict):
+                return NotImplemented
+            other = Todo.from_dict(other)
+        return (self.id, self.description, self.completed, self.priority_code, self.tags, self.due_ordinal,
+                self._due_text, self._extra or None) == (
+                other.id, other.description, other.completed, other.priority_code, other.tags, other.due_ordinal,
+                other._due_text, other._extra or None)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Todo({self.to_dict()!r})"
+
+
+def json_default(obj):
+    """json.dump의 default 인자. Todo를 저장 파일 형식의 dict로 바꾼다."""
+    if isinstance(obj, Todo):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def loads_todos(content):
+    """JSON 배열을 Todo 목록으로 읽는다.
+
+    항목마다 바로 Todo로 바꾸어 파싱한 dict가 한꺼번에 남지 않도록 한다. 새 객체가 많이 생기는
+    동안 순환 참조 수집(gc)이 반복해서 돌지 않도록 잠시 멈춘다.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return json.loads(content, object_hook=Todo.from_dict)
+    finally:
+        if enabled:
+            gc.enable()
+
+def todos_from_records(records):
+    """Todo.record() 튜플 목록을 Todo 목록으로 되돌린다. (필드를 검사하지 않고 그대로 채움)"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        todos = []
+        append = todos.append
+        for record in records:
+            todo = _new(Todo)
+            (todo.id, todo.description, todo.completed, todo.priority_code, todo.tags, todo.due_ordinal,
+             todo._due_text, todo._extra) = record
+            append(todo)
+        return todos
+    finally:
+        if enabled:
+            gc.enable()
+
+def as_todos(items):
+    """dict 목록을 Todo 목록으로 바꾼다. 이미 Todo인 항목은 그대로 둔다."""
+    return [item if isinstance(item, Todo) else Todo.from_dict(item) for item in items]
+
+
+class TodoView(Sequence):
+    """정렬/필터 결과. 항목을 복사하지 않고 todos 안의 위치 목록(array('i'))만 가진다.
+
+    view[i]는 todos[view.positions[i]]이다. todos는 위치로 항목을 찾을 수 있으면 되므로
+    SQLite 저장소처럼 전체 목록이 없을 때는 {위치: 항목} dict를 사용한다.
+    """
+
+    __slots__ = ('todos', 'positions')
+
+    def __init__(self, todos, positions):
+        self.todos = todos
+        self.positions = positions if isinstance(positions, array) else array('i', positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TodoView(self.todos, self.positions[index])
+        return self.todos[self.positions[index]]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def entries(self):
+        """(id, 위치) 쌍. 화면 번호 매핑을 저장할 때 사용한다."""
+        todos = self.todos
+        return [[todos[position]['id'], position] for position in self.positions]
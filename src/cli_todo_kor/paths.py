@@ -0,0 +1,55 @@
+import os
+import sys
+
+APP_NAME = "cli-todo-kor"
+
+def _user_data_dir():
+    # platformdirs는 불러오는 데 시간이 걸리므로 흔한 경우(Linux, macOS)는 직접 계산
+    if sys.platform == 'darwin':
+        return os.path.join(os.path.expanduser('~/Library/Application Support'), APP_NAME)
+    if sys.platform.startswith('linux') and not (
+        os.environ.get('ANDROID_DATA') == '/data' and os.environ.get('ANDROID_ROOT') == '/system'
+    ):
+        base = os.environ.get('XDG_DATA_HOME', '').strip() or os.path.expanduser('~/.local/share')
+        return os.path.join(base, APP_NAME)
+    from platformdirs import user_data_dir
+    return user_data_dir(appname=APP_NAME)
+
+# 데이터 디렉터리는 프로세스마다 한 번만 계산 (TODO_DIR 환경 변수로 변경 가능)
+BASE_DIR = os.environ.get('TODO_DIR') or _user_data_dir()
+# 이름 있는 목록은 각각 BASE_DIR/lists/<이름> 아래에 따로 저장 (기본 목록은 BASE_DIR)
+LISTS_DIR = os.path.join(BASE_DIR, 'lists')
+DEFAULT_LIST = 'default'
+
+def list_dir(name):
+    return BASE_DIR if name == DEFAULT_LIST else os.path.join(LISTS_DIR, name)
+
+def valid_list_name(name):
+    return bool(name) and not name.startswith('.') and not any(c in name for c in '/\\\0')
+
+def _use_list(name):
+    global LIST_NAME, TODO_DIR, SOCKET_FILE
+    if not valid_list_name(name):
+        raise ValueError(f"사용할 수 없는 목록 이름입니다: {name!r}")
+    LIST_NAME = name
+    # 현재 목록의 데이터 디렉터리 (할 일, 실행 취소 저널, 통계, 색인 등)
+    TODO_DIR = list_dir(name)
+    # 데몬 모드에서 사용하는 소켓 파일 (데몬은 목록마다 따로 실행)
+    SOCKET_FILE = os.path.join(TODO_DIR, 'daemon.sock')
+
+def select_list(name):
+    """사용할 목록을 정한다. 할 일 파일 경로가 모듈을 불러올 때 정해지므로 그 전에 호출해야 한다."""
+    if f"{__package__}.utils" in sys.modules:
+        raise RuntimeError("목록은 할 일 모듈을 불러오기 전에 선택해야 합니다.")
+    _use_list(name)
+
+def list_names():
+    """기본 목록과 이름 있는 목록들. 이름 있는 목록은 처음 저장할 때 디렉터리가 만들어진다."""
+    names = []
+    if os.path.isdir(LISTS_DIR):
+        names = sorted(name for name in os.listdir(LISTS_DIR)
+                       if valid_list_name(name) and os.path.isdir(os.path.join(LISTS_DIR, name)))
+    return [DEFAULT_LIST] + names
+
+# TODO_LIST 환경 변수나 --list 옵션으로 다른 목록을 선택
+_use_list(os.environ.get('TODO_LIST') or DEFAULT_LIST)
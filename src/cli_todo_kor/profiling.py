@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+# --profile 옵션이나 TODO_TRACE 환경 변수로 켜는 단계별 시간 측정.
+# 값: 1/text(표로 출력), json(JSON 한 줄로 출력), cprofile[:파일](cProfile 결과 저장)
+# 결과는 명령 출력과 섞이지 않도록 표준 오류로 출력한다.
+MODE = None
+ENABLED = False
+CPROFILE_FILE = 'todo.prof'
+
+_phases = {}
+_counts = {}
+_bytes = {'read': 0, 'written': 0}
+_started = None
+_NULL_PHASE = nullcontext()
+
+
+class _Phase:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        total, calls = _phases.get(self.name, (0.0, 0))
+        _phases[self.name] = (total + elapsed, calls + 1)
+
+
+def enable(mode):
+    global MODE, ENABLED, CPROFILE_FILE, _started
+    if mode in ('1', 'true', ''):
+        mode = 'text'
+    if mode.startswith('cprofile'):
+        mode, _, path = mode.partition(':')
+        CPROFILE_FILE = path or CPROFILE_FILE
+    if mode not in ('text', 'json', 'cprofile'):
+        raise ValueError(f"지원하지 않는 프로파일 형식입니다: {mode} (text, json, cprofile[:파일])")
+    MODE = mode
+    ENABLED = True
+    _started = time.perf_counter()
+
+def phase(name):
+    """단계 이름별로 걸린 시간(중첩된 단계 포함)과 호출 횟수를 누적한다."""
+    return _Phase(name) if ENABLED else _NULL_PHASE
+
+def timed(name):
+    """함수 전체를 하나의 단계로 측정하는 데코레이터."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _Phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count(name, n=1):
+    if ENABLED:
+        _counts[name] = _counts.get(name, 0) + n
+
+def add_bytes(kind, n):
+    """kind는 'read' 또는 'written'."""
+    if ENABLED:
+        _bytes[kind] += n
+
+def add_file_bytes(kind, path):
+    if ENABLED and os.path.exists(path):
+        _bytes[kind] += os.path.getsize(path)
+
+def report():
+    from .model import _due_ordinal
+    counts = dict(_counts)
+    counts['dates_parsed'] = _due_ordinal.cache_info().misses
+    return {
+        'total_ms': round((time.perf_counter() - _started) * 1000, 3),
+        'phases': {
+            name: {'ms': round(total * 1000, 3), 'calls': calls}
+            for name, (total, calls) in sorted(_phases.items(), key=lambda item: -item[1][0])
+        },
+        'bytes': dict(_bytes),
+        'counts': counts,
+    }
+
+def print_report():
+    data = report()
+    if MODE == 'json':
+        print(json.dumps(data, ensure_ascii=False), file=sys.stderr)
+        return
+    lines = [f"── 단계별 시간 (전체 {data['total_ms']:.1f} ms, 중첩된 단계 포함) ──"]
+    for name, item in data['phases'].items():
+        lines.append(f"  {name:<24} {item['ms']:10.2f} ms  ({item['calls']}회)")
+    lines.append(f"  읽은 바이트: {data['bytes']['read']} | 쓴 바이트: {data['bytes']['written']}")
+    lines.append("  " + ", ".join(f"{name}={value}" for name, value in sorted(data['counts'].items())))
+    print("\n".join(lines), file=sys.stderr)
+
+def run(func):
+    """func를 실행하고 측정 결과를 출력한다. cprofile 형식이면 cProfile 결과도 저장한다."""
+    if MODE != 'cprofile':
+        try:
+            return func()
+        finally:
+            print_report()
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        profiler.dump_stats(CPROFILE_FILE)
+        print_report()
+        print(f"cProfile 결과를 {CPROFILE_FILE}에 저장했습니다. (python -m pstats {CPROFILE_FILE})", file=sys.stderr)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(15)
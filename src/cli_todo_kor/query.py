@@ -0,0 +1,160 @@
+import re
+import shlex
+from datetime import datetime
+
+from .utils import all_of
+from .model import PRIORITY_CODES, PRIORITY_NAMES, DEFAULT_PRIORITY, _due_ordinal, _ordinal_text
+
+# 'todo list -q' 조회식. 공백으로 나눈 조건을 모두 만족하는 할 일만 보여준다.
+#   status:pending|completed   tag:업무[,개인]   prio:h[,m]   text:회의 (또는 그냥 회의)
+#   due<7d  due<=2026-01-31  due>=today  due:none      조건 앞의 '-'는 부정 (예: -tag:보류)
+#   위의 조건 이름으로 시작하지 않는 단어는 ':'가 있어도 내용 검색 (예: http://example.com)
+_TERM = re.compile(r'^(-?)([A-Za-z]+)(<=|>=|<|>|=|:)(.*)$')
+_KEYS = {'status': 'status', 'tag': 'tag', 'tags': 'tag', 'prio': 'prio', 'priority': 'prio',
+         'due': 'due', 'text': 'text'}
+_STATUS = {'pending': False, '미완료': False, 'completed': True, 'done': True, '완료': True}
+_PRIORITY = {'h': '높음', 'm': '중간', 'l': '낮음', '높음': '높음', '중간': '중간', '낮음': '낮음'}
+_NO_DUE = {'none', '없음'}
+_COMPARE = {
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+    '=': lambda a, b: a == b,
+}
+
+
+class Query:
+    """compile_query의 결과. 할 일 하나를 받아 참/거짓을 돌려주는 조건 함수로 사용한다.
+
+    SQLite 저장소는 where(SQL로 옮긴 조건 목록)와 params(이름 붙은 매개변수)를 WHERE 절에
+    넣고, SQL로 옮기지 못한 조건(내용 검색)을 합친 residual만 파이썬에서 검사한다.
+    """
+
+    __slots__ = ('check', 'where', 'params', 'residual')
+
+    def __init__(self, check, where, params, residual):
+        self.check = check
+        self.where = where
+        self.params = params
+        self.residual = residual
+
+    def __call__(self, todo):
+        return self.check(todo)
+
+
+def _due_value(value, today_ordinal):
+    # 7d/7(오늘부터 7일 뒤), -3d, today/오늘, YYYY-MM-DD를 날짜 서수로 바꿈
+    lowered = value.lower()
+    if lowered in ('today', '오늘'):
+        return today_ordinal
+    days = lowered[:-1] if lowered.endswith('d') else lowered
+    try:
+        return today_ordinal + int(days)
+    except ValueError:
+        pass
+    ordinal = _due_ordinal(value)
+    if ordinal is None:
+        raise ValueError(f"조회식의 날짜가 올바르지 않습니다: {value} (7d, today, YYYY-MM-DD 형식)")
+    return ordinal
+
+def _term_sql(key, op, value, today_ordinal, name):
+    """조건 하나를 SQLite 저장소의 (WHERE 절, 매개변수 dict)로 바꾼다. 옮길 수 없으면 None.
+
+    name은 매개변수 이름의 접두어. 조건은 _compile_term에서 이미 검사했다.
+    """
+    if key == 'status':
+        return "completed = :" + name, {name: int(_STATUS[value.lower()])}
+    if key == 'tag':
+        values = {f'{name}_{i}': tag for i, tag in enumerate(dict.fromkeys(value.split(',')))}
+        names = ', '.join(':' + param for param in values)
+        return f"id IN (SELECT todo_id FROM todo_tags WHERE tag IN ({names}))", values
+    if key == 'prio':
+        values = {f'{name}_{i}': _PRIORITY[v.lower()] for i, v in enumerate(dict.fromkeys(value.split(',')))}
+        names = ', '.join(':' + param for param in values)
+        clause = f"priority IN ({names})"
+        if PRIORITY_NAMES[DEFAULT_PRIORITY] in values.values():
+            # 알 수 없는 우선순위 값은 기본 우선순위로 취급 (model.Todo와 같음)
+            known = ', '.join(f"'{priority}'" for priority in PRIORITY_NAMES)
+            clause = f"({clause} OR priority NOT IN ({known}))"
+        return clause, values
+    if key == 'due':
+        # 날짜 형식이 올바른 마감 기한은 YYYY-MM-DD로 저장되므로 문자열 비교가 날짜 순서와 같고
+        # due_date 인덱스를 사용할 수 있음. date()가 NULL이면 잘못된 날짜 (서수가 None)
+        if value.lower() in _NO_DUE:
+            return "date(due_date) IS NULL", {}
+        sql_op = '=' if op == ':' else op
+        try:
+            bound = _ordinal_text(_due_value(value, today_ordinal))
+        except (ValueError, OverflowError):
+            return None  # 날짜로 나타낼 수 없는 범위 (예: due<9999999d)는 파이썬에서 비교
+        return f"(due_date {sql_op} :{name} AND date(due_date) IS NOT NULL)", {name: bound}
+    return None
+
+def _compile_term(key, op, value, today_ordinal):
+    if key != 'due' and op not in (':', '='):
+        raise ValueError(f"'{key}'에는 비교 연산자를 사용할 수 없습니다. ({key}:값 형식)")
+    if not value:
+        raise ValueError(f"조회식 '{key}'에 값이 없습니다.")
+    if key == 'status':
+        if value.lower() not in _STATUS:
+            raise ValueError(f"알 수 없는 상태입니다: {value} (pending, completed)")
+        completed = _STATUS[value.lower()]
+        return lambda todo: todo.completed == completed
+    if key == 'tag':
+        tags = set(value.split(','))
+        return lambda todo: not tags.isdisjoint(todo.tags)
+    if key == 'prio':
+        priorities = set()
+        for name in value.split(','):
+            if name.lower() not in _PRIORITY:
+                raise ValueError(f"알 수 없는 우선순위입니다: {name} (h, m, l)")
+            priorities.add(PRIORITY_CODES[_PRIORITY[name.lower()]])
+        return lambda todo: todo.priority_code in priorities
+    if key == 'due':
+        if value.lower() in _NO_DUE:
+            if op not in (':', '='):
+                raise ValueError("due:none에는 비교 연산자를 사용할 수 없습니다.")
+            return lambda todo: todo.due_ordinal is None
+        compare = _COMPARE['=' if op == ':' else op]
+        bound = _due_value(value, today_ordinal)
+        return lambda todo: todo.due_ordinal is not None and compare(todo.due_ordinal, bound)
+    from .index import matches
+    return lambda todo: matches(todo.description, value)
+
+def compile_query(text):
+    """조회식을 할 일(model.Todo) 하나를 받아 참/거짓을 돌려주는 조건 함수 하나로 만든다.
+
+    날짜 값과 우선순위 이름은 여기서 한 번만 해석하므로, 항목마다는 정수와 집합 비교만 한다.
+    조회식이 잘못되었으면 ValueError를 발생시킨다.
+    """
+    try:
+        tokens = shlex.split(text)
+    except ValueError:
+        raise ValueError("조회식의 따옴표가 맞지 않습니다.")
+    today_ordinal = datetime.now().date().toordinal()
+    checks = []
+    where = []
+    params = {}
+    residual = []
+    for number, token in enumerate(tokens):
+        match = _TERM.match(token)
+        if match and match.group(2).lower() in _KEYS:
+            negate, key, op, value = match.groups()
+            key = _KEYS[key.lower()]
+        else:
+            # 조건 이름이 없거나 조건 이름이 아닌 단어(http://..., note: 등)는 내용 검색
+            negate = token.startswith('-') and len(token) > 1
+            key, op, value = 'text', ':', token[1:] if negate else token
+        check = _compile_term(key, op, value, today_ordinal)
+        if negate:
+            check = (lambda inner: lambda todo: not inner(todo))(check)
+        checks.append(check)
+        sql = _term_sql(key, op, value, today_ordinal, f'q{number}')
+        if sql is None:
+            residual.append(check)
+        else:
+            where.append(f"NOT {sql[0]}" if negate else sql[0])
+            params.update(sql[1])
+    check = all_of(checks)
+    return None if check is None else Query(check, where, params, all_of(residual))
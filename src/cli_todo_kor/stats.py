@@ -0,0 +1,155 @@
+import json
+import os
+
+from .utils import TODO_DIR
+from .model import _due_ordinal
+from . import profiling
+# 개수 통계를 저장하는 파일 (저장할 때마다 변경분만큼 갱신)
+STATS_FILE = os.path.join(TODO_DIR, '.todos_stats.json')
+PRIORITIES = ['높음', '중간', '낮음']
+
+
+class Stats:
+    """할 일 개수 통계.
+
+    미완료 항목의 마감 기한은 날짜 서수별 개수로 보관하므로, 오늘 마감/마감 지남
+    개수는 날짜가 바뀌어도 목록을 다시 읽지 않고 구할 수 있다.
+    """
+
+    def __init__(self, signature=None):
+        self.signature = signature
+        self.total = 0
+        self.pending = 0
+        self.due = {}       # 날짜 서수 -> 미완료 항목 수
+        self.priority = {}  # 우선순위 -> 미완료 항목 수
+        self.tags = {}      # 태그 -> 항목 수
+
+    @classmethod
+    def build(cls, todos, signature):
+        stats = cls(signature)
+        for todo in todos:
+            stats.add(todo, 1)
+        return stats
+
+    def add(self, todo, sign):
+        """항목 하나를 더하거나(sign=1) 뺀다(sign=-1)."""
+        self.total += sign
+        for tag in todo.get('tags') or []:
+            _bump(self.tags, tag, sign)
+        if todo.get('completed', False):
+            return
+        self.pending += sign
+        _bump(self.priority, todo.get('priority', '중간'), sign)
+        ordinal = _due_ordinal(todo['due_date']) if 'due_date' in todo else None
+        if ordinal is not None:
+            _bump(self.due, ordinal, sign)
+
+    def apply(self, ops, signature):
+        for op in ops:
+            kind = op['op']
+            if kind == 'insert':
+                self.add(op['item'], 1)
+            elif kind == 'remove':
+                self.add(op['item'], -1)
+            else:
+                self.add(op['before'], -1)
+                self.add(op['after'], 1)
+        self.signature = signature
+
+    def due_today(self, today):
+        return self.due.get(today.toordinal(), 0)
+
+    def overdue(self, today):
+        today_ordinal = today.toordinal()
+        return sum(count for ordinal, count in self.due.items() if ordinal < today_ordinal)
+
+    def summary(self, today):
+        """(전체, 미완료, 오늘 마감) 개수."""
+        return self.total, self.pending, self.due_today(today)
+
+    def to_dict(self):
+        return {
+            'signature': self.signature,
+            'total': self.total,
+            'pending': self.pending,
+            'due': {str(ordinal): count for ordinal, count in self.due.items()},
+            'priority': self.priority,
+            'tags': self.tags,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data['signature'])
+        stats.total = data['total']
+        stats.pending = data['pending']
+        stats.due = {int(ordinal): count for ordinal, count in data['due'].items()}
+        stats.priority = data['priority']
+        stats.tags = data['tags']
+        return stats
+
+
+def _bump(counts, key, sign):
+    count = counts.get(key, 0) + sign
+    if count:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+def _read_stats(path=STATS_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return Stats.from_dict(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+        return None
+
+def _write_stats(stats, path=STATS_FILE):
+    from .locking import atomic_open
+    # 언제든 다시 만들 수 있으므로 디스크 동기화는 생략
+    with atomic_open(path, fsync=False) as f:
+        json.dump(stats.to_dict(), f, ensure_ascii=False)
+
+@profiling.timed('stats.read')
+def current_stats(storage):
+    """저장소와 서명이 같은 통계를 반환한다. 어긋나 있으면 전체를 다시 계산한다."""
+    from .utils import write_lock
+    stats = _read_stats()
+    if stats is None or stats.signature != storage.signature():
+        # 다시 계산하는 동안 저장이 끼어들면 서명과 내용이 어긋나므로 잠근 채로 읽음
+        with write_lock():
+            stats = Stats.build(storage.load(), storage.signature())
+            _write_stats(stats)
+    return stats
+
+def list_stats(directory):
+    """directory에 저장된 다른 목록의 통계.
+
+    저장된 통계가 최신이면 그 목록의 할 일 파일은 열지 않으므로, 여러 목록의 요약을
+    목록 크기와 관계없이 빠르게 구할 수 있다.
+    """
+    from .locking import file_lock
+    from .storage import storage_for
+    from .utils import TODO_LOCK_FILE
+    storage = storage_for(directory)
+    path = os.path.join(directory, os.path.basename(STATS_FILE))
+    stats = _read_stats(path)
+    if stats is None or stats.signature != storage.signature():
+        with file_lock(os.path.join(directory, os.path.basename(TODO_LOCK_FILE))):
+            stats = Stats.build(storage.load(), storage.signature())
+            _write_stats(stats, path)
+    return stats
+
+def update_stats(ops, old_signature, new_signature):
+    """저장소에 변경분을 기록한 직후 호출되어 통계를 변경분만큼 갱신한다."""
+    stats = _read_stats()
+    # 없거나 이미 어긋난 통계는 다음 사용 때 다시 계산
+    if stats is None or stats.signature != old_signature:
+        return
+    stats.apply(ops, new_signature)
+    _write_stats(stats)
+
+def resign_stats(old_signature, new_signature):
+    """내용은 같고 서명만 바뀐 경우 통계의 서명만 갱신한다."""
+    stats = _read_stats()
+    if stats is not None and stats.signature == old_signature:
+        stats.signature = new_signature
+        _write_stats(stats)
@@ -0,0 +1,634 @@
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+from .utils import (
+    TODO_DIR, TODO_FILE, TODO_STORAGE, TODO_LOG_FILE, TODO_LOG_COMPACT_BYTES, TODO_DB_FILE, TODO_COLUMNS_FILE,
+    TODO_LOCK_FILE, TODO_VERSION_FILE, all_of, apply_delta, _ensure_ids, select_todos
+)
+from .locking import file_lock, atomic_open
+from .model import (
+    Todo, TodoView, PRIORITY_CODES, DEFAULT_PRIORITY, json_default, loads_todos, todos_from_records, _intern_tags,
+    _due_ordinal
+)
+from .stats import current_stats
+from . import profiling
+
+
+def _file_signature(path):
+    # 파일 내용이 바뀌었는지 판단하기 위한 (수정 시각, 크기, inode)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+def _read_version(path=TODO_VERSION_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return int(f.read() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def _write_version(version, path=TODO_VERSION_FILE):
+    with atomic_open(path) as f:
+        f.write(str(version))
+
+
+class JsonStorage:
+    """todos.json 파일 전체를 읽고 쓰는 기본 저장소."""
+
+    def __init__(self, path=TODO_FILE):
+        self.path = path
+        # 같은 디렉터리의 시작 캐시 (파싱한 목록과 정렬 순서)
+        from .cache import WarmCache
+        self.cache = WarmCache(os.path.dirname(path))
+
+    def load(self):
+        # 서명을 먼저 읽어야 그 사이에 바뀐 내용이 이전 서명으로 캐시되지 않음
+        signature = self.signature()
+        todos = self.cache.load(signature)
+        if todos is None:
+            todos = _ensure_ids(self._parse())
+            self.cache.store(signature, todos)
+        return todos
+
+    def _parse(self):
+        todos = []
+        if os.path.exists(self.path):
+            try:
+                with profiling.phase('storage.read'), open(self.path, 'rb') as f:
+                    content = f.read()
+                profiling.add_bytes('read', len(content))
+                if content:
+                    with profiling.phase('storage.json_parse'):
+                        todos = loads_todos(content)
+            except json.JSONDecodeError:
+                # 손상된 파일을 빈 목록으로 덮어쓰지 않도록 따로 보관
+                backup = self.path + '.corrupt'
+                os.replace(self.path, backup)
+                print(f"경고: 할 일 파일이 손상되어 {backup}(으)로 옮겼습니다.", file=sys.stderr)
+                todos = []
+        return todos
+
+    def save(self, todos, ops=None):
+        self.cache.invalidate()
+        self._write_checkpoint(todos)
+        _write_version(self.version() + 1)
+        # 다음 명령(과 이 명령의 목록 출력)이 방금 저장한 내용을 다시 해석하지 않도록 캐시에 기록
+        self.cache.store(self.signature(), todos)
+
+    def signature(self):
+        return _file_signature(self.path)
+
+    def version(self):
+        """저장할 때마다 1씩 증가하는 버전 (낙관적 동시성 검사에 사용)."""
+        return _read_version()
+
+    @profiling.timed('storage.write')
+    def _write_checkpoint(self, todos):
+        with atomic_open(self.path) as f:
+            # Todo는 저장 파일 형식의 dict로 바꾸어 기록 (default 인자보다 인코더가 덜 돌아감)
+            json.dump([todo.to_dict() if isinstance(todo, Todo) else todo for todo in todos], f,
+                      indent=4, ensure_ascii=False)
+        profiling.add_file_bytes('written', self.path)
+
+    def _read_todos(self):
+        # 읽기 전용 조회에 사용할 목록 (메모리 캐시 저장소는 복사 없이 반환)
+        return self.load()
+
+    def _filter(self, todos, status=None, tags=None, search=None, predicate=None):
+        # 모든 조건을 하나의 조건 함수로 합침 (색인으로 구한 id 확인처럼 값싼 조건을 먼저 검사)
+        # 색인 모듈은 검색어나 태그 조건이 있을 때만 불러옴
+        if search or tags:
+            from .index import search_candidates, tag_query_ids, matches
+        checks = []
+        if search:
+            # 역색인으로 후보를 좁힌 뒤 후보만 실제로 비교
+            search_ids = search_candidates(search, self, todos)
+            if search_ids is not None:
+                checks.append(lambda t: t.id in search_ids)
+        if tags:
+            # 태그 색인의 집합 연산으로 조건을 만족하는 id를 구함
+            tag_ids = tag_query_ids(tags, self, lambda: {t.id for t in todos}, todos)
+            checks.append(lambda t: t.id in tag_ids)
+        if status == 'completed':
+            checks.append(lambda t: t.completed)
+        elif status == 'pending':
+            checks.append(lambda t: not t.completed)
+        if search:
+            checks.append(lambda t: matches(t.description, search))
+        checks.append(predicate)
+        return all_of(checks)
+
+    def _select(self, status=None, tags=None, search=None, sort_by='priority', predicate=None, limit=None, todos=None):
+        # (정렬된 앞의 limit개, 조건에 맞는 전체 개수). 목록을 한 번만 훑으며 중간 목록을 만들지 않음
+        todos = self._read_todos() if todos is None else todos
+        check = self._filter(todos, status, tags, search, predicate)
+        order = self._order(todos, sort_by, limit)
+        if order is not None:
+            # 저장해 둔 전체 정렬 순서를 조건으로 거르기만 함 (정렬하지 않음)
+            return select_todos(todos, check, None, limit, order)
+        return select_todos(todos, check, sort_by, limit)
+
+    def _order(self, todos, sort_by, limit):
+        """시작 캐시에 있는 sort_by의 전체 정렬 순서.
+
+        없으면 어차피 전체를 정렬하는 조회(limit 없음)일 때만 만들어 저장하고, 앞의 일부만 필요한 조회는
+        지금처럼 힙으로 고른다.
+        """
+        signature = self.signature()
+        # 우선순위 정렬만 오늘 날짜에 따라 달라짐 (utils._sort_key)
+        day = datetime.now().date().toordinal() if sort_by == 'priority' else None
+        order = self.cache.order(signature, sort_by, day)
+        if order is None and limit is None:
+            order = select_todos(todos, None, sort_by)[0].positions
+            self.cache.store_order(signature, sort_by, order, day)
+        return order
+
+    def find(self, ids):
+        """ids에 해당하는 할 일의 {id: (위치, 항목)}."""
+        return {todo['id']: (position, todo) for position, todo in enumerate(self._read_todos()) if todo['id'] in ids}
+
+    def query(self, status=None, tags=None, search=None, sort_by='priority', predicate=None, limit=None):
+        return self._select(status, tags, search, sort_by, predicate, limit)[0]
+
+    def summary(self, today):
+        # 저장할 때마다 갱신되는 통계를 사용 (목록을 읽지 않음)
+        return current_stats(self).summary(today)
+
+    def listing(self, today, status=None, tags=None, search=None, sort_by='priority', predicate=None, limit=None):
+        """목록 출력용 (조회 결과, 조건에 맞는 전체 개수, 요약)을 한 번 읽은 목록으로 함께 만든다."""
+        todos, total = self._select(status, tags, search, sort_by, predicate, limit)
+        return todos, total, self.summary(today)
+
+
+class LogStorage(JsonStorage):
+    """todos.json 체크포인트 위에 변경분 로그(todos.json.log)를 덧붙이는 저장소.
+
+    append=False이면 남아 있는 로그를 읽기만 하고, 저장할 때 체크포인트로 합친다.
+    """
+
+    def __init__(self, path=TODO_FILE, log_path=TODO_LOG_FILE, append=True):
+        super().__init__(path)
+        self.log_path = log_path
+        self.append = append
+        self._lock = threading.Lock()
+
+    def _parse(self):
+        # 체크포인트를 쓰는 중에는 체크포인트와 로그가 어긋나지 않도록 완료될 때까지 대기
+        with self._lock:
+            todos = super()._parse()
+            # 마지막 체크포인트 이후의 변경 기록을 재적용
+            if os.path.exists(self.log_path):
+                self._replay(todos)
+        return todos
+
+    def save(self, todos, ops=None):
+        if ops is not None and not ops:
+            return
+        self.cache.invalidate()
+        self._save(todos, ops)
+        self.cache.store(self.signature(), todos)
+
+    def _save(self, todos, ops):
+        # 로그가 기준 크기를 넘었으면 이번 저장에서 덧붙이는 대신 체크포인트로 합침
+        # (저장할 목록 전체가 이미 메모리에 있으므로 다시 읽지 않고, 저장 잠금 안에서 끝남)
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if ops is None or not self.append or log_size > TODO_LOG_COMPACT_BYTES:
+            with self._lock:
+                self._write_checkpoint(todos)
+                if os.path.exists(self.log_path):
+                    os.remove(self.log_path)
+            _write_version(self.version() + 1)
+            return
+        line = json.dumps({'ops': ops}, ensure_ascii=False, default=json_default) + '\n'
+        with self._lock:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                start = f.tell()
+                f.write(line)
+                size = f.tell()
+        profiling.add_bytes('written', size - start)
+        _write_version(self.version() + 1)
+
+    def signature(self):
+        return [_file_signature(self.path), _file_signature(self.log_path)]
+
+    @profiling.timed('storage.replay')
+    def _replay(self, todos):
+        known_ids = {todo.get('id') for todo in todos}
+        profiling.add_file_bytes('read', self.log_path)
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                # 다른 프로세스가 아직 기록 중인 마지막 줄(개행 없음)은 무시
+                if not line.endswith(b'\n'):
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break  # 기록 도중 중단된 줄은 무시
+                apply_delta(todos, record['ops'], known_ids)
+        return todos
+
+
+# 정렬 기준별 ORDER BY 절 (utils._sort_key와 같은 순서)
+_ORDER_BY = {
+    'priority': """
+        completed,
+        CASE WHEN completed = 0 AND date(due_date) < :today THEN 0 ELSE 1 END,
+        CASE priority WHEN '높음' THEN 0 WHEN '낮음' THEN 2 ELSE 1 END,
+        CASE WHEN completed = 0 AND date(due_date) IS NOT NULL THEN 0 ELSE 1 END,
+        CASE WHEN completed = 0 THEN date(due_date) END,
+        position""",
+    # 잘못된 날짜 문자열은 마감 기한이 없는 것으로 취급 (date()가 NULL)
+    'due-date': "completed, date(due_date) IS NULL, date(due_date), position",
+    'description': "completed, description, position",
+    'status': "completed, position",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    priority TEXT NOT NULL DEFAULT '중간',
+    due_date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_todos_position ON todos(position);
+CREATE INDEX IF NOT EXISTS idx_todos_completed ON todos(completed, position);
+CREATE INDEX IF NOT EXISTS idx_todos_priority ON todos(priority);
+CREATE INDEX IF NOT EXISTS idx_todos_due_date ON todos(due_date);
+CREATE TABLE IF NOT EXISTS todo_tags (
+    todo_id INTEGER NOT NULL REFERENCES todos(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (todo_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_todo_tags_tag ON todo_tags(tag, todo_id);
+"""
+
+
+class SqliteStorage:
+    """표준 라이브러리 sqlite3를 사용하는 저장소.
+
+    필터와 정렬은 인덱스를 사용하는 SQL 질의로 처리하므로
+    목록 조회 시 전체 할 일을 파이썬 객체로 읽어오지 않는다.
+    모든 행이 필요한 경우(load, 조건 없는 전체 목록)에는 json 저장소처럼 시작 캐시를 사용한다.
+    """
+
+    def __init__(self, path=TODO_DB_FILE, json_path=TODO_FILE):
+        self.path = path
+        self.json_path = json_path
+        self._conn = None
+        from .cache import WarmCache
+        self.cache = WarmCache(os.path.dirname(path), 'sqlite')
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            is_new = not os.path.exists(self.path)
+            import sqlite3
+            # 데몬의 지연 기록 스레드에서도 사용 (접근은 데몬의 잠금으로 직렬화됨)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn.executescript(_SCHEMA)
+            if is_new and os.path.exists(self.json_path):
+                self.migrate_from_json()
+        return self._conn
+
+    def migrate_from_json(self):
+        """기존 todos.json 내용을 한 번에 데이터베이스로 옮긴다."""
+        todos = LogStorage(self.json_path, self.json_path + ".log", append=False).load()
+        self.save(todos)
+        print(f"todos.json의 할 일 {len(todos)}개를 SQLite 저장소로 옮겼습니다.")
+
+    def _rows_to_todos(self, rows):
+        if not rows:
+            return []
+        ids = [row[0] for row in rows]
+        # 태그가 있는 항목만 {id: [태그]}에 담음
+        tags = {}
+        if len(ids) >= 2000 and 2 * len(ids) >= self.conn.execute("SELECT COUNT(*) FROM todo_tags").fetchone()[0]:
+            # 대부분의 행을 돌려줄 때는 IN 조회를 여러 번 하는 것보다 태그 표를 한 번 훑는 편이 빠름
+            wanted = set(ids)
+            for todo_id, tag in self.conn.execute("SELECT todo_id, tag FROM todo_tags ORDER BY todo_id, seq"):
+                if todo_id in wanted:
+                    tags.setdefault(todo_id, []).append(tag)
+            ids = ()
+        # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for todo_id, tag in self.conn.execute(
+                f"SELECT todo_id, tag FROM todo_tags WHERE todo_id IN ({placeholders}) ORDER BY todo_id, seq",
+                chunk
+            ):
+                tags.setdefault(todo_id, []).append(tag)
+        # Todo.record() 형식으로 만들어 한 번에 Todo로 바꿈 (만드는 동안 gc를 멈추고 __init__을 거치지 않음)
+        records = []
+        for todo_id, position, description, completed, priority, due_date in rows:
+            ordinal = _due_ordinal(due_date) if due_date else None
+            due_text = due_date if due_date and ordinal is None else None
+            records.append((todo_id, description, bool(completed), PRIORITY_CODES.get(priority, DEFAULT_PRIORITY),
+                            _intern_tags(tags.get(todo_id)), ordinal, due_text, None))
+        return todos_from_records(records)
+
+    def _view(self, rows, check=None, sort_by=None, limit=None):
+        # 조회한 행을 조건으로 거르고 정렬해 {위치: 항목}의 TodoView와 조건에 맞는 개수로 반환
+        todos = self._rows_to_todos(rows)
+        view, total = select_todos(todos, check, sort_by, limit)
+        return TodoView({rows[i][1]: todos[i] for i in view.positions}, [rows[i][1] for i in view.positions]), total
+
+    @profiling.timed('storage.sqlite')
+    def load(self):
+        # 서명을 먼저 읽어야 그 사이에 바뀐 내용이 이전 서명으로 캐시되지 않음
+        signature = self.signature()
+        todos = self.cache.load(signature)
+        if todos is None:
+            rows = self.conn.execute(
+                "SELECT id, position, description, completed, priority, due_date FROM todos ORDER BY position"
+            ).fetchall()
+            todos = self._rows_to_todos(rows)
+            self.cache.store(signature, todos)
+        return todos
+
+    def _insert(self, position, todo):
+        self.conn.execute(
+            "INSERT INTO todos (id, position, description, completed, priority, due_date) VALUES (?, ?, ?, ?, ?, ?)",
+            (todo['id'], position, todo['description'], int(todo.get('completed', False)),
+             todo.get('priority', '중간'), todo.get('due_date'))
+        )
+        self.conn.executemany(
+            "INSERT INTO todo_tags (todo_id, seq, tag) VALUES (?, ?, ?)",
+            [(todo['id'], seq, tag) for seq, tag in enumerate(todo.get('tags', []))]
+        )
+
+    def save(self, todos, ops=None):
+        self.cache.invalidate()
+        self._write_rows(todos, ops)
+        # 다음 명령이 방금 저장한 내용을 다시 조회하지 않도록 캐시에 기록
+        self.cache.store(self.signature(), todos)
+
+    def _write_rows(self, todos, ops):
+        with self.conn:
+            if ops is None:
+                self.conn.execute("DELETE FROM todo_tags")
+                self.conn.execute("DELETE FROM todos")
+                for position, todo in enumerate(todos):
+                    self._insert(position, todo)
+                self._bump_version()
+                return
+            # 지운 행 중 가장 앞 위치. 위치 번호는 지울 때마다가 아니라 끝에 (또는 삽입 전에) 한 번만 다시 매김
+            first_gap = None
+            for op in ops:
+                kind = op['op']
+                if kind == 'insert':
+                    if first_gap is not None:
+                        self._renumber(first_gap)
+                        first_gap = None
+                    self.conn.execute("UPDATE todos SET position = position + 1 WHERE position >= ?", (op['index'],))
+                    self._insert(op['index'], op['item'])
+                    continue
+                item = op['item'] if kind == 'remove' else op['before']
+                row = self.conn.execute("SELECT position FROM todos WHERE id = ?", (item['id'],)).fetchone()
+                if row is None:
+                    continue
+                self.conn.execute("DELETE FROM todos WHERE id = ?", (item['id'],))
+                if kind == 'remove':
+                    first_gap = row[0] if first_gap is None else min(first_gap, row[0])
+                else:
+                    self._insert(row[0], op['after'])
+            if first_gap is not None:
+                self._renumber(first_gap)
+            self._bump_version()
+
+    def _renumber(self, start):
+        # start 앞은 빈 번호가 없으므로 start부터의 행만 순서대로 start, start + 1, ...로 바꿈
+        rows = self.conn.execute("SELECT id, position FROM todos WHERE position >= ? ORDER BY position",
+                                 (start,)).fetchall()
+        self.conn.executemany("UPDATE todos SET position = ? WHERE id = ?",
+                              [(position, todo_id) for position, (todo_id, old) in enumerate(rows, start)
+                               if position != old])
+
+    def version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def _bump_version(self):
+        # 데이터 변경과 같은 트랜잭션 안에서 버전을 올림
+        self.conn.execute(f"PRAGMA user_version = {self.version() + 1}")
+
+    def signature(self):
+        return _file_signature(self.path)
+
+    def _id_filter(self, table, ids):
+        # 색인에서 구한 id 집합을 임시 테이블에 넣어 조인
+        self.conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY)")
+        self.conn.execute(f"DELETE FROM temp.{table}")
+        self.conn.executemany(f"INSERT INTO temp.{table} (id) VALUES (?)", ((i,) for i in ids))
+        return f"id IN (SELECT id FROM temp.{table})"
+
+    @profiling.timed('storage.sqlite')
+    def _select(self, status=None, tags=None, search=None, sort_by='priority', predicate=None, limit=None):
+        if not (status or tags or search or predicate) and limit is None:
+            # 모든 행을 돌려줘야 하므로 json 저장소처럼 시작 캐시의 목록과 정렬 순서를 사용
+            todos = self.load()
+            return select_todos(todos, None, None, None, JsonStorage._order(self, todos, sort_by, None))
+        if search or tags:
+            from .index import search_candidates, tag_query_ids, matches
+        where = []
+        params = {'today': datetime.now().date().isoformat()}
+        if status == 'completed':
+            where.append("completed = 1")
+        elif status == 'pending':
+            where.append("completed = 0")
+        if search:
+            ids = search_candidates(search, self)
+            if ids is not None:
+                where.append(self._id_filter('search_ids', ids))
+        if tags:
+            ids = tag_query_ids(tags, self, lambda: {row[0] for row in self.conn.execute("SELECT id FROM todos")})
+            where.append(self._id_filter('tag_ids', ids))
+        if getattr(predicate, 'where', None):
+            # 'list -q' 조회식 중 SQL로 옮긴 조건은 WHERE 절로 처리하고 나머지만 파이썬에서 검사
+            where.extend(predicate.where)
+            params.update(predicate.params)
+            predicate = predicate.residual
+        sql_from = " FROM todos"
+        if where:
+            sql_from += " WHERE " + " AND ".join(where)
+        sql = "SELECT id, position, description, completed, priority, due_date" + sql_from
+        checks = [predicate]
+        if search:
+            checks.append(lambda t: matches(t.description, search))
+        check = all_of(checks)
+        if check is None and limit is not None:
+            # SQL만으로 거를 수 있으면 개수와 정렬된 앞의 limit개만 조회
+            total = self.conn.execute("SELECT COUNT(*)" + sql_from, params).fetchone()[0]
+            sql += " ORDER BY " + _ORDER_BY.get(sort_by, 'position') + " LIMIT :limit"
+            rows = self.conn.execute(sql, dict(params, limit=limit)).fetchall()
+            return self._view(rows)[0], total
+        # 조건에 맞는 행을 위치 순서(인덱스)로 읽고 남은 조건과 정렬은 파이썬에서 처리
+        # (행을 모두 돌려줄 때는 SQL의 ORDER BY보다 빠름)
+        return self._view(self.conn.execute(sql + " ORDER BY position", params).fetchall(), check, sort_by, limit)
+
+    def find(self, ids):
+        rows = self.conn.execute("SELECT id, position, description, completed, priority, due_date FROM todos WHERE "
+                                 + self._id_filter('find_ids', ids)).fetchall()
+        return {row[0]: (row[1], todo) for row, todo in zip(rows, self._rows_to_todos(rows))}
+
+    def query(self, status=None, tags=None, search=None, sort_by='priority', predicate=None, limit=None):
+        return self._select(status, tags, search, sort_by, predicate, limit)[0]
+
+    def summary(self, today):
+        return current_stats(self).summary(today)
+
+    def listing(self, today, status=None, tags=None, search=None, sort_by='priority', predicate=None, limit=None):
+        todos, total = self._select(status, tags, search, sort_by, predicate, limit)
+        return todos, total, self.summary(today)
+
+
+class ColumnarStorage(JsonStorage):
+    """열 단위 이진 파일(todos.col)을 mmap으로 읽는 저장소.
+
+    상태 필터, 조회식, 정렬은 필요한 열만 읽어 처리하고, 설명은 검색할 때와 결과로 돌려줄 행에 대해서만
+    디코딩한다. 요약(전체/미완료/오늘 마감)은 파일 헤더와 마감 기한별 개수 구역만 읽는다.
+    저장할 때는 파일 전체를 다시 쓴다.
+    """
+
+    def __init__(self, path=TODO_COLUMNS_FILE, json_path=TODO_FILE):
+        # 파일을 mmap으로 바로 읽으므로 시작 캐시(JsonStorage.cache)는 만들지 않음.
+        # json 저장소와 같은 디렉터리의 캐시를 공유하면 'todo convert' 뒤에 이전 내용을 읽을 수 있음
+        self.path = path
+        self.json_path = json_path
+        self._columns = None
+
+    def migrate_from_json(self):
+        """기존 todos.json 내용을 컬럼 파일로 옮긴다."""
+        todos = LogStorage(self.json_path, self.json_path + ".log", append=False).load()
+        self._write(todos)
+        print(f"todos.json의 할 일 {len(todos)}개를 컬럼 저장소로 옮겼습니다.")
+
+    def columns(self):
+        """현재 파일을 연 ColumnFile. 파일이 없으면 None."""
+        from .columnar import ColumnFile, ColumnFormatError
+        signature = self.signature()
+        if self._columns is not None and self._columns.signature == signature:
+            return self._columns
+        self.close()
+        if signature is None:
+            if not os.path.exists(self.json_path):
+                return None
+            self.migrate_from_json()
+        try:
+            self._columns = ColumnFile(self.path)
+        except ColumnFormatError:
+            # 손상된 파일을 빈 목록으로 덮어쓰지 않도록 따로 보관
+            backup = self.path + '.corrupt'
+            os.replace(self.path, backup)
+            print(f"경고: 할 일 파일이 손상되어 {backup}(으)로 옮겼습니다.", file=sys.stderr)
+            return None
+        return self._columns
+
+    def close(self):
+        if self._columns is not None:
+            self._columns.close()
+            self._columns = None
+
+    @profiling.timed('storage.columnar')
+    def load(self):
+        columns = self.columns()
+        return _ensure_ids(columns.todos() if columns is not None else [])
+
+    def save(self, todos, ops=None):
+        self._write(todos)
+        _write_version(self.version() + 1)
+
+    @profiling.timed('storage.write')
+    def _write(self, todos):
+        # 열린 매핑이 있으면 (Windows에서) 파일을 교체할 수 없으므로 먼저 닫음
+        from .columnar import write_columns
+        self.close()
+        with atomic_open(self.path, 'wb') as f:
+            write_columns(f, todos)
+        profiling.add_file_bytes('written', self.path)
+
+    @profiling.timed('storage.columnar')
+    def _select(self, status=None, tags=None, search=None, sort_by='priority', predicate=None, limit=None):
+        if search or tags:
+            from .index import search_candidates, tag_query_ids, matches
+        columns = self.columns()
+        if columns is None:
+            return TodoView([], []), 0
+        # 상태는 완료 열만으로 후보 위치를 고름
+        positions = columns.positions(status == 'completed') if status in ('completed', 'pending') else None
+        checks = []
+        if search:
+            search_ids = search_candidates(search, self)
+            if search_ids is not None:
+                checks.append(lambda row: row.id in search_ids)
+        if tags:
+            tag_ids = tag_query_ids(tags, self, lambda: set(columns.ids))
+            checks.append(lambda row: row.id in tag_ids)
+        if search:
+            checks.append(lambda row: matches(row.description, search))
+        checks.append(predicate)
+        view, total = select_todos(columns, all_of(checks), sort_by, limit, positions)
+        # 돌려줄 행만 Todo로 만듦 (설명은 이때 디코딩)
+        return TodoView({position: columns.todo(position) for position in view.positions}, view.positions), total
+
+    def find(self, ids):
+        columns = self.columns()
+        if columns is None:
+            return {}
+        return {todo_id: (position, columns.todo(position))
+                for position, todo_id in enumerate(columns.ids) if todo_id in ids}
+
+    def summary(self, today):
+        columns = self.columns()
+        if columns is None:
+            return 0, 0, 0
+        return columns.count, columns.pending, columns.due_today(today.toordinal())
+
+
+_STORAGE_CLASSES = {
+    'json': JsonStorage,
+    'log': LogStorage,
+    'sqlite': SqliteStorage,
+    'columnar': ColumnarStorage,
+}
+
+_storage = None
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        # 디렉토리가 없으면 생성
+        if not os.path.exists(TODO_DIR):
+            os.makedirs(TODO_DIR)
+        if TODO_STORAGE == 'json' and os.path.exists(TODO_LOG_FILE):
+            # log 모드에서 json 모드로 바꾼 경우 남은 로그를 먼저 반영
+            _storage = LogStorage(append=False)
+        else:
+            _storage = _STORAGE_CLASSES.get(TODO_STORAGE, JsonStorage)()
+    return _storage
+
+def storage_for(directory):
+    """directory에 저장된 목록을 현재 저장 방식으로 읽는 저장소 (다른 목록의 요약에 사용)."""
+    path = os.path.join(directory, os.path.basename(TODO_FILE))
+    if TODO_STORAGE == 'sqlite':
+        return SqliteStorage(os.path.join(directory, os.path.basename(TODO_DB_FILE)), path)
+    if TODO_STORAGE == 'columnar':
+        return ColumnarStorage(os.path.join(directory, os.path.basename(TODO_COLUMNS_FILE)), path)
+    if TODO_STORAGE == 'log' or os.path.exists(path + '.log'):
+        return LogStorage(path, path + '.log', append=TODO_STORAGE == 'log')
+    return JsonStorage(path)
+
+def set_storage(storage):
+    """현재 프로세스에서 사용할 저장소를 바꾼다. (예: 데몬의 메모리 캐시 저장소)"""
+    global _storage
+    _storage = storage
@@ -1,17 +1,30 @@
 #!/usr/bin/env python3
 import argparse
+import os
 import sys
-from datetime import timedelta
-from .core import (
-    add_todo, edit_todo, complete_todo, delete_todo, 
-    clear_completed_todos
-)
-from .display import list_todos, Colors
-from .undo import pop_undo, pop_redo
-from .utils import _parse_due_date, log_command, get_command_history, clear_command_history, get_project_version, load_todos
-
-def main():
-    todo_ascii_art = """
+
+# 시작 속도를 위해 명령 실행에 필요한 모듈은 실제로 사용할 때 불러온다.
+
+# 약어 매핑
+ALIAS_MAP = {
+    "a": "add",
+    "ls": "list",
+    "l": "list",
+    "c": "complete",
+    "comp": "complete",
+    "d": "delete",
+    "del": "delete",
+    "e": "edit",
+    "s": "search",
+    "clr": "clear",
+    "u": "undo",
+    "r": "redo",
+}
+
+# batch 입력 한 줄에서 사용할 수 있는 명령어
+BATCH_COMMANDS = ["add", "edit", "complete", "delete"]
+
+TODO_ASCII_ART = """
     ████████╗ ██████╗ ███████╗  ██████╗ 
     ╚══██╔══╝██╔═══██╗██╔═══██╗██╔═══██╗
        ██║   ██║   ██║██║   ██║██║   ██║
@@ -19,51 +32,8 @@ def main():
        ██║   ╚██████╔╝███████╔╝╚██████╔╝ 
        ╚═╝    ╚═════╝ ╚═════╝   ╚═════╝  
 """
-    print(f"{Colors.BOLD}{todo_ascii_art}{Colors.ENDC}")
-    description_text = f"""{Colors.BOLD}{Colors.BLUE}CLI 기반 할 일 목록 관리자 (버전: {get_project_version()}){Colors.ENDC}
 
-사용 가능한 명령어:
-  add       새로운 할 일을 추가합니다.
-  clear     완료된 모든 할 일을 삭제합니다.
-  complete  할 일을 완료 상태로 변경합니다.
-  delete    할 일을 삭제합니다.
-  edit      할 일을 수정합니다.
-  list      할 일 목록을 보여줍니다.
-  log       실행된 명령어 기록을 보여줍니다.
-  redo      마지막 실행 취소를 다시 실행합니다.
-  search    키워드로 할 일을 검색합니다.
-  undo      마지막 작업을 실행 취소합니다.
-
-각 명령어의 상세 도움말: todo <명령어> -h"""
-
-    # 약어 매핑
-    alias_map = {
-        "a": "add",
-        "ls": "list",
-        "l": "list",
-        "c": "complete",
-        "comp": "complete",
-        "d": "delete",
-        "del": "delete",
-        "e": "edit",
-        "s": "search",
-        "clr": "clear",
-        "u": "undo",
-        "r": "redo",
-    }
-
-    # 유효한 명령어 목록 (약어 포함)
-    valid_commands = list(alias_map.keys()) + list(alias_map.values()) + ["log"]
-    valid_commands = list(set(valid_commands)) # 중복 제거
-
-    parser = argparse.ArgumentParser(
-        description=description_text,
-        formatter_class=argparse.RawTextHelpFormatter
-    )
-    subparsers = parser.add_subparsers(dest="command", help=argparse.SUPPRESS)
-
-    # 'add' 명령어
-    add_parser = subparsers.add_parser("add", help="새로운 할 일을 추가합니다. (약어: a)")
+def _add_add_arguments(add_parser):
     add_parser.add_argument("description", type=str, help="추가할 할 일 내용")
     add_parser.add_argument("--due", type=str, help="마감 기한 (YYYY-MM-DD 형식)", dest="due_date")
     add_parser.add_argument(
@@ -76,26 +46,7 @@ def main():
     )
     add_parser.add_argument("--tags", type=str, nargs='*', help="할 일에 추가할 태그 (예: #업무 #긴급)", dest="tags")
 
-    # 'list' 명령어
-    list_parser = subparsers.add_parser("list", help="할 일 목록을 보여줍니다. (약어: ls, l)")
-    list_parser.add_argument("--status", type=str, choices=['pending', 'completed'], help="상태별로 필터링 (pending, completed)")
-    list_parser.add_argument("--sort-by", type=str, choices=['priority', 'due-date', 'description', 'status'], default='priority', help="정렬 기준. 'priority'는 그룹화하여 표시(기본값), 그 외는 목록 정렬.")
-    list_parser.add_argument("--tags", type=str, nargs='*', help="태그로 필터링 (예: #업무)", dest="tag_filter")
-
-    # 'search' 명령어
-    search_parser = subparsers.add_parser("search", help="키워드로 할 일을 검색합니다. (약어: s)")
-    search_parser.add_argument("keyword", type=str, help="검색할 키워드")
-
-    # 'complete' 명령어
-    complete_parser = subparsers.add_parser("complete", help="할 일을 완료 상태로 변경합니다. (약어: c, comp)")
-    complete_parser.add_argument("index", type=int, help="완료할 할 일의 번호")
-
-    # 'delete' 명령어
-    delete_parser = subparsers.add_parser("delete", help="할 일을 삭제합니다. (약어: d, del)")
-    delete_parser.add_argument("indexes", type=int, nargs='+', help="삭제할 할 일의 번호(여러 개 가능)")
-
-    # 'edit' 명령어
-    edit_parser = subparsers.add_parser("edit", help="할 일을 수정합니다. (약어: e)")
+def _add_edit_arguments(edit_parser):
     edit_parser.add_argument("index", type=int, help="수정할 할 일의 번호")
     edit_parser.add_argument("--desc", type=str, help="새로운 할 일 내용", dest="new_description")
     edit_parser.add_argument("--due", type=str, help="새로운 마감 기한 (YYYY-MM-DD)", dest="new_due_date")
@@ -109,58 +60,398 @@ def main():
     )
     edit_parser.add_argument("--tags", type=str, nargs='*', help="새로운 태그 (기존 태그를 덮어씁니다)", dest="new_tags")
 
-    # 'clear' 명령어
-    subparsers.add_parser("clear", help="완료된 모든 할 일을 삭제합니다. (약어: clr)")
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("1 이상의 정수를 입력하세요.")
+    return number
+
+def _non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError("0 이상의 정수를 입력하세요.")
+    return number
+
+def _add_list_arguments(list_parser):
+    list_parser.add_argument("--status", type=str, choices=['pending', 'completed'], help="상태별로 필터링 (pending, completed)")
+    list_parser.add_argument("--sort-by", type=str, choices=['priority', 'due-date', 'description', 'status'], default='priority', help="정렬 기준. 'priority'는 그룹화하여 표시(기본값), 그 외는 목록 정렬.")
+    list_parser.add_argument("--tags", type=str, nargs='*', help="태그로 필터링 (예: 업무 긴급, 업무 or 개인, 업무 and not 보류)", dest="tag_filter")
+    list_parser.add_argument("-q", "--query", type=str, help="조회식으로 필터링 (예: \"status:pending tag:업무 due<7d prio:h text:회의\")")
+    list_parser.add_argument("--limit", type=_positive_int, help="최대 N개만 표시합니다.")
+    list_parser.add_argument("--page", type=_positive_int, help="N번째 페이지를 표시합니다. (페이지 크기: --limit, 기본값 20)")
+    list_parser.add_argument("--offset", type=_non_negative_int, help="앞의 N개를 건너뛰고 표시합니다.")
+    list_parser.add_argument("--archived", action="store_true", help="보관된 할 일을 보여줍니다.")
+    list_parser.add_argument("--watch", action="store_true", help="저장 파일이 바뀔 때마다 목록을 다시 그립니다. (Ctrl+C로 종료)")
+
+def _add_search_arguments(search_parser):
+    search_parser.add_argument("keyword", type=str, help="검색할 키워드")
+
+def _add_complete_arguments(complete_parser):
+    complete_parser.add_argument("index", type=int, help="완료할 할 일의 번호")
+
+def _add_delete_arguments(delete_parser):
+    delete_parser.add_argument("indexes", type=int, nargs='+', help="삭제할 할 일의 번호(여러 개 가능)")
+
+def _add_batch_arguments(batch_parser):
+    batch_parser.add_argument("file", nargs='?', default='-', help="작업 목록 파일 (생략하거나 '-'이면 표준 입력)")
+    batch_parser.add_argument("--no-render", action="store_true", help="처리 후 할 일 목록을 출력하지 않습니다.")
+    batch_parser.add_argument("--json", action="store_true", help="처리 결과를 JSON으로 출력합니다. (목록 출력 생략)")
+
+def _add_clear_arguments(clear_parser):
+    clear_parser.add_argument("--archive", action="store_true", help="삭제하지 않고 보관소로 옮깁니다.")
 
-    # 'undo' 명령어
-    subparsers.add_parser("undo", help="마지막 작업을 실행 취소합니다. (약어: u)")
-    # 'redo' 명령어
-    subparsers.add_parser("redo", help="마지막 실행 취소를 다시 실행합니다. (약어: r)")
+def _add_archive_arguments(archive_parser):
+    archive_parser.add_argument("--days", type=_non_negative_int, help="완료한 지 N일 이상 지난 할 일을 보관합니다. (기본값: 30, 0이면 전체)")
 
-    # 'log' 명령어
-    log_parser = subparsers.add_parser("log", help="실행된 명령어 기록을 보여줍니다.")
+def _date_ordinal(value):
+    # --due와 같은 형식 (YYYY-MM-DD 또는 X일 뒤)을 날짜 서수로 변환
+    from datetime import date
+    from .model import _due_ordinal
+    ordinal = _due_ordinal(value)
+    if ordinal is not None:
+        return ordinal
+    try:
+        return date.today().toordinal() + int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("YYYY-MM-DD 또는 숫자(X일 뒤) 형식으로 입력하세요.")
+
+def _add_due_arguments(due_parser):
+    due_parser.add_argument("--within", type=_non_negative_int, metavar="N", help="오늘부터 N일 안에 마감인 할 일")
+    due_parser.add_argument("--before", type=_date_ordinal, metavar="DATE", help="DATE 전에 마감인 할 일 (YYYY-MM-DD 또는 X일 뒤)")
+    due_parser.add_argument("--after", type=_date_ordinal, metavar="DATE", help="DATE 뒤에 마감인 할 일")
+    due_parser.add_argument("--overdue", action="store_true", help="마감 기한이 지난 할 일")
+    due_parser.add_argument("--count", action="store_true", help="개수만 출력합니다. (셸 프롬프트용)")
+
+def _add_lists_arguments(lists_parser):
+    lists_parser.add_argument("--overdue", action="store_true", help="마감 기한이 지난 할 일이 있는 목록만 보여줍니다.")
+
+def _add_import_arguments(import_parser):
+    import_parser.add_argument("file", nargs='?', default='-', help="가져올 파일 (생략하거나 '-'이면 표준 입력)")
+    import_parser.add_argument("--format", choices=['jsonl', 'csv', 'ics'], dest="fmt", help="파일 형식 (생략하면 확장자로 판단)")
+    import_parser.add_argument("--batch-size", type=_positive_int, help="한 번에 저장할 할 일 수 (기본값: 10000)")
+
+def _add_export_arguments(export_parser):
+    export_parser.add_argument("file", nargs='?', default='-', help="내보낼 파일 (생략하거나 '-'이면 표준 출력)")
+    export_parser.add_argument("--format", choices=['jsonl', 'csv', 'ics'], dest="fmt", help="파일 형식 (생략하면 확장자로 판단)")
+
+def _add_convert_arguments(convert_parser):
+    convert_parser.add_argument("target", choices=['columnar', 'json'],
+                                help="변환할 형식 (columnar: todos.json → todos.col, json: todos.col → todos.json)")
+
+def _add_daemon_arguments(daemon_parser):
+    daemon_parser.add_argument("--stop", action="store_true", help="실행 중인 데몬을 종료합니다.")
+    daemon_parser.add_argument("--status", action="store_true", help="데몬 실행 여부를 확인합니다.")
+
+def _add_log_arguments(log_parser):
     log_parser.add_argument("--last", type=int, help="최근 N개의 명령어만 보여줍니다.")
     log_parser.add_argument("--clear", action="store_true", help="명령어 기록을 삭제합니다.")
 
-    # sys.argv 조작 (argparse 파싱 전에)
+# 명령어 이름: (도움말, 인자 정의 함수)
+COMMANDS = {
+    "add": ("새로운 할 일을 추가합니다. (약어: a)", _add_add_arguments),
+    "list": ("할 일 목록을 보여줍니다. (약어: ls, l)", _add_list_arguments),
+    "search": ("키워드로 할 일을 검색합니다. (약어: s)", _add_search_arguments),
+    "complete": ("할 일을 완료 상태로 변경합니다. (약어: c, comp)", _add_complete_arguments),
+    "delete": ("할 일을 삭제합니다. (약어: d, del)", _add_delete_arguments),
+    "edit": ("할 일을 수정합니다. (약어: e)", _add_edit_arguments),
+    "clear": ("완료된 모든 할 일을 삭제합니다. (약어: clr)", _add_clear_arguments),
+    "archive": ("오래전에 완료된 할 일을 보관소로 옮깁니다.", _add_archive_arguments),
+    "undo": ("마지막 작업을 실행 취소합니다. (약어: u)", None),
+    "redo": ("마지막 실행 취소를 다시 실행합니다. (약어: r)", None),
+    "batch": ("여러 작업을 한 번에 처리합니다.", _add_batch_arguments),
+    "import": ("파일(JSONL, CSV, iCalendar)에서 할 일을 가져옵니다.", _add_import_arguments),
+    "export": ("할 일을 파일(JSONL, CSV, iCalendar)로 내보냅니다.", _add_export_arguments),
+    "convert": ("할 일 파일을 JSON과 컬럼 형식(todos.col) 사이에서 변환합니다.", _add_convert_arguments),
+    "daemon": ("명령을 빠르게 처리하는 상주 프로세스를 실행합니다.", _add_daemon_arguments),
+    "tags": ("태그별 할 일 개수를 보여줍니다.", None),
+    "due": ("마감 기한 범위로 미완료 할 일을 보여줍니다.", _add_due_arguments),
+    "stats": ("할 일 통계를 보여줍니다.", None),
+    "lists": ("모든 목록의 할 일 개수를 보여줍니다.", _add_lists_arguments),
+    "log": ("실행된 명령어 기록을 보여줍니다.", _add_log_arguments),
+}
+
+def _description_text():
+    # 버전 조회(importlib.metadata)는 전체 도움말을 출력할 때만 수행
+    from .display import Colors
+    from .utils import get_project_version
+    return f"""{Colors.BOLD}{Colors.BLUE}CLI 기반 할 일 목록 관리자 (버전: {get_project_version()}){Colors.ENDC}
+
+사용 가능한 명령어:
+  add       새로운 할 일을 추가합니다.
+  archive   오래전에 완료된 할 일을 보관소로 옮깁니다.
+  batch     여러 작업을 한 번에 처리합니다.
+  clear     완료된 모든 할 일을 삭제합니다.
+  complete  할 일을 완료 상태로 변경합니다.
+  daemon    명령을 빠르게 처리하는 상주 프로세스를 실행합니다.
+  delete    할 일을 삭제합니다.
+  due       마감 기한 범위로 미완료 할 일을 보여줍니다.
+  edit      할 일을 수정합니다.
+  export    할 일을 파일(JSONL, CSV, iCalendar)로 내보냅니다.
+  import    파일(JSONL, CSV, iCalendar)에서 할 일을 가져옵니다.
+  list      할 일 목록을 보여줍니다.
+  lists     모든 목록의 할 일 개수를 보여줍니다.
+  log       실행된 명령어 기록을 보여줍니다.
+  redo      마지막 실행 취소를 다시 실행합니다.
+  search    키워드로 할 일을 검색합니다.
+  stats     할 일 통계를 보여줍니다.
+  tags      태그별 할 일 개수를 보여줍니다.
+  undo      마지막 작업을 실행 취소합니다.
+
+각 명령어의 상세 도움말: todo <명령어> -h
+다른 목록 사용: todo --list <이름> <명령어> (예: todo --list 업무 add "회의 준비")"""
+
+def _build_parser(command=None):
+    """command가 주어지면 그 명령어의 하위 파서만 만든다. 없으면 전체 도움말용 파서를 만든다."""
+    parser = argparse.ArgumentParser(
+        description=_description_text() if command is None else None,
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest="command", help=argparse.SUPPRESS)
+    for name, (help_text, add_arguments) in COMMANDS.items():
+        if command is not None and name != command:
+            continue
+        sub_parser = subparsers.add_parser(name, help=help_text)
+        if add_arguments:
+            add_arguments(sub_parser)
+    return parser
+
+class _BatchLineParser(argparse.ArgumentParser):
+    # 한 줄의 오류로 전체 일괄 처리가 종료되지 않도록 예외로 전달
+    def error(self, message):
+        raise ValueError(message)
+
+def _parse_batch_lines(lines):
+    import shlex
+    parser = _BatchLineParser(prog="batch", add_help=False)
+    subparsers = parser.add_subparsers(dest="command")
+    _add_add_arguments(subparsers.add_parser("add", add_help=False))
+    _add_edit_arguments(subparsers.add_parser("edit", add_help=False))
+    subparsers.add_parser("complete", add_help=False).add_argument("index", type=int)
+    subparsers.add_parser("delete", add_help=False).add_argument("indexes", type=int, nargs='+')
+
+    commands = []
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        # 빈 줄과 '# '로 시작하는 주석은 건너뜀
+        if not line or line.startswith('# '):
+            continue
+        try:
+            tokens = shlex.split(line)
+            if tokens[0] in ALIAS_MAP:
+                tokens[0] = ALIAS_MAP[tokens[0]]
+            # 명령어 없이 내용만 적은 줄은 'add'로 처리
+            if tokens[0] not in BATCH_COMMANDS:
+                tokens.insert(0, "add")
+            params = vars(parser.parse_args(tokens))
+            commands.append((line_no, params.pop("command"), params))
+        except ValueError as e:
+            commands.append((line_no, None, {"error": f"{line_no}번째 줄을 해석할 수 없습니다: {e}"}))
+    return commands
+
+def run_batch_command(args):
+    if args.file == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    from .core import run_batch
+    from .display import list_todos, Colors
+    summary = run_batch(_parse_batch_lines(lines))
+    if args.json:
+        import json
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+    for result in summary['results']:
+        for message in result['messages']:
+            print(message)
+    print(f"{Colors.BLUE}일괄 처리: 성공 {summary['succeeded']}개, 실패 {summary['failed']}개{Colors.ENDC}")
+    if not args.no_render:
+        list_todos()
+
+def run_import_command(args):
+    from .transfer import import_todos, IMPORT_BATCH_SIZE
+    from .display import Colors
+    try:
+        summary = import_todos(args.file, args.fmt, args.batch_size or IMPORT_BATCH_SIZE)
+    except (OSError, ValueError) as e:
+        print(f"가져오기 실패: {e}")
+        return
+    print(f"{Colors.BLUE}가져오기: 추가 {summary['added']}개, 중복 {summary['duplicates']}개, "
+          f"오류 {summary['invalid']}개{Colors.ENDC}")
+    if summary['errors']:
+        more = " ..." if summary['invalid'] > len(summary['errors']) else ""
+        print(f"잘못된 레코드 위치(줄): {', '.join(map(str, summary['errors']))}{more}")
+    if summary['added']:
+        print("'todo undo'로 가져온 할 일을 한 번에 되돌릴 수 있습니다.")
+
+def run_export_command(args):
+    from .transfer import export_todos
+    try:
+        count = export_todos(args.file, args.fmt)
+    except (OSError, ValueError) as e:
+        print(f"내보내기 실패: {e}", file=sys.stderr)
+        return
+    # 표준 출력으로 내보낸 경우에는 내용과 섞이지 않도록 표준 오류로 알림
+    print(f"할 일 {count}개를 내보냈습니다.", file=sys.stderr if args.file == '-' else sys.stdout)
+
+def run_convert_command(args):
+    from .columnar import json_to_columnar, columnar_to_json
+    from .storage import _read_version, _write_version
+    from .utils import TODO_FILE, TODO_COLUMNS_FILE, TODO_STORAGE, write_lock
+    from .display import Colors
+    try:
+        with write_lock():
+            if args.target == 'columnar':
+                count = json_to_columnar(TODO_FILE, TODO_COLUMNS_FILE)
+            else:
+                count = columnar_to_json(TODO_COLUMNS_FILE, TODO_FILE)
+            # 다른 프로세스가 변환 전에 불러온 목록을 저장하지 않도록 버전을 올림
+            _write_version(_read_version() + 1)
+    except (OSError, ValueError) as e:
+        print(f"변환 실패: {e}")
+        return
+    target = TODO_COLUMNS_FILE if args.target == 'columnar' else TODO_FILE
+    print(f"{Colors.BLUE}할 일 {count}개를 {target}(으)로 변환했습니다.{Colors.ENDC}")
+    if (TODO_STORAGE == 'columnar') != (args.target == 'columnar'):
+        setting = 'TODO_STORAGE=columnar로 설정' if args.target == 'columnar' else 'TODO_STORAGE 설정을 해제'
+        print(f"변환한 파일을 사용하려면 {setting}하세요.")
+
+def main(argv=None):
+    # argv를 직접 넘기면(데몬에서 실행하는 경우) 데몬으로 다시 전달하지 않음
+    from_cli = argv is None
+    argv = sys.argv[1:] if from_cli else list(argv)
+
+    # --profile[=형식]과 --list 이름은 어느 위치에 있어도 됨 (TODO_TRACE, TODO_LIST 환경 변수와 같은 값)
+    profile = os.environ.get('TODO_TRACE') if from_cli else None
+    list_name = None
+    command_argv = []
+    args_iter = iter(argv)
+    for arg in args_iter:
+        if arg == '--profile' or arg.startswith('--profile='):
+            profile = arg.partition('=')[2] or 'text'
+        elif arg == '--list':
+            list_name = next(args_iter, '')
+        elif arg.startswith('--list='):
+            list_name = arg.partition('=')[2]
+        else:
+            command_argv.append(arg)
+    if list_name is not None and from_cli:
+        from . import paths
+        try:
+            # 목록마다 파일 경로가 다르므로 할 일 모듈을 불러오기 전에 선택
+            paths.select_list(list_name)
+        except ValueError as e:
+            print(e)
+            sys.exit(2)
+    if profile and profile != '0':
+        from . import profiling
+        try:
+            profiling.enable(profile)
+        except ValueError as e:
+            print(e)
+            sys.exit(2)
+        # 데몬에서 실행하면 단계별 시간을 알 수 없으므로 항상 직접 실행
+        return profiling.run(lambda: _main(command_argv))
+
+    if from_cli:
+        from .paths import SOCKET_FILE
+        # 데몬 소켓이 있을 때만 데몬 모듈을 불러옴
+        if os.path.exists(SOCKET_FILE):
+            from .daemon import forward_to_daemon
+            exit_code = forward_to_daemon(command_argv)
+            if exit_code is not None:
+                sys.exit(exit_code)
+    return _main(command_argv)
+
+def _main(argv):
+    from .display import Colors
+    # JSON 결과나 내보낸 내용, 개수만 출력하는 경우에는 다른 출력이 섞이지 않도록 함
+    raw_output = argv and (argv[0] == "batch" and "--json" in argv or argv[0] == "export"
+                           or argv[0] == "due" and "--count" in argv)
+    if not raw_output:
+        print(f"{Colors.BOLD}{TODO_ASCII_ART}{Colors.ENDC}")
+
+    # 유효한 명령어 목록 (약어 포함)
+    valid_commands = set(ALIAS_MAP) | set(COMMANDS)
+
+    # argv 조작 (argparse 파싱 전에)
     is_implicit_list = False
-    if len(sys.argv) == 1: # todo만 입력했을 때
-        # 할 일 목록이 비어있으면 도움말 출력, 아니면 'list' 명령어 삽입
-        # current_todos = load_todos() # 중복 호출 제거
-        # if not current_todos:
-        #     parser.print_help()
-        #     return # 도움말 출력 후 종료
-        # else:
-        sys.argv.insert(1, "list")
+    if not argv: # todo만 입력했을 때
+        argv.insert(0, "list")
         is_implicit_list = True
-    elif len(sys.argv) > 1:
-        first_arg = sys.argv[1]
+    else:
+        first_arg = argv[0]
         # 첫 번째 인자가 유효한 명령어도 아니고, 옵션도 아니라면 'add' 명령어를 삽입
         if first_arg not in valid_commands and not first_arg.startswith('-'):
-            sys.argv.insert(1, "add")
+            argv.insert(0, "add")
 
     # 약어 매핑 (기존 로직 유지)
-    if len(sys.argv) > 1 and sys.argv[1] in alias_map:
-        sys.argv[1] = alias_map[sys.argv[1]]
+    if argv[0] in ALIAS_MAP:
+        argv[0] = ALIAS_MAP[argv[0]]
 
-    args = parser.parse_args()
+    # 실행할 명령어의 파서만 만듦 (옵션으로 시작하면 전체 도움말용 파서)
+    command = None if argv[0].startswith('-') else argv[0]
+    args = _build_parser(command).parse_args(argv)
 
-    # 'log' 명령어는 기록하지 않음
-    # 암시적으로 'list'가 호출된 경우도 기록하지 않음
-    if args.command != "log" and not (args.command == "list" and is_implicit_list):
+    # 'log', 'daemon' 명령어는 기록하지 않음
+    # 암시적으로 'list'가 호출된 경우와 프롬프트에서 매번 실행하는 'due --count'도 기록하지 않음
+    if args.command not in ("log", "daemon") and not (args.command == "list" and is_implicit_list) \
+            and not (args.command == "due" and args.count):
+        from .utils import log_command
         log_command(args.command, args)
 
     if args.command == "add":
+        from .core import add_todo
+        from .display import list_todos
         add_todo(args.description, args.due_date, args.priority, args.tags)
         list_todos()
     elif args.command == "list":
-        list_todos(status_filter=args.status, sort_by=args.sort_by, tag_filter=args.tag_filter)
+        if args.archived:
+            from .display import list_archived
+            list_archived(limit=args.limit, page=args.page, offset=args.offset)
+        else:
+            from .display import list_todos
+            list_todos(status_filter=args.status, sort_by=args.sort_by, tag_filter=args.tag_filter,
+                       limit=args.limit, page=args.page, offset=args.offset, query=args.query, watch=args.watch)
+    elif args.command == "archive":
+        from .core import archive_completed_todos
+        from .display import list_todos
+        archive_completed_todos(args.days)
+        list_todos()
     elif args.command == "search":
+        from .display import list_todos
         list_todos(search_term=args.keyword)
+    elif args.command == "batch":
+        run_batch_command(args)
+    elif args.command == "import":
+        run_import_command(args)
+    elif args.command == "export":
+        run_export_command(args)
+    elif args.command == "convert":
+        run_convert_command(args)
+    elif args.command == "daemon":
+        from .daemon import run_daemon_command
+        run_daemon_command(args)
+    elif args.command == "stats":
+        from .display import show_stats
+        show_stats()
+    elif args.command == "due":
+        from .display import list_due
+        list_due(args.within, args.before, args.after, args.overdue, args.count)
+    elif args.command == "lists":
+        from .display import show_lists
+        show_lists(args.overdue)
+    elif args.command == "tags":
+        from .display import list_tags
+        list_tags()
     elif args.command == "complete":
+        from .core import complete_todo
+        from .display import list_todos
         complete_todo(args.index - 1)
         list_todos()
     elif args.command == "delete":
+        from .core import delete_todo
+        from .display import list_todos
         confirm = input(f"{Colors.YELLOW}정말로 {len(args.indexes)}개의 할 일을 삭제하시겠습니까? (y/N): {Colors.ENDC}").lower()
         if confirm == 'y':
             delete_todo([i-1 for i in args.indexes])
@@ -171,9 +462,19 @@ def main():
         if not any([args.new_description, args.new_due_date, args.new_priority, args.new_tags]):
             print("수정할 내용을 하나 이상 입력해야 합니다. --desc, --due, --priority, --tags 옵션을 확인하세요.")
         else:
+            from .core import edit_todo
+            from .display import list_todos
             edit_todo(args.index - 1, args.new_description, args.new_due_date, args.new_priority, args.new_tags)
             list_todos()
+    elif args.command == "clear" and args.archive:
+        # 보관은 되돌릴 수 있고 내용도 남으므로 확인하지 않음
+        from .core import clear_completed_todos
+        from .display import list_todos
+        clear_completed_todos(archive=True)
+        list_todos()
     elif args.command == "clear":
+        from .core import clear_completed_todos
+        from .display import list_todos
         confirm = input(f"{Colors.YELLOW}완료된 모든 할 일을 정말로 삭제하시겠습니까? (y/N): {Colors.ENDC}").lower()
         if confirm == 'y':
             clear_completed_todos()
@@ -181,16 +482,17 @@ def main():
         else:
             print(f"{Colors.BLUE}완료된 할 일 삭제를 취소했습니다.{Colors.ENDC}")
     elif args.command == "undo":
+        from .undo import pop_undo
         pop_undo()
     elif args.command == "redo":
+        from .undo import pop_redo
         pop_redo()
     elif args.command == "log":
+        from .utils import get_command_history, clear_command_history
         if args.clear:
             clear_command_history()
             return
-        history = get_command_history()
-        if args.last:
-            history = history[-args.last:]
+        history = get_command_history(args.last)
         if not history:
             print("명령어 기록이 없습니다.")
             return
@@ -203,9 +505,10 @@ def main():
             # 'command' 키는 이미 cmd 변수에 있으므로 제외하고 출력
             display_args = {k: v for k, v in arg_dict.items() if k != 'command' and v is not None}
             arg_str = ' '.join([f"--{k} {v}" if v else f"--{k}" for k, v in display_args.items()])
-            print(f"[{timestamp}] todo {cmd} {arg_str}")
+            list_option = f"--list {entry['list']} " if 'list' in entry else ""
+            print(f"[{timestamp}] todo {list_option}{cmd} {arg_str}")
         print(f"{Colors.GRAY}────────────────────────────────────{Colors.ENDC}")
         print()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
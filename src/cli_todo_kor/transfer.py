@@ -0,0 +1,299 @@
+import csv
+import io
+import json
+import os
+import re
+import sys
+from contextlib import contextmanager, redirect_stdout
+from datetime import date, datetime, timezone
+
+from .utils import load_todos, save_todos, write_lock, _parse_due_date, _parse_priority, _next_id
+from .model import Todo, _due_ordinal
+from . import profiling
+
+# 가져온 할 일을 이 개수씩 나누어 저장 (TODO_IMPORT_BATCH 환경 변수로 조정 가능)
+IMPORT_BATCH_SIZE = int(os.environ.get('TODO_IMPORT_BATCH', 10000))
+FORMATS = ['jsonl', 'csv', 'ics']
+EXTENSIONS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl', '.csv': 'csv', '.ics': 'ics', '.ical': 'ics'}
+CSV_FIELDS = ['description', 'completed', 'priority', 'due_date', 'tags']
+# iCalendar PRIORITY 값: 1~4 높음, 5 중간, 6~9 낮음 (0은 지정 안 함)
+ICS_PRIORITY = {'높음': 1, '중간': 5, '낮음': 9}
+TRUE_VALUES = {'true', '1', 'yes', 'y', 'x', '완료', 'completed'}
+# 오류 위치는 이 개수까지만 보관
+MAX_REPORTED_ERRORS = 10
+
+
+def detect_format(path, fmt=None):
+    """형식을 지정하지 않았으면 파일 확장자로 정한다. 표준 입출력('-')은 jsonl."""
+    if fmt:
+        return fmt
+    if path == '-':
+        return 'jsonl'
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in EXTENSIONS:
+        raise ValueError(f"파일 형식을 알 수 없습니다: {path} (--format으로 {', '.join(FORMATS)} 중 하나를 지정하세요)")
+    return EXTENSIONS[ext]
+
+@contextmanager
+def _open(path, mode):
+    # '-'는 표준 입출력 (닫지 않음). csv 모듈과 iCalendar의 CRLF를 위해 줄바꿈 변환은 하지 않음
+    if path == '-':
+        yield sys.stdin if mode == 'r' else sys.stdout
+        return
+    with open(path, mode, encoding='utf-8', newline='') as f:
+        yield f
+
+
+# --- 읽기: 레코드를 하나씩 (위치, 원본 dict) 형태로 넘겨주는 제너레이터. 해석할 수 없으면 dict 대신 None
+
+def _read_jsonl(f):
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        yield line_no, record if isinstance(record, dict) else None
+
+def _read_csv(f):
+    reader = csv.DictReader(f)
+    for record in reader:
+        record['tags'] = (record.get('tags') or '').split()
+        yield reader.line_num, record
+
+def _unfold(f):
+    # 공백/탭으로 시작하는 줄은 앞 줄에 이어 붙임 (RFC 5545 줄 접기)
+    pending, start = None, 0
+    for line_no, line in enumerate(f, 1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield start, pending
+        pending, start = line, line_no
+    if pending is not None:
+        yield start, pending
+
+def _ics_unescape(value):
+    return re.sub(r'\\([\\;,nN])', lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+
+def _ics_date(value):
+    # DUE:20261020 또는 DUE:20261020T090000Z -> 2026-10-20 (형식이 다르면 그대로 두어 검증에서 걸러짐)
+    digits = value[:8]
+    return f"{digits[:4]}-{digits[4:6]}-{digits[6:]}" if digits.isdigit() else value
+
+def _ics_priority(value):
+    try:
+        number = int(value)
+    except ValueError:
+        return None
+    if 1 <= number <= 4:
+        return '높음'
+    if number >= 6:
+        return '낮음'
+    return '중간'
+
+def _read_ics(f):
+    record, start = None, 0
+    for line_no, line in _unfold(f):
+        upper = line.upper()
+        if upper == 'BEGIN:VTODO':
+            record, start = {}, line_no
+        elif upper == 'END:VTODO':
+            if record is not None:
+                yield start, record
+            record = None
+        elif record is not None:
+            key, _, value = line.partition(':')
+            name = key.split(';', 1)[0].upper()
+            if name == 'SUMMARY':
+                record['description'] = _ics_unescape(value)
+            elif name == 'STATUS':
+                record['completed'] = value.upper() == 'COMPLETED'
+            elif name == 'PRIORITY':
+                record['priority'] = _ics_priority(value)
+            elif name == 'DUE':
+                record['due_date'] = _ics_date(value)
+            elif name == 'CATEGORIES':
+                record['tags'] = [_ics_unescape(tag) for tag in re.split(r'(?<!\\),', value) if tag]
+
+READERS = {'jsonl': _read_jsonl, 'csv': _read_csv, 'ics': _read_ics}
+
+
+# --- 검증
+
+def _as_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in TRUE_VALUES
+
+def _valid_due(value):
+    # 대부분은 이미 YYYY-MM-DD이므로 캐시된 변환으로 먼저 확인하고, 나머지(X일 뒤 등)만 _parse_due_date로 해석
+    if _due_ordinal(value) is not None:
+        return value
+    # 레코드마다 경고가 출력되지 않도록 함 (잘못된 레코드는 모아서 알려줌)
+    with redirect_stdout(io.StringIO()):
+        return _parse_due_date(value)
+
+def _normalize(record):
+    """가져온 레코드를 할 일 항목으로 바꾼다. 내용이 없거나 마감 기한이 잘못되었으면 None."""
+    description = str(record.get('description') or '').strip()
+    if not description:
+        return None
+    tags = record.get('tags') or []
+    if not isinstance(tags, list):
+        return None
+    todo = {
+        "description": description,
+        "completed": _as_bool(record.get('completed')),
+        "priority": _parse_priority(str(record.get('priority') or 'm')),
+        "tags": [str(tag) for tag in tags],
+    }
+    due_date = record.get('due_date')
+    if due_date:
+        due_date = _valid_due(str(due_date))
+        if due_date is None:
+            return None
+        todo["due_date"] = due_date
+    return todo
+
+def _dedupe_key(todo):
+    # 날짜는 서수로 비교 (2026-1-5와 2026-01-05는 같은 날)
+    due_date = todo.get('due_date')
+    return todo['description'], _due_ordinal(due_date) if due_date else None
+
+
+@profiling.timed('transfer.import')
+def import_todos(path, fmt=None, batch_size=IMPORT_BATCH_SIZE):
+    """파일의 할 일을 batch_size개씩 나누어 저장하고 결과 요약을 반환한다.
+
+    입력 파일은 레코드 단위로 읽지만 목록은 메모리에 두고 묶음마다 save_todos로 저장하므로,
+    json 저장 방식에서는 묶음마다 파일 전체를 다시 써 기록량이 N²/batch_size에 비례한다.
+    (log/sqlite 저장 방식은 묶음의 변경분만 기록)
+    내용과 마감 기한이 같은 항목은 (기존 항목과 파일 안의 항목 모두) 건너뛴다. 가져오는 동안
+    저장 잠금을 유지하며, 가져온 전체가 실행 취소 한 번으로 되돌려진다. 실행 취소 기록에는
+    항목 대신 추가한 id 범위만 남긴다.
+    """
+    from .undo import push_undo
+    reader = READERS[detect_format(path, fmt)]
+    summary = {'added': 0, 'duplicates': 0, 'invalid': 0, 'errors': []}
+    with write_lock(), _open(path, 'r') as f:
+        todos = load_todos()
+        seen = {_dedupe_key(todo) for todo in todos}
+        first_id = next_id = _next_id(todos)
+        saved_id = first_id  # 저장을 마친 마지막 id + 1
+        ops = []
+        try:
+            for position, record in reader(f):
+                todo = _normalize(record) if record is not None else None
+                if todo is None:
+                    summary['invalid'] += 1
+                    if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                        summary['errors'].append(position)
+                    continue
+                key = _dedupe_key(todo)
+                if key in seen:
+                    summary['duplicates'] += 1
+                    continue
+                seen.add(key)
+                item = Todo.from_dict({"id": next_id, **todo})
+                next_id += 1
+                todos.append(item)
+                ops.append({"op": "insert", "index": len(todos) - 1, "item": item})
+                if len(ops) >= batch_size:
+                    save_todos(todos, ops)
+                    saved_id = next_id
+                    ops = []
+            if ops:
+                save_todos(todos, ops)
+                saved_id = next_id
+        finally:
+            # 중간에 실패해도 이미 저장된 묶음은 실행 취소 한 번으로 되돌릴 수 있도록 기록
+            if saved_id > first_id:
+                push_undo([{"op": "insert_ids", "first": first_id, "last": saved_id - 1}])
+    summary['added'] = saved_id - first_id
+    profiling.count('todos_imported', summary['added'])
+    return summary
+
+
+# --- 쓰기: 출력할 문자열을 조금씩 넘겨주는 제너레이터
+
+def _write_jsonl(todos):
+    for todo in todos:
+        record = {field: todo[field] for field in CSV_FIELDS if field in todo}
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+def _write_csv(todos):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    for todo in todos:
+        writer.writerow([
+            todo['description'],
+            'true' if todo.get('completed') else 'false',
+            todo.get('priority', '중간'),
+            todo.get('due_date', ''),
+            ' '.join(todo.get('tags') or []),
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # 할 일이 없을 때의 머리글
+        yield buffer.getvalue()
+
+def _ics_escape(value):
+    return value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def _fold(line):
+    # 한 줄을 75바이트 이하로 접음 (UTF-8 문자 중간에서 자르지 않음)
+    if len(line.encode('utf-8')) <= 75:
+        return line + '\r\n'
+    parts, current, size, limit = [], [], 0, 75
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append(''.join(current))
+            current, size, limit = [], 0, 74  # 이어지는 줄은 앞의 공백 1바이트 제외
+        current.append(char)
+        size += char_size
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+def _write_ics(todos):
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    yield 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//cli-todo-kor//KO\r\n'
+    for todo in todos:
+        lines = [
+            'BEGIN:VTODO',
+            f"UID:{todo['id']}@cli-todo-kor",
+            f"DTSTAMP:{stamp}",
+            f"SUMMARY:{_ics_escape(todo['description'])}",
+            f"STATUS:{'COMPLETED' if todo.get('completed') else 'NEEDS-ACTION'}",
+            f"PRIORITY:{ICS_PRIORITY.get(todo.get('priority'), 5)}",
+        ]
+        ordinal = _due_ordinal(todo['due_date']) if 'due_date' in todo else None
+        if ordinal is not None:
+            lines.append(f"DUE;VALUE=DATE:{date.fromordinal(ordinal).strftime('%Y%m%d')}")
+        if todo.get('tags'):
+            lines.append("CATEGORIES:" + ','.join(_ics_escape(tag) for tag in todo['tags']))
+        lines.append('END:VTODO')
+        yield ''.join(_fold(line) for line in lines)
+    yield 'END:VCALENDAR\r\n'
+
+WRITERS = {'jsonl': _write_jsonl, 'csv': _write_csv, 'ics': _write_ics}
+
+
+@profiling.timed('transfer.export')
+def export_todos(path, fmt=None):
+    """할 일 목록을 저장된 순서대로 파일에 쓰고 내보낸 개수를 반환한다."""
+    writer = WRITERS[detect_format(path, fmt)]
+    todos = load_todos()
+    with _open(path, 'w') as f:
+        for chunk in writer(todos):
+            f.write(chunk)
+    if path != '-':
+        profiling.add_file_bytes('written', path)
+    return len(todos)
@@ -1,90 +1,180 @@
 import os
 import json
 
-from .utils import TODO_DIR
-UNDO_FILE = os.path.join(TODO_DIR, '.todos_undo.json')
-REDO_FILE = os.path.join(TODO_DIR, '.todos_redo.json')
-
-def push_undo():
-    from .utils import load_todos
-    todos = load_todos()
-    undo_stack = []
-    if os.path.exists(UNDO_FILE):
-        with open(UNDO_FILE, 'r', encoding='utf-8') as f:
+from .utils import TODO_DIR, write_lock
+from .locking import atomic_open
+from .model import json_default
+from . import profiling
+# 작업마다 변경분(delta)만 한 줄씩 추가하는 append-only 저널
+UNDO_FILE = os.path.join(TODO_DIR, '.todos_undo.jsonl')
+REDO_FILE = os.path.join(TODO_DIR, '.todos_redo.jsonl')
+
+# 실행 취소 가능한 최대 작업 수 (TODO_UNDO_DEPTH 환경 변수로 조정 가능)
+UNDO_DEPTH = int(os.environ.get('TODO_UNDO_DEPTH', 100))
+# 저널 파일이 이 크기를 넘으면 실행 취소할 수 없게 된 오래된 작업을 바로 지움
+UNDO_COMPACT_BYTES = int(os.environ.get('TODO_UNDO_COMPACT_BYTES', 64 * 1024))
+
+# 저널마다 옆에 [줄 수, 실행 취소할 수 있는 최근 항목 수]를 기록해 두어 저널을 읽지 않고 깊이를 지킨다.
+# 깊이를 넘은 오래된 항목은 바로 꺼낼 수 없게 되고, 파일에서는 그런 항목이 깊이만큼 쌓였을 때 한 번에 지운다.
+def _counts_path(path):
+    return path + '.count'
+
+def _read_counts(path):
+    if not os.path.exists(path):
+        return 0, 0
+    try:
+        with open(_counts_path(path), 'r', encoding='utf-8') as f:
+            entries, live = json.load(f)
+        return int(entries), int(live)
+    except (OSError, ValueError, TypeError):
+        pass
+    # 기록이 없거나 손상되었으면 저널을 한 번 세어 다시 만듦
+    with open(path, 'rb') as f:
+        entries = sum(1 for line in f if line.strip())
+    return entries, min(entries, UNDO_DEPTH)
+
+def _write_counts(path, entries, live):
+    with atomic_open(_counts_path(path), fsync=False) as f:
+        json.dump([entries, live], f)
+
+def _remove_journal(path):
+    for target in (path, _counts_path(path)):
+        if os.path.exists(target):
+            os.remove(target)
+
+def _append_entry(path, entry):
+    entries, live = _read_counts(path)
+    line = json.dumps(entry, ensure_ascii=False, default=json_default) + '\n'
+    with open(path, 'a', encoding='utf-8') as f:
+        start = f.tell()
+        f.write(line)
+        size = f.tell()
+    profiling.add_bytes('written', size - start)
+    entries += 1
+    live = min(live + 1, UNDO_DEPTH)
+    if entries - live >= max(UNDO_DEPTH, 1) or (size > UNDO_COMPACT_BYTES and entries > live):
+        _compact_journal(path, live)
+        entries = live
+    _write_counts(path, entries, live)
+
+def _compact_journal(path, depth=None):
+    depth = UNDO_DEPTH if depth is None else depth
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line for line in f if line.strip()]
+    kept = lines[-depth:] if depth > 0 else []
+    with atomic_open(path) as f:
+        f.writelines(kept)
+
+def _pop_entry(path):
+    entries, live = _read_counts(path)
+    if live <= 0:
+        return None  # 남은 줄이 있어도 실행 취소 깊이를 넘은 항목
+    entry = _pop_line(path)
+    if entry is None:
+        _write_counts(path, 0, 0)
+    else:
+        _write_counts(path, max(entries - 1, 0), live - 1)
+    return entry
+
+def _pop_line(path):
+    # 파일 끝에서부터 거꾸로 읽어 마지막 줄만 꺼내고 그 위치에서 잘라냄
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            pos = end - 1  # 마지막 개행 문자는 건너뜀
+            start = 0
+            while pos > 0:
+                chunk_start = max(0, pos - 4096)
+                f.seek(chunk_start)
+                chunk = f.read(pos - chunk_start)
+                newline = chunk.rfind(b'\n')
+                if newline != -1:
+                    start = chunk_start + newline + 1
+                    break
+                pos = chunk_start
+            f.seek(start)
+            raw = f.read(end - start)
+            profiling.add_bytes('read', len(raw))
+            f.truncate(start)
+            end = start
+            if not raw.strip():
+                continue
             try:
-                undo_stack = json.load(f)
-            except json.JSONDecodeError:
-                undo_stack = []
-    undo_stack.append(todos)
-    with open(UNDO_FILE, 'w', encoding='utf-8') as f:
-        json.dump(undo_stack, f, indent=4, ensure_ascii=False)
+                return json.loads(raw.decode('utf-8'))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue  # 손상된 줄은 버리고 이전 항목을 사용
+    return None
+
+def write_journal(actions):
+    """(저널 경로, 항목) 목록을 순서대로 기록한다. 항목이 None이면 그 저널을 지운다."""
+    for path, entry in actions:
+        if entry is None:
+            _remove_journal(path)
+        else:
+            _append_entry(path, entry)
+
+def _write_journal(actions):
+    # 데몬의 저장소는 변경을 나중에 기록하므로 저널도 그때 함께 기록하도록 넘김
+    from .storage import get_storage
+    defer = getattr(get_storage(), 'defer_journal', None)
+    if defer is not None:
+        defer(actions)
+    else:
+        write_journal(actions)
+
+def _sync_storage():
+    # 데몬이 메모리에만 가진 변경과 저널을 파일에 기록 (저널에서 꺼내기 전후에 호출)
+    from .storage import get_storage
+    flush = getattr(get_storage(), 'flush', None)
+    if flush is not None:
+        flush()
 
+@profiling.timed('undo.push')
+def push_undo(ops):
+    if not ops:
+        return
+    with write_lock():
+        # 새 작업이 기록되면 기존 redo 내역은 더 이상 적용할 수 없음
+        _write_journal([(UNDO_FILE, {'ops': ops}), (REDO_FILE, None)])
+
+@profiling.timed('undo.pop')
 def pop_undo():
-    from .utils import load_todos, save_todos
+    from .utils import load_todos, save_todos, apply_delta, invert_delta, expand_delta
     from .display import list_todos
-    
-    if not os.path.exists(UNDO_FILE):
-        print('실행 취소할 작업이 없습니다.')
-        return
-    with open(UNDO_FILE, 'r', encoding='utf-8') as f:
-        try:
-            undo_stack = json.load(f)
-        except json.JSONDecodeError:
-            undo_stack = []
-    if not undo_stack:
-        print('실행 취소할 작업이 없습니다.')
-        return
-    current = load_todos()
-    last = undo_stack.pop()
-    # redo에 현재 상태 push
-    redo_stack = []
-    if os.path.exists(REDO_FILE):
-        with open(REDO_FILE, 'r', encoding='utf-8') as f:
-            try:
-                redo_stack = json.load(f)
-            except json.JSONDecodeError:
-                redo_stack = []
-    redo_stack.append(current)
-    with open(REDO_FILE, 'w', encoding='utf-8') as f:
-        json.dump(redo_stack, f, indent=4, ensure_ascii=False)
-    # undo pop한 상태로 복원
-    save_todos(last)
-    with open(UNDO_FILE, 'w', encoding='utf-8') as f:
-        json.dump(undo_stack, f, indent=4, ensure_ascii=False)
+
+    _sync_storage()
+    # 저널에서 꺼내는 것부터 저장까지 다른 프로세스가 끼어들지 않도록 잠금
+    with write_lock():
+        entry = _pop_entry(UNDO_FILE)
+        if not entry:
+            print('실행 취소할 작업이 없습니다.')
+            return
+        todos = load_todos()
+        # 역방향 delta를 적용해 이전 상태로 복원
+        inverse_ops = expand_delta(todos, invert_delta(entry['ops']))
+        apply_delta(todos, inverse_ops)
+        save_todos(todos, inverse_ops)
+        # 다시 실행할 때는 실제로 되돌린 항목이 필요하므로 펼친 ops로 기록
+        _write_journal([(REDO_FILE, {'ops': invert_delta(inverse_ops)})])
+    _sync_storage()
     print('마지막 작업을 실행 취소했습니다.')
     list_todos()
 
+@profiling.timed('undo.redo')
 def pop_redo():
-    from .utils import load_todos, save_todos
+    from .utils import load_todos, save_todos, apply_delta
     from .display import list_todos
-    
-    if not os.path.exists(REDO_FILE):
-        print('다시 실행할 작업이 없습니다.')
-        return
-    with open(REDO_FILE, 'r', encoding='utf-8') as f:
-        try:
-            redo_stack = json.load(f)
-        except json.JSONDecodeError:
-            redo_stack = []
-    if not redo_stack:
-        print('다시 실행할 작업이 없습니다.')
-        return
-    current = load_todos()
-    last = redo_stack.pop()
-    # undo에 현재 상태 push
-    undo_stack = []
-    if os.path.exists(UNDO_FILE):
-        with open(UNDO_FILE, 'r', encoding='utf-8') as f:
-            try:
-                undo_stack = json.load(f)
-            except json.JSONDecodeError:
-                undo_stack = []
-    undo_stack.append(current)
-    with open(UNDO_FILE, 'w', encoding='utf-8') as f:
-        json.dump(undo_stack, f, indent=4, ensure_ascii=False)
-    # redo pop한 상태로 복원
-    save_todos(last)
-    with open(REDO_FILE, 'w', encoding='utf-8') as f:
-        json.dump(redo_stack, f, indent=4, ensure_ascii=False)
+
+    _sync_storage()
+    with write_lock():
+        entry = _pop_entry(REDO_FILE)
+        if not entry:
+            print('다시 실행할 작업이 없습니다.')
+            return
+        todos = load_todos()
+        apply_delta(todos, entry['ops'])
+        save_todos(todos, entry['ops'])
+        _write_journal([(UNDO_FILE, entry)])
+    _sync_storage()
     print('마지막 실행 취소를 다시 실행했습니다.')
-    list_todos() 
\ No newline at end of file
+    list_todos()
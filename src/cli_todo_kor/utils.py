@@ -1,74 +1,376 @@
+import heapq
+from array import array
 import json
 import os
 from datetime import datetime, timedelta
-from platformdirs import user_data_dir
-import re
 
-APP_NAME = "cli-todo-kor"
-DATA_DIR = user_data_dir(appname=APP_NAME)
-HISTORY_FILE = os.path.join(DATA_DIR, 'command_history.json')
+from .paths import BASE_DIR, TODO_DIR, LIST_NAME, DEFAULT_LIST
+from .model import Todo, TodoView
+from . import profiling
+# 명령어 기록은 모든 목록이 함께 사용
+DATA_DIR = BASE_DIR
+# 명령어 기록 (한 줄에 한 명령씩 추가하는 JSON Lines)
+HISTORY_FILE = os.path.join(DATA_DIR, 'command_history.jsonl')
+HISTORY_LOCK_FILE = HISTORY_FILE + '.lock'
+# 이전 버전의 기록 파일 (처음 사용할 때 HISTORY_FILE로 옮김)
+LEGACY_HISTORY_FILE = os.path.join(DATA_DIR, 'command_history.json')
+# 보관할 기록 수 (0이면 제한 없음). 기록 파일이 이 크기를 넘으면 번호를 붙여 교체
+HISTORY_LIMIT = int(os.environ.get('TODO_HISTORY_LIMIT', 100))
+HISTORY_SEGMENT_BYTES = int(os.environ.get('TODO_HISTORY_SEGMENT_BYTES', 64 * 1024))
 
-TODO_DIR = user_data_dir(appname=APP_NAME)
 TODO_FILE = os.path.join(TODO_DIR, 'todos.json')
 
+# 저장 방식: 'json'(기본값, 매번 전체 파일 저장), 'log'(변경분만 로그에 추가), 'sqlite', 'columnar'
+TODO_STORAGE = os.environ.get('TODO_STORAGE', 'json')
+# log 모드에서 변경 기록이 추가되는 파일 (todos.json 옆에 위치)
+TODO_LOG_FILE = TODO_FILE + '.log'
+# 로그가 이 크기를 넘으면 todos.json 체크포인트로 압축
+TODO_LOG_COMPACT_BYTES = int(os.environ.get('TODO_LOG_COMPACT_BYTES', 256 * 1024))
+# sqlite 모드에서 사용하는 데이터베이스 파일
+TODO_DB_FILE = os.path.join(TODO_DIR, 'todos.sqlite3')
+# columnar 모드에서 사용하는 열 단위 이진 파일 (columnar.py 참고)
+TODO_COLUMNS_FILE = os.path.join(TODO_DIR, 'todos.col')
+# 마지막으로 출력한 목록의 화면 번호 -> 할 일 id 매핑
+VIEW_FILE = os.path.join(TODO_DIR, '.todos_view.json')
+# 할 일 저장과 실행 취소 기록을 프로세스 사이에서 직렬화하는 잠금 파일
+TODO_LOCK_FILE = os.path.join(TODO_DIR, '.todos.lock')
+# json/log 저장소의 버전 카운터 (sqlite는 데이터베이스의 user_version 사용)
+TODO_VERSION_FILE = os.path.join(TODO_DIR, '.todos_version')
+# 다른 프로세스와 저장이 겹쳤을 때 다시 시도하는 횟수 (이후에는 잠근 채로 실행)
+TODO_WRITE_RETRIES = int(os.environ.get('TODO_WRITE_RETRIES', 5))
+
+
+class WriteConflict(Exception):
+    """할 일을 불러온 뒤 다른 프로세스가 먼저 저장한 경우."""
+
+# 마지막으로 불러온 목록의 버전 (저장할 때 그대로인지 확인)
+_loaded_version = None
+
+@profiling.timed('utils.load_todos')
 def load_todos():
-    # 디렉토리가 없으면 생성
-    if not os.path.exists(TODO_DIR):
-        os.makedirs(TODO_DIR)
-    if not os.path.exists(TODO_FILE):
-        return []
+    global _loaded_version
+    from .storage import get_storage
+    storage = get_storage()
+    # 버전을 먼저 읽어야 그 사이의 저장이 충돌로 감지됨
+    _loaded_version = storage.version()
+    todos = storage.load()
+    profiling.count('todos_loaded', len(todos))
+    return todos
+
+def write_lock():
+    """할 일 파일과 실행 취소 저널을 함께 변경하는 동안 유지하는 프로세스 간 잠금."""
+    from .locking import file_lock
+    return file_lock(TODO_LOCK_FILE)
+
+@profiling.timed('utils.save_todos')
+def save_todos(todos, ops=None):
+    """목록을 저장한다. 불러온 뒤 다른 프로세스가 저장했다면 WriteConflict를 발생시킨다."""
+    global _loaded_version
+    # ops(변경 내역)를 넘기면 저장소가 변경분만 기록할 수 있음
+    from .storage import get_storage
+    storage = get_storage()
+    with write_lock():
+        if _loaded_version is not None and storage.version() != _loaded_version:
+            raise WriteConflict()
+        if ops is None:
+            storage.save(todos)
+            _loaded_version = storage.version()
+            return
+        old_signature = storage.signature()
+        storage.save(todos, ops)
+        _loaded_version = storage.version()
+        new_signature = storage.signature()
+        profiling.count('ops_saved', len(ops))
+        from .index import update_indexes
+        from .stats import update_stats
+        with profiling.phase('index.update'):
+            update_indexes(ops, old_signature, new_signature)
+        with profiling.phase('stats.update'):
+            update_stats(ops, old_signature, new_signature)
+
+@profiling.timed('utils.query')
+def query_todos(status_filter=None, search_term=None, sort_by='priority', tag_filter=None, predicate=None, limit=None):
+    """필터와 정렬을 적용한 목록(model.TodoView)을 반환한다. positions에 원래 위치가 들어 있다.
+
+    tag_filter는 태그 목록 또는 조건식 토큰 (예: ['업무', 'or', '개인']) 이다.
+    predicate는 query.compile_query로 만든 조건 함수, limit은 앞에서부터 가져올 개수이다.
+    """
+    from .storage import get_storage
+    if tag_filter and not isinstance(tag_filter, tuple):
+        from .index import parse_tag_query
+        tag_filter = parse_tag_query(tag_filter)
+    return get_storage().query(status=status_filter, tags=tag_filter, search=search_term, sort_by=sort_by,
+                               predicate=predicate, limit=limit)
+
+@profiling.timed('utils.query')
+def query_todos_with_summary(today, status_filter=None, search_term=None, sort_by='priority', tag_filter=None,
+                             predicate=None, limit=None):
+    """(query_todos 결과, 조건에 맞는 전체 개수, todo_summary 결과)를 저장소를 한 번만 읽어 함께 반환한다."""
+    from .storage import get_storage
+    if tag_filter and not isinstance(tag_filter, tuple):
+        from .index import parse_tag_query
+        tag_filter = parse_tag_query(tag_filter)
+    return get_storage().listing(today, status=status_filter, tags=tag_filter, search=search_term, sort_by=sort_by,
+                                 predicate=predicate, limit=limit)
+
+def tag_counts():
+    """(태그, 개수) 목록을 많은 순서대로 반환한다."""
+    from .storage import get_storage
+    from .index import tag_counts as index_tag_counts
+    return index_tag_counts(get_storage())
+
+def query_due(low=None, high=None, count_only=False):
+    """마감 기한 서수가 low 이상 high 미만인 미완료 할 일의 (서수, id) 목록. 마감 기한 색인만 읽는다."""
+    from .storage import get_storage
+    from .index import due_range
+    return due_range(get_storage(), low, high, count_only)
+
+def find_todos(ids):
+    """ids에 해당하는 할 일을 {id: (위치, 항목)}으로 반환한다. 전체 목록을 만들지 않아도 되는 저장소는 해당 행만 읽는다."""
+    from .storage import get_storage
+    return get_storage().find(ids)
+
+def todo_summary(today):
+    """(전체, 미완료, 오늘 마감) 개수를 반환한다."""
+    from .storage import get_storage
+    return get_storage().summary(today)
+
+def todo_stats():
+    """저장할 때마다 갱신되는 개수 통계(stats.Stats)를 반환한다."""
+    from .storage import get_storage
+    from .stats import current_stats
+    return current_stats(get_storage())
+
+@profiling.timed('utils.save_view')
+def save_view(sorted_todos, source='todo list'):
+    # 화면 번호 순서대로 [id, 출력 당시 위치]와 그 목록을 출력한 명령을 저장
+    from .locking import atomic_open
+    view = {'source': source, 'entries': sorted_todos.entries()}
+    with atomic_open(VIEW_FILE, fsync=False) as f:
+        json.dump(view, f, ensure_ascii=False)
+    profiling.add_file_bytes('written', VIEW_FILE)
+
+# 마지막으로 읽은 화면 번호 매핑을 만든 명령과 항목 수 (번호를 찾지 못했을 때 안내에 사용)
+_view_info = None
+
+def load_view():
+    global _view_info
+    if not os.path.exists(VIEW_FILE):
+        return None
     try:
-        with open(TODO_FILE, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if not content:
-                return []
-            return json.loads(content)
+        with open(VIEW_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
     except json.JSONDecodeError:
-        return []
+        return None
+    # 이전 형식은 [id, 위치] 목록만 저장
+    entries = data.get('entries') if isinstance(data, dict) else data
+    if isinstance(data, dict) and entries is not None:
+        _view_info = (data.get('source'), len(entries))
+    return entries
 
-def save_todos(todos):
-    with open(TODO_FILE, 'w', encoding='utf-8') as f:
-        json.dump(todos, f, indent=4, ensure_ascii=False)
+def view_hint():
+    """유효하지 않은 번호 안내에 덧붙일 설명. 번호는 마지막으로 출력한 목록 기준이다."""
+    if not _view_info or not _view_info[0]:
+        return ""
+    source, count = _view_info
+    return f" (번호는 마지막으로 출력한 '{source}' 목록 기준이며 {count}개가 표시되었습니다.)"
 
-def _get_sorted_todos(todos_list, sort_by='priority'):
-    temp_todos = [dict(item) for item in todos_list]
-    for i, todo in enumerate(temp_todos):
-        todo['original_index'] = i
+def current_view(todos):
+    """마지막으로 출력한 목록의 매핑. 없으면 기본(우선순위) 정렬 순서로 만든다."""
+    view = load_view()
+    if view is None:
+        view = _get_sorted_todos(todos).entries()
+    return view
+
+def _resolve_display_indexes(todos, display_indexes, view=None):
+    """화면 번호(0부터)를 todos 리스트의 위치로 바꾼다. 찾을 수 없는 번호는 None.
+
+    마지막으로 출력한 목록의 매핑을 사용하므로 정렬을 다시 하지 않는다.
+    매핑이 없으면 기본(우선순위) 정렬 순서를 사용한다.
+    """
+    if view is None:
+        view = current_view(todos)
+    id_positions = None
+    positions = []
+    for display_index in display_indexes:
+        if not 0 <= display_index < len(view):
+            positions.append(None)
+            continue
+        todo_id, hint = view[display_index]
+        # 출력 이후 위치가 바뀌지 않았다면 O(1)로 확인
+        if 0 <= hint < len(todos) and todos[hint].get('id') == todo_id:
+            positions.append(hint)
+            continue
+        if id_positions is None:
+            id_positions = {todo.get('id'): i for i, todo in enumerate(todos)}
+        positions.append(id_positions.get(todo_id))
+    return positions
+
+def _next_id(todos):
+    from .archive import max_archived_id
+    # 보관소로 옮긴 항목의 id도 다시 쓰지 않음
+    return max(max((todo.get('id', 0) for todo in todos), default=0), max_archived_id()) + 1
+
+def _ensure_ids(todos):
+    # id가 없는 기존 항목에는 저장된 순서대로 새 id를 부여
+    next_id = None
+    for todo in todos:
+        if 'id' not in todo:
+            if next_id is None:
+                next_id = _next_id(todos)
+            todo['id'] = next_id
+            next_id += 1
+    return todos
+
+def _find_position(todos, index, todo_id):
+    # 기록된 위치가 맞으면 바로 사용하고, 아니면 id로 찾음
+    if 0 <= index < len(todos) and todos[index].get('id') == todo_id:
+        return index
+    for i, todo in enumerate(todos):
+        if todo.get('id') == todo_id:
+            return i
+    return None
+
+def apply_delta(todos, ops, known_ids=None):
+    """변경 내역(ops)을 순서대로 todos 리스트에 적용한다.
+
+    ops 항목 형식:
+      {"op": "insert", "index": i, "item": {...}}
+      {"op": "remove", "index": i, "item": {...}}
+      {"op": "update", "index": i, "before": {...}, "after": {...}}
+
+    known_ids를 넘기면 이미 존재하는 id의 insert는 건너뛰어,
+    체크포인트에 반영된 로그를 다시 적용해도 결과가 같다.
+    """
+    for op in ops:
+        kind = op['op']
+        if kind == 'insert':
+            if known_ids is not None:
+                if op['item'].get('id') in known_ids:
+                    continue
+                known_ids.add(op['item'].get('id'))
+            todos.insert(min(op['index'], len(todos)), Todo.from_dict(op['item']))
+            continue
+        item = op['item'] if kind == 'remove' else op['before']
+        position = _find_position(todos, op['index'], item.get('id'))
+        if position is None:
+            continue
+        if kind == 'remove':
+            todos.pop(position)
+            if known_ids is not None:
+                known_ids.discard(item.get('id'))
+        else:
+            todos[position] = Todo.from_dict(op['after'])
+    return todos
+
+def invert_delta(ops):
+    """apply_delta로 적용한 변경을 되돌리는 역방향 ops를 만든다.
+
+    가져오기처럼 많은 항목을 추가한 작업은 실행 취소 기록에 항목 대신
+    {"op": "insert_ids", "first": a, "last": b}로 기록되며, 역방향은
+    {"op": "remove_ids", ...}이다. 적용하기 전에 expand_delta로 바꿔야 한다.
+    """
+    inverted = []
+    for op in reversed(ops):
+        kind = op['op']
+        if kind == 'insert_ids':
+            inverted.append({'op': 'remove_ids', 'first': op['first'], 'last': op['last']})
+        elif kind == 'insert':
+            inverted.append({'op': 'remove', 'index': op['index'], 'item': op['item']})
+        elif kind == 'remove':
+            inverted.append({'op': 'insert', 'index': op['index'], 'item': op['item']})
+        else:
+            inverted.append({'op': 'update', 'index': op['index'], 'before': op['after'], 'after': op['before']})
+    return inverted
+
+def expand_delta(todos, ops):
+    """id 범위로 기록된 remove_ids를 현재 todos 기준의 remove op 목록으로 바꾼다.
+
+    범위 op는 그 작업의 유일한 op로 기록되므로 현재 목록에서 바로 위치를 찾는다.
+    """
+    expanded = []
+    for op in ops:
+        if op['op'] != 'remove_ids':
+            expanded.append(op)
+            continue
+        first, last = op['first'], op['last']
+        # 뒤에서부터 제거하는 순서로 기록해야 위치가 순서대로 적용됨
+        expanded.extend({'op': 'remove', 'index': i, 'item': todos[i]} for i in range(len(todos) - 1, -1, -1)
+                        if first <= todos[i].get('id', 0) <= last)
+    return expanded
+
+def _sort_key(todos_list, sort_by='priority'):
+    """todos_list 안의 위치를 정렬하는 키 함수. 알 수 없는 기준이면 저장된 순서를 유지한다 (None)."""
     if sort_by == 'priority':
-        priority_map = {'높음': 0, '중간': 1, '낮음': 2}
-        today = datetime.now().date()
-        def sort_key(x):
-            overdue = 0
-            due_date_val = None
-            if 'due_date' in x and not x.get('completed', False):
-                try:
-                    due_date_obj = datetime.strptime(x['due_date'], '%Y-%m-%d').date()
-                    due_date_val = due_date_obj
-                    if due_date_obj < today:
-                        overdue = -1
-                except ValueError:
-                    pass
-            # 마감 기한이 없는 경우 가장 뒤로, 있는 경우 가까운 순서대로
-            # overdue_sort는 마감 기한이 지난 경우를 최상단으로 정렬하기 위함
-            # due_date_val is None을 통해 마감 기한 없는 항목을 뒤로 보냄
-            # x['original_index']는 최종적으로 생성 순서 유지
-            return (x.get('completed', False), # 미완료(False)가 완료(True)보다 먼저 오도록
-                    overdue,
-                    priority_map.get(x.get('priority', '중간'), 1),
-                    due_date_val is None, # 마감 기한 없는 항목을 뒤로 보냄
-                    due_date_val,
-                    x['original_index'])
-        temp_todos.sort(key=sort_key)
-    elif sort_by == 'due-date':
+        today = datetime.now().date().toordinal()
+        def sort_key(position):
+            x = todos_list[position]
+            due_date_val = None if x.completed else x.due_ordinal
+            # 미완료(False)가 완료(True)보다 먼저, 마감 기한이 지난 미완료 항목을 최상단으로,
+            # 같은 우선순위 안에서는 마감 기한이 가까운 순서 (없는 항목은 뒤로), 마지막으로 생성 순서
+            return (x.completed,
+                    due_date_val is None or due_date_val >= today,
+                    x.priority_code,
+                    due_date_val is None,
+                    due_date_val or 0,
+                    position)
+        return sort_key
+    if sort_by == 'due-date':
         # 완료 여부 (미완료 먼저), 마감 기한, 생성 순서
-        temp_todos.sort(key=lambda x: (x.get('completed', False), x.get('due_date') is None, x.get('due_date', '9999-99-99'), x['original_index']))
-    elif sort_by == 'description':
+        def due_key(position):
+            x = todos_list[position]
+            return (x.completed, x.due_ordinal is None, x.due_ordinal or 0, position)
+        return due_key
+    if sort_by == 'description':
         # 완료 여부 (미완료 먼저), 설명, 생성 순서
-        temp_todos.sort(key=lambda x: (x.get('completed', False), x['description'], x['original_index']))
-    elif sort_by == 'status':
+        return lambda position: (todos_list[position].completed, todos_list[position].description, position)
+    if sort_by == 'status':
         # 완료 여부 (미완료 먼저), 생성 순서
-        temp_todos.sort(key=lambda x: (x['completed'], x['original_index']))
-    return temp_todos
+        return lambda position: (todos_list[position].completed, position)
+    return None
+
+def all_of(checks):
+    """조건 함수 목록을 하나의 조건 함수로 합친다. 조건이 없으면 None."""
+    checks = [check for check in checks if check is not None]
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+    def predicate(todo):
+        for check in checks:
+            if not check(todo):
+                return False
+        return True
+    return predicate
+
+@profiling.timed('utils.sort')
+def select_todos(todos_list, predicate=None, sort_by='priority', limit=None, positions=None):
+    """predicate를 만족하는 항목을 정렬해 (TodoView, 일치한 개수)로 반환한다.
+
+    목록은 한 번만 훑으며 조건에 맞는 항목의 위치만 정렬 대상으로 넘긴다. limit이 있으면 힙으로
+    앞의 limit개만 고른다. 결과는 항목을 복사하지 않고 todos_list 안의 위치 목록(array('i'))만 가진다.
+    todos_list의 항목은 Todo 속성(completed, due_ordinal 등)을 가져야 한다 (저장소가 불러온 목록은 모두 Todo).
+    positions를 주면 그 위치(예: 컬럼 저장소가 완료 열로 미리 고른 후보)만 살펴본다.
+    """
+    if predicate is None:
+        positions = range(len(todos_list)) if positions is None else positions
+        matched = len(positions)
+    elif positions is None:
+        positions = array('i', (position for position, todo in enumerate(todos_list) if predicate(todo)))
+        matched = len(positions)
+    else:
+        positions = array('i', (position for position in positions if predicate(todos_list[position])))
+        matched = len(positions)
+    key = _sort_key(todos_list, sort_by)
+    if limit is not None:
+        positions = heapq.nsmallest(limit, positions, key=key) if key else positions[:limit]
+    elif key is not None:
+        positions = sorted(positions, key=key)
+    return TodoView(todos_list, positions), matched
+
+def _get_sorted_todos(todos_list, sort_by='priority'):
+    return select_todos(todos_list, None, sort_by)[0]
+
 
 def _parse_due_date(date_str):
     if date_str is None:
@@ -98,56 +400,140 @@ def _parse_priority(priority_str):
     }
     return priority_map.get(priority_str.lower(), '중간')
 
+def _migrate_legacy_history():
+    # 이전 버전의 JSON 배열 기록(command_history.json)을 JSON Lines로 한 번만 옮김
+    if not os.path.exists(LEGACY_HISTORY_FILE):
+        return
+    from .locking import file_lock
+    with file_lock(HISTORY_LOCK_FILE):
+        if not os.path.exists(LEGACY_HISTORY_FILE):
+            return
+        try:
+            with open(LEGACY_HISTORY_FILE, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except json.JSONDecodeError:
+            history = []
+        lines = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in history)
+        with open(HISTORY_FILE, 'a', encoding='utf-8') as f:
+            f.write(lines)
+        os.remove(LEGACY_HISTORY_FILE)
+
+def _history_segments():
+    """기록 파일 목록 (최신 파일부터). 현재 파일 다음에 HISTORY_FILE.1, .2, ... 순서."""
+    paths = [HISTORY_FILE]
+    n = 1
+    while os.path.exists(f"{HISTORY_FILE}.{n}"):
+        paths.append(f"{HISTORY_FILE}.{n}")
+        n += 1
+    return paths
+
+def _count_lines(path):
+    with open(path, 'rb') as f:
+        return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(65536), b''))
+
+def _rotate_history():
+    # 현재 파일을 .1로, 기존 .N을 .N+1로 옮기고 보관 개수를 넘는 오래된 파일은 삭제
+    from .locking import file_lock
+    with file_lock(HISTORY_LOCK_FILE):
+        # 다른 프로세스가 이미 교체했을 수 있음
+        if not os.path.exists(HISTORY_FILE) or os.path.getsize(HISTORY_FILE) <= HISTORY_SEGMENT_BYTES:
+            return
+        segments = _history_segments()
+        for n in range(len(segments) - 1, -1, -1):
+            os.replace(segments[n], f"{HISTORY_FILE}.{n + 1}")
+        kept = 0
+        for n in range(1, len(segments) + 1):
+            path = f"{HISTORY_FILE}.{n}"
+            if HISTORY_LIMIT and kept >= HISTORY_LIMIT:
+                os.remove(path)
+            else:
+                kept += _count_lines(path)
+
+@profiling.timed('utils.log_command')
 def log_command(command, args):
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
-
-    history = []
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-            try:
-                history = json.load(f)
-            except json.JSONDecodeError:
-                history = []
+    _migrate_legacy_history()
 
     # args 객체를 딕셔너리로 변환 (직렬화 가능한 형태로)
     arg_dict = vars(args) if args else {}
     # command와 args에서 민감한 정보나 불필요한 정보 제거 (예: command 자체는 필요하지만, 내부 객체는 불필요)
     # 여기서는 command와 arg_dict를 그대로 저장하지만, 필요에 따라 필터링 로직 추가 가능
-
-    history.append({
+    entry = {
         'timestamp': datetime.now().isoformat(),
         'command': command,
         'args': arg_dict
-    })
+    }
+    if LIST_NAME != DEFAULT_LIST:
+        entry['list'] = LIST_NAME
+    line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+    # O_APPEND로 한 번에 기록하므로 동시에 실행된 명령의 기록이 섞이지 않음
+    fd = os.open(HISTORY_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+        profiling.add_bytes('written', len(line))
+        size = os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+    if size > HISTORY_SEGMENT_BYTES:
+        _rotate_history()
 
-    # 최신 100개 명령어만 유지
-    history = history[-100:]
+def _read_lines_backward(path, chunk_size=8192):
+    """파일의 줄을 끝에서부터 거꾸로 돌려준다. (필요한 만큼만 읽음)"""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        rest = b''
+        while pos > 0:
+            read_size = min(chunk_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            lines = (f.read(read_size) + rest).split(b'\n')
+            # 첫 조각은 앞 부분과 이어질 수 있으므로 다음 번에 처리
+            rest = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if rest.strip():
+            yield rest
 
-    with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-        json.dump(history, f, ensure_ascii=False, indent=4)
+@profiling.timed('utils.history')
+def get_command_history(last=None):
+    """최근 last개(기본: HISTORY_LIMIT개)의 기록을 오래된 것부터 반환한다.
 
-def get_command_history():
-    if not os.path.exists(HISTORY_FILE):
-        return []
-    with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-        try:
-            history = json.load(f)
-        except json.JSONDecodeError:
-            return []
+    파일 끝에서부터 거꾸로 필요한 만큼만 읽는다.
+    """
+    _migrate_legacy_history()
+    limit = last or HISTORY_LIMIT
+    history = []
+    for path in _history_segments():
+        if not os.path.exists(path):
+            continue
+        for line in _read_lines_backward(path):
+            try:
+                history.append(json.loads(line.decode('utf-8')))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue  # 기록 도중 중단된 줄은 건너뜀
+            if limit and len(history) >= limit:
+                history.reverse()
+                return history
+    history.reverse()
     return history
 
 def clear_command_history():
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump([], f) # 파일 내용을 비움
+    from .locking import file_lock
+    _migrate_legacy_history()
+    segments = [path for path in _history_segments() if os.path.exists(path)]
+    if segments:
+        with file_lock(HISTORY_LOCK_FILE):
+            for path in segments:
+                os.remove(path)
         print("명령어 기록이 삭제되었습니다.")
     else:
         print("삭제할 명령어 기록이 없습니다.")
 
-from importlib.metadata import version, PackageNotFoundError
-
 def get_project_version():
+    # importlib.metadata는 불러오는 데 시간이 걸리므로 버전이 필요할 때만 불러옴
+    from importlib.metadata import version, PackageNotFoundError
     try:
         return version("cli-todo-kor")
     except PackageNotFoundError:
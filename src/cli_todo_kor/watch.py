@@ -0,0 +1,204 @@
+import os
+import select
+import shutil
+import signal
+import struct
+import sys
+import time
+from datetime import datetime
+
+# 'todo list --watch'. 저장 파일이 바뀔 때만 목록을 다시 만들고, 이전 화면과 다른 줄만 다시 그린다.
+# Linux에서는 inotify로 데이터 디렉터리의 변경을 기다리므로 파일이 그대로면 깨어나지 않으며,
+# 그 밖의 환경에서는 WATCH_INTERVAL마다 저장 파일의 서명(수정 시각, 크기, inode)만 확인한다.
+WATCH_INTERVAL = float(os.environ.get('TODO_WATCH_INTERVAL', 1.0))
+# 변경 알림을 받은 뒤 이어지는 알림(임시 파일 기록, 교체, 로그 추가)을 모아 한 번만 다시 읽도록 기다리는 시간(초)
+SETTLE_DELAY = 0.05
+
+# <sys/inotify.h>
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len (뒤에 len 바이트의 이름)
+
+
+class _InotifyWatcher:
+    """inotify로 directory에서 names 중 하나가 바뀔 때까지 기다린다."""
+
+    def __init__(self, directory, names):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify를 사용할 수 없습니다.")
+        # 저장 파일은 임시 파일을 만든 뒤 교체하므로 파일이 아니라 디렉터리를 감시
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, "데이터 디렉터리를 감시할 수 없습니다.")
+        self.names = {os.fsencode(name) for name in names}
+
+    def _drain(self):
+        # 쌓인 알림을 모두 읽고, 감시하는 파일의 알림이 있었는지 반환
+        changed = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+                # 알림이 넘쳐 버려졌으면 무엇이 바뀌었는지 알 수 없으므로 바뀐 것으로 봄
+                if mask & IN_Q_OVERFLOW or name in self.names:
+                    changed = True
+                offset += _EVENT.size + length
+
+    def wait(self, timeout, wake_fd=None):
+        """변경 알림, wake_fd 입력 또는 timeout(초)까지 기다린다. 감시하는 파일이 바뀌었으면 True."""
+        fds = [self.fd] if wake_fd is None else [self.fd, wake_fd]
+        ready, _, _ = select.select(fds, [], [], timeout)
+        if self.fd not in ready:
+            return False
+        changed = self._drain()
+        while select.select([self.fd], [], [], SETTLE_DELAY)[0]:
+            changed = self._drain() or changed
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _PollingWatcher:
+    """inotify가 없을 때. interval마다 깨어나고, 바뀌었는지는 호출한 쪽에서 서명으로 확인한다."""
+
+    def __init__(self, interval):
+        self.interval = interval
+
+    def wait(self, timeout, wake_fd=None):
+        time.sleep(max(0.0, min(self.interval, timeout)))
+        return True
+
+    def close(self):
+        pass
+
+
+def _watched_paths(storage):
+    # 저장소의 서명에 쓰이는 파일 (로그 저장소는 체크포인트와 로그)
+    return [path for path in (getattr(storage, 'path', None), getattr(storage, 'log_path', None)) if path]
+
+def _open_watcher(paths, interval):
+    if sys.platform.startswith('linux'):
+        try:
+            return _InotifyWatcher(os.path.dirname(paths[0]), [os.path.basename(path) for path in paths])
+        except (OSError, AttributeError):
+            pass
+    return _PollingWatcher(interval)
+
+def _seconds_until_midnight():
+    # 날짜가 바뀌면 '오늘 마감'과 '마감 지남' 구분이 달라지므로 자정에 다시 그림
+    now = datetime.now()
+    midnight = datetime.combine(now.date(), datetime.min.time()).timestamp() + 86400
+    return max(midnight - now.timestamp(), 0.0) + 0.01
+
+
+class _Screen:
+    """이전 화면의 줄을 기억해 두고 달라진 줄만 다시 쓰는 출력.
+
+    터미널이 아니면(파이프 등) 바뀔 때마다 화면 전체를 이어서 출력한다.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.tty = out.isatty()
+        self.lines = None
+        if self.tty:
+            self.out.write('\x1b[?25l')  # 커서 숨김
+
+    def draw(self, lines, full=False):
+        if not self.tty:
+            self.out.write("\n".join(lines) + "\n\n")
+            self.out.flush()
+            return
+        # 화면보다 긴 줄은 스크롤되지 않도록 터미널 높이에 맞춰 자름 (마지막 줄은 커서 자리)
+        height = shutil.get_terminal_size().lines
+        if len(lines) >= height:
+            hidden = len(lines) - (height - 2)
+            lines = lines[:height - 2] + [f"… {hidden}줄 더 있음 (--limit/--page로 범위 지정)"]
+        parts = []
+        previous = self.lines
+        if previous is None or full:
+            parts.append('\x1b[H\x1b[2J')
+            previous = []
+        for row, line in enumerate(lines):
+            if row >= len(previous) or previous[row] != line:
+                parts.append(f'\x1b[{row + 1};1H\x1b[2K{line}')
+        if len(lines) < len(previous):
+            parts.append(f'\x1b[{len(lines) + 1};1H\x1b[J')
+        parts.append(f'\x1b[{len(lines) + 1};1H')
+        self.out.write(''.join(parts))
+        self.out.flush()
+        self.lines = lines
+
+    def close(self):
+        if self.tty:
+            self.out.write('\x1b[?25h')
+            self.out.flush()
+
+
+def watch_lines(render, interval=WATCH_INTERVAL, out=None):
+    """render()가 돌려주는 줄 목록을 화면에 유지하고, 저장 파일이 바뀌거나 날짜가 바뀌거나
+    터미널 크기가 바뀔 때만 다시 만든다. Ctrl+C로 끝낸다."""
+    from .display import Colors
+    from .storage import get_storage
+    out = out or sys.stdout
+    storage = get_storage()
+    watcher = _open_watcher(_watched_paths(storage), interval)
+    screen = _Screen(out)
+    # 터미널 크기가 바뀌면 SIGWINCH. 기다리는 중에도 깨어나도록 시그널을 파이프로 받음
+    resized = []
+    wake_r = wake_w = None
+    old_handler = old_wakeup = None
+    if screen.tty and hasattr(signal, 'SIGWINCH'):
+        wake_r, wake_w = os.pipe()
+        os.set_blocking(wake_r, False)
+        os.set_blocking(wake_w, False)
+        old_wakeup = signal.set_wakeup_fd(wake_w)
+        old_handler = signal.signal(signal.SIGWINCH, lambda signum, frame: resized.append(signum))
+    try:
+        signature = day = None
+        while True:
+            current, today = storage.signature(), datetime.now().date()
+            if current != signature or today != day or resized:
+                full = bool(resized)
+                signature, day = current, today
+                resized.clear()
+                try:
+                    lines = render()
+                except ValueError as e:
+                    lines = [str(e)]
+                header = (f"{Colors.GRAY}todo list --watch  {datetime.now():%H:%M:%S} 갱신  "
+                          f"(Ctrl+C로 종료){Colors.ENDC}")
+                screen.draw([header, ""] + "\n".join(lines).split("\n"), full)
+            watcher.wait(_seconds_until_midnight(), wake_r)
+            if wake_r is not None:
+                try:
+                    os.read(wake_r, 512)
+                except BlockingIOError:
+                    pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if wake_r is not None:
+            signal.signal(signal.SIGWINCH, old_handler)
+            signal.set_wakeup_fd(old_wakeup)
+            os.close(wake_r)
+            os.close(wake_w)
+        watcher.close()
+        screen.close()